@@ -2,9 +2,12 @@
 
 from scripts.data_loader import preprocess_data, extract_raw_genes
 from scripts.scheduler import run_scheduler
+from scripts.annealing import run_annealing
 from scripts.exporter import export_to_excel, export_to_json
+from scripts.pinning import pins_from_sheet, apply_pins
 
-def generate_schedule(input_excel_path, trimester):
+def generate_schedule(input_excel_path, trimester, stats=None, local_search=None, engine=None,
+                      time_budget_seconds=None, snapshot=None, progress=None):
     import scripts.config as config
     config.INPUT_FILE = input_excel_path
 
@@ -14,8 +17,26 @@ def generate_schedule(input_excel_path, trimester):
     rooms_df = data["rooms"]
 
     raw_genes = extract_raw_genes(groups_df, courses_df, trimester)
+    pins = pins_from_sheet(data["pinned"])
+    if pins:
+        raw_genes, pin_report = apply_pins(raw_genes, pins, rooms_df["Room"].tolist())
+        if stats is not None:
+            stats["pins"] = {
+                "pinned": pin_report["pinned"],
+                "free": pin_report["free"],
+                "unmatched": len(pin_report["unmatched"]) + len(pin_report["invalid"]),
+            }
     valid_rooms = rooms_df["Room"].tolist()
-    best_schedule, fitness_progress = run_scheduler(raw_genes, valid_rooms) 
+    if (engine or config.ENGINE) == "sa":
+        best_schedule, fitness_progress = run_annealing(
+            raw_genes, valid_rooms,
+            time_budget_seconds=time_budget_seconds, snapshot=snapshot, progress=progress, stats=stats,
+        )
+    else:
+        best_schedule, fitness_progress = run_scheduler(
+            raw_genes, valid_rooms, local_search=local_search,
+            time_budget_seconds=time_budget_seconds, snapshot=snapshot, progress=progress, stats=stats,
+        )
 
     return best_schedule, fitness_progress
 
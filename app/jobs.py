@@ -0,0 +1,402 @@
+# app/jobs.py
+"""
+Background generation jobs.
+
+Every job lives in its own folder under ``outputs/jobs/<job id>/`` (input
+workbook, ``job.json`` state, outputs, log) and runs in its own detached
+process (``python -m app.jobs <job id>``). All coordination goes through
+those files, so any web process - the Flask dev server or one of many WSGI
+workers - can submit, inspect or cancel any job.
+"""
+
+import fcntl
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from scripts.config import (
+    JOB_CONCURRENCY,
+    JOB_QUEUE_DEPTH,
+    JOB_HISTORY,
+    RESULT_CACHE_FOLDER,
+    RANDOM_SEED,
+    get_output_paths,
+)
+from scripts.result_cache import ResultCache, cache_key
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+JOBS_FOLDER = os.path.join(PROJECT_ROOT, "outputs", "jobs")
+LOCK_PATH = os.path.join(JOBS_FOLDER, ".lock")
+
+ACTIVE = ("queued", "running")
+FINISHED = ("done", "failed", "cancelled")
+
+
+class QueueFull(Exception):
+    """Raised by ``submit`` when JOB_QUEUE_DEPTH jobs are already waiting."""
+
+
+# --- state files --------------------------------------------------------------
+
+def _job_dir(job_id):
+    return os.path.join(JOBS_FOLDER, job_id)
+
+def _state_path(job_id):
+    return os.path.join(_job_dir(job_id), "job.json")
+
+def _write_state(state):
+    path = _state_path(state["id"])
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+def _read_state(job_id):
+    try:
+        with open(_state_path(job_id), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _update_state(job_id, **changes):
+    state = _read_state(job_id)
+    state.update(changes)
+    _write_state(state)
+    return state
+
+@contextmanager
+def _locked():
+    """
+    Cross-process mutex for queue decisions: an exclusive ``flock`` on the
+    lock file. The kernel drops it when its holder exits, so a crashed process
+    never leaves the queue locked and a live holder is never broken into.
+    """
+    os.makedirs(JOBS_FOLDER, exist_ok=True)
+    with open(LOCK_PATH, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        # A job this web process spawned stays a zombie (and "alive" to kill)
+        # until it is waited for; reap it if it has exited
+        reaped, _ = os.waitpid(pid, os.WNOHANG)
+        if reaped == pid:
+            return False
+    except ChildProcessError:
+        pass  # not our child: spawned by another web worker, or already reaped
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _all_states():
+    if not os.path.isdir(JOBS_FOLDER):
+        return []
+    states = (_read_state(name) for name in os.listdir(JOBS_FOLDER) if not name.startswith("."))
+    return [_reap(state) for state in states if state is not None]
+
+def _reap(state):
+    """Mark an active job whose process has died as failed."""
+    if state["status"] in ACTIVE and state.get("pid") and not _pid_alive(state["pid"]):
+        # The process may have written its final state just before exiting
+        state = _read_state(state["id"]) or state
+        if state["status"] in ACTIVE:
+            state.update(status="failed", error="Job process exited unexpectedly", finished=time.time())
+            _write_state(state)
+    return state
+
+
+# --- web side -----------------------------------------------------------------
+
+def submit(input_path, trimester, options=None, use_cache=True):
+    """
+    Queue a generation of ``trimester`` for the workbook at ``input_path``
+    (copied into the job folder) and start its process. Returns the job state.
+    Raises ``QueueFull`` when JOB_QUEUE_DEPTH jobs are already queued.
+
+    When the same workbook, trimester, settings and options were generated
+    before, the job is created already done from the result cache, unless
+    ``use_cache`` is False.
+    """
+    job_id = uuid.uuid4().hex[:12]
+    options = options or {}
+    key = cache_key(input_path, trimester, options)
+    cached = result_cache().get(key) if use_cache else None
+    with _locked():
+        states = _all_states()
+        queue_full = sum(state["status"] == "queued" for state in states) >= JOB_QUEUE_DEPTH
+        if cached is None and queue_full:
+            raise QueueFull(f"{JOB_QUEUE_DEPTH} jobs are already waiting")
+        _prune(states)
+
+        os.makedirs(_job_dir(job_id))
+        shutil.copyfile(input_path, os.path.join(_job_dir(job_id), "input.xlsx"))
+        state = {
+            "id": job_id,
+            "status": "queued",
+            "trimester": int(trimester),
+            "options": options,
+            "cache_key": key,
+            "created": time.time(),
+            "progress": {},
+            "pid": None,
+        }
+        if cached is not None:
+            try:
+                state.update(_from_cache(job_id, int(trimester), cached))
+            except (OSError, StopIteration):
+                # Evicted by another process since get(): a miss after all
+                if queue_full:
+                    shutil.rmtree(_job_dir(job_id), ignore_errors=True)
+                    raise QueueFull(f"{JOB_QUEUE_DEPTH} jobs are already waiting")
+            else:
+                _write_state(state)
+                return state
+        _write_state(state)
+        with open(os.path.join(_job_dir(job_id), "log.txt"), "wb") as log:
+            process = subprocess.Popen(
+                [sys.executable, "-m", "app.jobs", job_id],
+                cwd=PROJECT_ROOT,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,  # outlives the web worker that spawned it
+            )
+        state = _update_state(job_id, pid=process.pid)
+    return state
+
+def result_cache():
+    return ResultCache(os.path.join(PROJECT_ROOT, RESULT_CACHE_FOLDER))
+
+def _publish(job_id, trimester, excel_path, json_path):
+    """Copy outputs into the job folder and to the trimester's paths; returns the job's own copies."""
+    json_name, excel_name = (os.path.basename(p) for p in get_output_paths(trimester))
+    outputs = {"excel": os.path.join(_job_dir(job_id), excel_name), "json": os.path.join(_job_dir(job_id), json_name)}
+    for source, target in ((excel_path, outputs["excel"]), (json_path, outputs["json"])):
+        if os.path.abspath(source) != os.path.abspath(target):
+            shutil.copyfile(source, target)
+    # The latest result per trimester stays where /download_excel and /download_json look
+    trimester_json, trimester_excel = get_output_paths(trimester)
+    shutil.copyfile(outputs["excel"], trimester_excel)
+    shutil.copyfile(outputs["json"], trimester_json)
+    return outputs
+
+def _from_cache(job_id, trimester, cached):
+    files = cached["files"]
+    excel = next(path for name, path in files.items() if name.endswith(".xlsx"))
+    json_path = next(path for name, path in files.items() if name.endswith(".json"))
+    now = time.time()
+    return {
+        "status": "done",
+        "started": now,
+        "finished": now,
+        "metrics": dict(cached["metrics"], cached=True),
+        "outputs": _publish(job_id, trimester, excel, json_path),
+    }
+
+def _prune(states):
+    """Delete the oldest finished jobs beyond JOB_HISTORY."""
+    finished = sorted((s for s in states if s["status"] in FINISHED), key=lambda s: s["created"])
+    for state in finished[:max(0, len(finished) - JOB_HISTORY)]:
+        shutil.rmtree(_job_dir(state["id"]), ignore_errors=True)
+
+def states():
+    """States of every job still on disk (active jobs whose process died are marked failed)."""
+    return _all_states()
+
+def get(job_id):
+    """Current state of a job, or None if it does not exist."""
+    state = _read_state(job_id)
+    if state is None:
+        return None
+    state = _reap(state)
+    state["cancel_requested"] = _cancelled(job_id)
+    return state
+
+def cancel(job_id):
+    """Ask a job to stop: a queued job never starts, a running one stops after its current generation."""
+    state = get(job_id)
+    if state is None or state["status"] in FINISHED:
+        return state
+    # Only the job process writes its state; the request is a marker file it polls
+    open(os.path.join(_job_dir(job_id), "cancel"), "w").close()
+    return get(job_id)
+
+def output_path(job_id, kind):
+    """Path of a finished job's ``"excel"`` or ``"json"`` output."""
+    state = get(job_id)
+    if state is None or state["status"] != "done":
+        return None
+    return state["outputs"][kind]
+
+
+# --- job process --------------------------------------------------------------
+
+def _cancelled(job_id):
+    return os.path.exists(os.path.join(_job_dir(job_id), "cancel"))
+
+def _wait_for_slot(job_id):
+    """Block until fewer than JOB_CONCURRENCY jobs run, then claim a slot. False if cancelled meanwhile."""
+    while True:
+        with _locked():
+            if _cancelled(job_id):
+                return False
+            running = sum(state["status"] == "running" for state in _all_states())
+            if running < JOB_CONCURRENCY:
+                _update_state(job_id, status="running", started=time.time(), pid=os.getpid())
+                return True
+        time.sleep(0.5)
+
+def _watch(job_id, snapshot, done):
+    """Publish the snapshot's progress and forward cancel requests until ``done`` is set."""
+    while not done.wait(1.0):
+        if _cancelled(job_id):
+            snapshot.request_stop()
+        _update_state(job_id, progress={
+            "generation": snapshot.generation,
+            "best_fitness": snapshot.fitness,
+            "elapsed": round(snapshot.elapsed(), 2),
+        })
+
+def _progress_writer(job_id):
+    """Progress callback appending one JSON line per (throttled) event to the job's ``progress.ndjson``."""
+    path = os.path.join(_job_dir(job_id), "progress.ndjson")
+
+    def write(event):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+    return write
+
+def events(job_id, poll=0.25, heartbeat=15.0):
+    """
+    Yield the job's progress records as they are written, then a final
+    ``{"status": ...}`` record once the job has finished (or None while
+    nothing new arrived for ``heartbeat`` seconds, to keep the stream alive).
+    """
+    path = os.path.join(_job_dir(job_id), "progress.ndjson")
+    offset, partial, idle = 0, "", 0.0
+    while True:
+        state = get(job_id)
+        if state is None:
+            return  # pruned (or never existed): nothing more will be written
+        finished = state["status"] in FINISHED
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                f.seek(offset)
+                chunk = f.read()
+                offset = f.tell()
+            *lines, partial = (partial + chunk).split("\n")
+            for line in lines:
+                idle = 0.0
+                yield json.loads(line)
+        if finished:
+            yield {"status": state["status"]}
+            return
+        time.sleep(poll)
+        idle += poll
+        if idle >= heartbeat:
+            idle = 0.0
+            yield None
+
+def build_metrics(best_schedule, fitness_progress, stats, elapsed):
+    """Metrics JSON returned to the browser for a finished generation."""
+    from scripts.evaluator import compute_penalties
+
+    hard, soft = compute_penalties(best_schedule.genes)
+    metrics = {
+        "fitnessScore": best_schedule.fitness,
+        "hard": int(hard),
+        "soft": int(soft),
+        "time": elapsed,
+        "initial_population_time": stats.get("initial_population_seconds"),
+        "unassigned": stats.get("unassigned", []),
+        "fitness_progress": fitness_progress
+    }
+    if "island_histories" in stats:
+        metrics["island_progress"] = stats["island_histories"]
+    if "local_search" in stats:
+        metrics["local_search"] = stats["local_search"]
+    if "pins" in stats:
+        metrics["pins"] = stats["pins"]
+    return metrics
+
+def run_job(job_id):
+    from app.ga.ga_engine import generate_schedule, save_schedule
+    from scripts.anytime import BestSnapshot, stop_on_signals
+    from scripts import tracing
+
+    state = _read_state(job_id)
+    if not _wait_for_slot(job_id):
+        _update_state(job_id, status="cancelled", finished=time.time())
+        return
+
+    trimester = state["trimester"]
+    options = state["options"]
+    seed = RANDOM_SEED if options.get("seed") is None else options["seed"]
+    if seed is not None:
+        random.seed(seed)
+    done = threading.Event()
+    watcher = None
+    if options.get("profile"):
+        tracing.enable()
+    try:
+        with stop_on_signals(BestSnapshot()) as snapshot:
+            watcher = threading.Thread(target=_watch, args=(job_id, snapshot, done), daemon=True)
+            watcher.start()
+            start = time.time()
+            stats = {}
+            best_schedule, fitness_progress = generate_schedule(
+                os.path.join(_job_dir(job_id), "input.xlsx"), trimester, stats=stats,
+                local_search=options.get("local_search"), engine=options.get("engine"),
+                time_budget_seconds=options.get("time_budget"), snapshot=snapshot,
+                progress=_progress_writer(job_id),
+            )
+            elapsed = round(time.time() - start, 2)
+            done.set()
+            watcher.join()
+            if _cancelled(job_id):
+                _update_state(job_id, status="cancelled", finished=time.time())
+                return
+
+            json_name, excel_name = (os.path.basename(p) for p in get_output_paths(trimester))
+            excel_out = os.path.join(_job_dir(job_id), excel_name)
+            json_out = os.path.join(_job_dir(job_id), json_name)
+            export_start = time.time()
+            save_schedule(best_schedule, excel_out, json_out)
+            export_seconds = round(time.time() - export_start, 3)
+            outputs = _publish(job_id, trimester, excel_out, json_out)
+
+            metrics = build_metrics(best_schedule, fitness_progress, stats, elapsed)
+            profile = tracing.disable()
+            # Interrupted runs (time budget aside) are not what the key promises
+            if not snapshot.stop_requested and profile is None:
+                result_cache().put(state["cache_key"], metrics, [excel_out, json_out])
+            _update_state(job_id, status="done", finished=time.time(), metrics=metrics, outputs=outputs,
+                          stats=profile, export_seconds=export_seconds)
+    except Exception as e:
+        done.set()
+        if watcher is not None:
+            watcher.join()  # its last progress write must not land after the failed state
+        _update_state(job_id, status="failed", error=str(e), finished=time.time())
+        raise
+    finally:
+        tracing.disable()  # no-op unless an error left the trace running
+
+
+if __name__ == "__main__":
+    run_job(sys.argv[1])
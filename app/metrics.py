@@ -0,0 +1,207 @@
+# app/metrics.py
+"""
+Operational metrics of the web service in the Prometheus text format.
+
+Request counts, latencies and upload sizes are recorded by the blueprint's
+request hooks in the serving process. Generations run in their own job
+processes, so their durations, export times and final penalties are read
+from the job state files when ``/metrics`` is scraped: every finished job is
+observed once per web process, and the in-flight gauges are recomputed on
+every scrape. Each metric guards its samples with its own lock, held only
+for a few dict updates.
+
+All samples live in the memory of the web process that serves ``/metrics``,
+so the endpoint assumes a single web process (the Flask server, or one WSGI
+worker with threads). Under several worker processes each scrape reports only
+the requests of the worker that answered it and its counters restart with
+that worker; the generation metrics stay complete, since every worker reads
+them from the shared job files.
+"""
+
+import bisect
+import math
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+GENERATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+EXPORT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+UPLOAD_BUCKETS = (1e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 5e7)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._samples = {}  # label values -> value (or histogram state)
+
+    def _snapshot(self):
+        with self._lock:
+            return {labels: self._copy(value) for labels, value in self._samples.items()}
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self._snapshot().items()):
+            lines.extend(self._lines(labels, value))
+        return lines
+
+    def _lines(self, labels, value):
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._samples[labels] = self._samples.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._samples[labels] = value
+
+    def replace(self, samples):
+        """Swap in a whole new ``{label values: value}`` mapping."""
+        with self._lock:
+            self._samples = dict(samples)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value):
+        index = bisect.bisect_left(self.buckets, value)  # first bucket with value <= le
+        with self._lock:
+            state = self._samples.get(labels)
+            if state is None:
+                state = self._samples[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @staticmethod
+    def _copy(value):
+        return [list(value[0]), value[1]]
+
+    def _lines(self, labels, value):
+        counts, total = value
+        lines, cumulative = [], 0
+        for le, n in zip((*self.buckets, math.inf), counts):
+            cumulative += n
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', _number(le))])} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# --- metrics ------------------------------------------------------------------
+
+REQUESTS = Counter("scheduler_http_requests_total", "HTTP requests by route, method and status.",
+                   ("route", "method", "status"))
+REQUEST_SECONDS = Histogram("scheduler_http_request_duration_seconds", "Time to build the HTTP response.",
+                            ("route", "method"), LATENCY_BUCKETS)
+UPLOAD_BYTES = Histogram("scheduler_upload_bytes", "Size of uploaded request bodies.", ("route",),
+                         UPLOAD_BUCKETS)
+GENERATIONS = Counter("scheduler_generations_total", "Finished generation jobs by final status.",
+                      ("status", "engine"))
+GENERATION_SECONDS = Histogram("scheduler_generation_duration_seconds",
+                               "Search time of completed (not cached) generations.", ("trimester", "engine"),
+                               GENERATION_BUCKETS)
+EXPORT_SECONDS = Histogram("scheduler_export_duration_seconds", "Time to write a generation's Excel and JSON.",
+                           (), EXPORT_BUCKETS)
+IN_FLIGHT = Gauge("scheduler_generations_in_flight", "Generation jobs queued or running.", ("status",))
+BEST_FITNESS = Gauge("scheduler_best_fitness", "Fitness of the latest finished generation.", ("trimester",))
+HARD_PENALTY = Gauge("scheduler_hard_penalty", "Hard penalty of the latest finished generation.", ("trimester",))
+SOFT_PENALTY = Gauge("scheduler_soft_penalty", "Soft penalty of the latest finished generation.", ("trimester",))
+
+ALL = (REQUESTS, REQUEST_SECONDS, UPLOAD_BYTES, GENERATIONS, GENERATION_SECONDS, EXPORT_SECONDS,
+       IN_FLIGHT, BEST_FITNESS, HARD_PENALTY, SOFT_PENALTY)
+
+_seen_lock = threading.Lock()
+_seen_jobs = set()
+_latest = {}  # trimester -> finish time of the job behind the penalty gauges
+
+
+# --- recording ----------------------------------------------------------------
+
+def observe_request(route, method, status, seconds, upload_bytes=None):
+    REQUESTS.inc(route, method, str(status))
+    REQUEST_SECONDS.observe(route, method, value=seconds)
+    if upload_bytes:
+        UPLOAD_BYTES.observe(route, value=upload_bytes)
+
+
+def observe_jobs(states):
+    """Fold job states into the generation metrics: each finished job once, the in-flight counts every time."""
+    in_flight = {("queued",): 0, ("running",): 0}
+    fresh = []
+    with _seen_lock:
+        for state in states:
+            status = state["status"]
+            if status in ("queued", "running"):
+                in_flight[(status,)] += 1
+            elif state["id"] not in _seen_jobs:
+                _seen_jobs.add(state["id"])
+                fresh.append(state)
+        # Pruned jobs never come back
+        _seen_jobs.intersection_update(state["id"] for state in states)
+
+        for state in fresh:
+            trimester = str(state["trimester"])
+            metrics = state.get("metrics") or {}
+            if state["status"] == "done" and state.get("finished", 0) > _latest.get(trimester, 0):
+                _latest[trimester] = state["finished"]
+                BEST_FITNESS.set(trimester, value=metrics["fitnessScore"])
+                HARD_PENALTY.set(trimester, value=metrics["hard"])
+                SOFT_PENALTY.set(trimester, value=metrics["soft"])
+    IN_FLIGHT.replace(in_flight)
+
+    for state in fresh:
+        metrics = state.get("metrics") or {}
+        engine = (state.get("options") or {}).get("engine") or "default"
+        GENERATIONS.inc(state["status"], engine)
+        if state["status"] == "done" and not metrics.get("cached"):
+            GENERATION_SECONDS.observe(str(state["trimester"]), engine, value=metrics.get("time", 0.0))
+            if state.get("export_seconds") is not None:
+                EXPORT_SECONDS.observe(value=state["export_seconds"])
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in ALL:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -1,15 +1,17 @@
 # app/routes.py
 
-from flask import Blueprint, request, send_file, jsonify, render_template
+from flask import Blueprint, request, send_file, jsonify, render_template, Response, stream_with_context, g
 import os
 import json
+import tempfile
+import time
+from app import metrics
 from app.utils.schedule_check import (
     check_conflicts_and_violations,
     get_subject,
     get_group_prefix,
     advanced_conflict_and_violation_analysis,
 )
-from scripts.config import get_output_paths
 
 bp = Blueprint('main', __name__)
 
@@ -17,8 +19,32 @@ PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 INPUTS_FOLDER = os.path.join(PROJECT_ROOT, 'inputs')
 OUTPUTS_FOLDER = os.path.join(PROJECT_ROOT, 'outputs')
 
-# Cache of the most recently generated output paths per trimester
-LAST_OUTPUTS = {}
+
+@bp.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+@bp.after_request
+def _record_request(response):
+    """Count and time every request by its route pattern (so job ids don't become labels)."""
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    upload = request.content_length if request.method == 'POST' and request.files else None
+    metrics.observe_request(route, request.method, response.status_code,
+                            time.perf_counter() - g.request_start, upload)
+    return response
+
+
+@bp.route('/metrics')
+def prometheus_metrics():
+    """
+    Service metrics in the Prometheus text format (requests, uploads, generations, latest penalties).
+    Request metrics are per process: run the app as one web process for them to be complete.
+    """
+    from app import jobs
+    metrics.observe_jobs(jobs.states())
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
+
 
 @bp.route("/check", methods=["GET", "POST"])
 def check_schedule():
@@ -55,41 +81,153 @@ def index():
 @bp.route('/generate_schedule', methods=['POST'])
 def generate_schedule_route():
     """
-    Handles schedule generation and returns metrics JSON.
-    Generated files are saved to the static output paths defined in ``config.get_output_paths``.
+    Submits a schedule generation job and returns its id at once (202).
+    Poll ``/jobs/<id>`` for status and progress and fetch ``/jobs/<id>/result``
+    for the metrics and downloads once it is done.
     """
     if 'file' not in request.files or 'trimester' not in request.form:
         return jsonify({'error': 'File or trimester not provided'}), 400
     file = request.files['file']
-    trimester = request.form['trimester']
+    try:
+        trimester = int(request.form['trimester'])
+    except ValueError:
+        return jsonify({'error': 'trimester must be an integer'}), 400
+    # Optional memetic stage; empty means the config default
+    local_search = request.form.get('local_search') or None
+    engine = request.form.get('engine') or None
+    if engine not in (None, 'ga', 'sa'):
+        return jsonify({'error': f'Unknown engine: {engine}'}), 400
+    from scripts.local_search import get_local_search, local_search_name
+    try:
+        get_local_search(local_search)  # rejected here rather than in the job process
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # The form's "None" option sends "none": only a real method is GA-only
+    if engine == 'sa' and local_search_name(local_search):
+        return jsonify({'error': 'local_search only applies to the genetic algorithm engine'}), 400
+    try:
+        time_budget = float(request.form['time_budget']) if request.form.get('time_budget') else None
+        seed = int(request.form['seed']) if request.form.get('seed') else None
+    except ValueError:
+        return jsonify({'error': 'time_budget must be a number of seconds and seed an integer'}), 400
+    # no_cache=1 forces a fresh generation even if this exact request was answered before
+    use_cache = request.form.get('no_cache', '').lower() not in ('1', 'true', 'on', 'yes')
+    # profile=1 adds phase timings and counters ("stats") to the result; a cached answer has none
+    profile = request.form.get('profile', '').lower() in ('1', 'true', 'on', 'yes')
+    # A private copy per request (submit copies it into the job folder), so
+    # concurrent uploads never overwrite each other's workbook
     os.makedirs(INPUTS_FOLDER, exist_ok=True)
-    input_path = os.path.join(INPUTS_FOLDER, 'GA_input.xlsx')
-    file.save(input_path)
-    from app.ga.ga_engine import generate_schedule, save_schedule
-    import time
+    fd, input_path = tempfile.mkstemp(prefix='GA_input_', suffix='.xlsx', dir=INPUTS_FOLDER)
+    os.close(fd)
+
+    from app import jobs
     try:
-        start = time.time()
-        # First call gets best_schedule & fitness_progress
-        best_schedule, fitness_progress = generate_schedule(input_path, int(trimester))
-        elapsed = round(time.time() - start, 2)
-        json_out, excel_out = get_output_paths(trimester)
-        save_schedule(best_schedule, excel_out, json_out)
-
-        # Remember the latest outputs for this trimester
-        LAST_OUTPUTS[trimester] = (excel_out, json_out)
-        
-        from scripts.evaluator import compute_penalties
-        hard, soft = compute_penalties(best_schedule.genes)
-        metrics = {
-            "fitnessScore": best_schedule.fitness,
-            "hard": int(hard),
-            "soft": int(soft),   
-            "time": elapsed,
-            "fitness_progress": fitness_progress
-        }
-        return jsonify(metrics)
-    except Exception as e:
-        return jsonify({'error': 'Schedule generation failed!', 'details': str(e)}), 500
+        file.save(input_path)
+        job = jobs.submit(input_path, trimester, {
+            'engine': engine,
+            'local_search': local_search,
+            'time_budget': time_budget,
+            'seed': seed,
+            'profile': profile,
+        }, use_cache=use_cache and not profile)
+    except jobs.QueueFull as e:
+        return jsonify({'error': 'Too many schedule generations waiting, try again later', 'details': str(e)}), 429
+    finally:
+        os.remove(input_path)
+    return jsonify(_job_summary(job)), 202
+
+
+def _job_summary(job):
+    summary = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'trimester': job['trimester'],
+        'progress': job.get('progress', {}),
+        'cancel_requested': job.get('cancel_requested', False),
+        'status_url': f"/jobs/{job['id']}",
+        'cancel_url': f"/jobs/{job['id']}/cancel",
+        'result_url': f"/jobs/{job['id']}/result",
+        'events_url': f"/jobs/{job['id']}/events",
+    }
+    if job.get('error'):
+        summary['error'] = job['error']
+    return summary
+
+
+@bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status (queued, running, done, failed, cancelled) and progress of a generation job."""
+    from app import jobs
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_summary(job))
+
+
+@bp.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """
+    Server-Sent Events stream of a job's progress (best, mean, hard, soft,
+    elapsed; at most one record per PROGRESS_INTERVAL_SECONDS plus the last
+    generation), replayed from the start, closed by an ``end`` event carrying
+    the final status.
+    """
+    from app import jobs
+    if jobs.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def stream():
+        for event in jobs.events(job_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+            elif 'status' in event:
+                yield f"event: end\ndata: {json.dumps(event)}\n\n"
+            else:
+                yield f"data: {json.dumps(event)}\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancels a queued job or stops a running one after its current generation."""
+    from app import jobs
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_summary(job))
+
+
+@bp.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """Metrics and download links of a finished job (409 while it is still queued or running)."""
+    from app import jobs
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != 'done':
+        return jsonify(_job_summary(job)), 409
+    result = dict(job['metrics'])
+    if job.get('stats'):
+        result['stats'] = job['stats']
+    result['downloads'] = {
+        'excel': f'/jobs/{job_id}/download/excel',
+        'json': f'/jobs/{job_id}/download/json',
+    }
+    return jsonify(result)
+
+
+@bp.route('/jobs/<job_id>/download/<kind>')
+def download_job_output(job_id, kind):
+    """Downloads the Excel or JSON output of a finished job."""
+    from app import jobs
+    if kind not in ('excel', 'json'):
+        return "Unknown download", 404
+    path = jobs.output_path(job_id, kind)
+    if path is None or not os.path.exists(path):
+        return "File not found", 404
+    return send_file(path, as_attachment=True, download_name=os.path.basename(path))
 
 @bp.route('/download_excel')
 def download_excel():
@@ -97,13 +235,7 @@ def download_excel():
     Downloads most recent Excel file for given trimester.
     """
     trimester = request.args.get('trimester', '1')
-    cached = LAST_OUTPUTS.get(trimester)
-    if cached:
-        excel_path, _ = cached
-        if os.path.exists(excel_path):
-            return send_file(excel_path, as_attachment=True, download_name=os.path.basename(excel_path))
-
-    # fallback to old style, for backward compat
+    # Finished jobs copy their outputs here
     fallback = os.path.join(OUTPUTS_FOLDER, f'timetable_T{trimester}.xlsx')
     if not os.path.exists(fallback):
         return "Excel file not found", 404
@@ -116,12 +248,6 @@ def download_json():
     Downloads most recent JSON file for given trimester.
     """
     trimester = request.args.get('trimester', '1')
-    cached = LAST_OUTPUTS.get(trimester)
-    if cached:
-        _, json_path = cached
-        if os.path.exists(json_path):
-            return send_file(json_path, as_attachment=True, download_name=os.path.basename(json_path))
-
     fallback = os.path.join(OUTPUTS_FOLDER, f'timetable_T{trimester}.json')
     if not os.path.exists(fallback):
         return "JSON file not found", 404
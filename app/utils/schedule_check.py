@@ -1,108 +1,16 @@
 # app/utils/schedule_check.py
 import re
-import json
+import numpy as np
 import pandas as pd
-from collections import defaultdict
 
-def check_conflicts_and_violations(timetable, timetable_name, ga_input_file):
-    # Conflict analysis
-    conflicts = defaultdict(list)
-    room_usage = defaultdict(lambda: defaultdict(list))
-    group_usage = defaultdict(lambda: defaultdict(list))
-
-    for group, sessions in timetable.items():
-        for s in sessions:
-            key = (s["day"], s["time"])
-            room = s["room"]
-            group_id = s["group"]
-            room_usage[key][room].append((group_id, s["course"]))
-            group_usage[key][group_id].append(s["course"])
-
-    for key, rooms in room_usage.items():
-        for room, usage in rooms.items():
-            if room.strip().lower() == "gym":
-                continue
-            if len(usage) > 1:
-                conflicts["Room conflict"].append((key, room, usage))
-
-    for key, groups in group_usage.items():
-        for group_id, usage in groups.items():
-            if len(usage) > 1:
-                conflicts["Group conflict"].append((key, group_id, [(group_id, c) for c in usage]))
-
-    conflict_rows = []
-    for conflict_type, items in conflicts.items():
-        for item in items:
-            details = "; ".join(f"{a}: {b}" for a, b in item[2])
-            conflict_rows.append((conflict_type, item[0][0], item[0][1], item[1], details))
-
-    conflict_df = pd.DataFrame(conflict_rows, columns=["Conflict Type", "Day", "Time", "Entity", "Details"])
-    if not conflict_df.empty:
-        conflict_df.index += 1
-        conflict_df.reset_index(inplace=True)
-        conflict_df.rename(columns={"index": "No"}, inplace=True)
-        conflict_table = conflict_df.to_html(index=False, classes="table table-bordered table-striped table-hover")
-    else:
-        conflict_table = None
+from scripts.data_loader import load_excel_data
 
-    # Violation analysis
-    violation_table = None
-    if ga_input_file:
-        trimester_match = re.search(r'T(\d+)', timetable_name)
-        if trimester_match:
-            trimester_base = int(trimester_match.group(1))
-            xls = pd.ExcelFile(ga_input_file)
-            all_sheets = xls.sheet_names
-
-            def get_ep(g): return g.split("-")[0].upper()
-            def map_trimester(base, year):
-                m = {1: {1:1, 2:2, 3:3}, 2: {1:4, 2:5, 3:6}, 3:{1:7, 2:8}}
-                return m.get(year, {}).get(base)
-
-            group_course_type_count = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
-            for group, sessions in timetable.items():
-                for s in sessions:
-                    group_course_type_count[group][s["course"].strip().lower()][s["type"].strip().lower()] += 10
-
-            violations = []
-            for group in timetable:
-                ep = get_ep(group)
-                year_code = int(group.split("-")[1][:2])
-                year = 1 if year_code == 23 else 2 if year_code == 22 else 3
-                actual_trim = map_trimester(trimester_base, year)
-                if not actual_trim or actual_trim == 9 or ep not in all_sheets:
-                    continue
-                df = xls.parse(ep)
-                df.columns = [c.lower().strip() for c in df.columns]
-                if 'trimester' not in df.columns:
-                    continue
-                df = df[df['trimester'] == actual_trim]
-                df['course_name'] = df['course_name'].astype(str).str.strip().str.lower()
-
-                for _, row in df.iterrows():
-                    cname = row['course_name']
-                    if not cname or cname == 'nan':
-                        continue
-                    for typ in ['lecture', 'practice', 'lab']:
-                        sc = f"{typ}_slots"
-                        if not pd.isna(row.get(sc)) and int(row[sc]) > 0:
-                            req = int(row[sc])
-                            act = group_course_type_count[group][cname][typ]
-                            if act < req:
-                                violations.append({
-                                    "Group": group, "EP": ep, "Trimester": actual_trim,
-                                    "Course": cname, "Type": typ,
-                                    "Required": req, "Actual": act, "Missing": req - act
-                                })
-
-            violation_df = pd.DataFrame(violations)
-            if not violation_df.empty:
-                violation_df.index += 1
-                violation_df.reset_index(inplace=True)
-                violation_df.rename(columns={"index": "No"}, inplace=True)
-                violation_table = violation_df.to_html(index=False, classes="table table-bordered table-striped table-hover")
+TABLE_CLASSES = "table table-bordered table-striped table-hover"
+CONFLICT_COLUMNS = ["Conflict Type", "Day", "Time", "Entity", "Details"]
+SLOT_TYPES = ["lecture", "practice", "lab"]
 
-    return conflict_table, violation_table
+# Up to this many groups of one EP may share a room/slot for the same subject (joint lecture)
+MAX_GROUPS_WITHOUT_CONFLICT = 5
 
 def get_subject(course_str):
     """Extracts the subject part from a course name (handles 'CODE: Subject')."""
@@ -117,129 +25,191 @@ def get_group_prefix(group_id):
     else:
         return group_id[:5]
 
+# --- sessions frame -----------------------------------------------------------
+
+def sessions_frame(timetable):
+    """
+    One row per session of a ``{group: [session, ...]}`` timetable, in file
+    order, with the derived columns the checks group on.
+    """
+    rows = [
+        (owner, s["day"], s["time"], s["room"], s["group"], s["course"], s["type"])
+        for owner, sessions in timetable.items() for s in sessions
+    ]
+    df = pd.DataFrame(rows, columns=["owner", "day", "time", "room", "group", "course", "type"])
+    df["position"] = np.arange(len(df))
+    # (day, time) in order of first appearance, like the dicts the checks used to build
+    df["slot"] = df.groupby(["day", "time"], sort=False, dropna=False).ngroup()
+
+    df["subject"] = _per_unique(df["course"], get_subject)
+    df["prefix"] = _per_unique(df["group"], get_group_prefix)
+    return df
+
+def _per_unique(column, fn):
+    """``fn`` applied to every distinct value of ``column`` once, broadcast back to the rows."""
+    codes, uniques = pd.factorize(column)
+    return np.asarray([fn(str(value)) for value in uniques] + [None], dtype=object)[codes]
+
+def _shared(df, keys):
+    """
+    Groups of ``df`` by ``keys`` holding more than one session, ordered by
+    slot and then by first appearance within the slot: the keys of each with
+    its "group: course" details.
+    """
+    codes = df.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()  # numbered by first appearance
+    shared = np.bincount(codes)[codes] > 1
+    df, codes = df[shared], codes[shared]
+    order = np.lexsort((codes, df["slot"].to_numpy()))  # stable, so sessions keep file order
+    df, codes = df.iloc[order], codes[order]
+    starts = np.flatnonzero(np.diff(codes, prepend=-1))
+    ends = np.r_[starts[1:], len(codes)]
+    pairs = [f"{group}: {course}" for group, course in zip(df["group"].tolist(), df["course"].tolist())]
+    return df.iloc[starts][keys].assign(details=["; ".join(pairs[a:b]) for a, b in zip(starts, ends)])
+
+# --- conflicts ----------------------------------------------------------------
+
+def room_conflicts(df, skip_rooms, joint_exception):
+    """Rooms holding more than one session in a slot (optionally allowing joint lectures)."""
+    keys = ["day", "time", "room"]
+    df = df[~df["room"].astype(str).str.strip().str.lower().isin(skip_rooms)]
+    if joint_exception and not df.empty:
+        grouped = df.groupby(keys, sort=False, dropna=False)
+        joint = (grouped["prefix"].transform("nunique") == 1) & (grouped["subject"].transform("nunique") == 1) \
+            & (grouped["position"].transform("size") <= MAX_GROUPS_WITHOUT_CONFLICT)
+        df = df[~joint]
+    if df.empty:
+        return []
+    shared = _shared(df, keys)
+    return [("Room conflict", r.day, r.time, r.room, r.details) for r in shared.itertuples(index=False)]
+
+def group_conflicts(df, joint_exception):
+    """Groups with more than one session in a slot (optionally skipping slots that hold one joint lecture)."""
+    if df.empty:
+        return []
+    if joint_exception:
+        per_slot = df.groupby("slot")
+        n_groups = per_slot["group"].nunique()
+        # Subjects every group of the slot attends
+        subject_groups = df.drop_duplicates(["slot", "group", "subject"]).groupby(["slot", "subject"]).size()
+        common = (subject_groups == n_groups.reindex(subject_groups.index, level="slot")).groupby(level="slot").sum()
+        joint = (n_groups > 1) & (common.reindex(n_groups.index, fill_value=0) == 1) \
+            & (per_slot["prefix"].nunique() == 1) & (n_groups <= MAX_GROUPS_WITHOUT_CONFLICT)
+        df = df[~df["slot"].map(joint).to_numpy()]
+        if df.empty:
+            return []
+    busy = _shared(df, ["day", "time", "group"])
+    return [("Group conflict", r.day, r.time, r.group, r.details) for r in busy.itertuples(index=False)]
+
+def _html_table(rows, columns=None):
+    """Numbered HTML table of ``rows`` (tuples with ``columns``, or dicts), None when empty."""
+    df = pd.DataFrame(rows, columns=columns)
+    if df.empty:
+        return None
+    df.index += 1
+    df.reset_index(inplace=True)
+    df.rename(columns={"index": "No"}, inplace=True)
+    return df.to_html(index=False, classes=TABLE_CLASSES)
+
+# --- curriculum violations ----------------------------------------------------
+
+def map_trimester(base, year):
+    m = {1: {1: 1, 2: 2, 3: 3}, 2: {1: 4, 2: 5, 3: 6}, 3: {1: 7, 2: 8}}
+    return m.get(year, {}).get(base)
+
+def _curriculum(sheet):
+    """Required slots of one EP sheet as (trimester, course, type, required) rows, in sheet order."""
+    df = sheet.copy()
+    df.columns = [str(c).lower().strip() for c in df.columns]
+    if "trimester" not in df.columns:
+        return None
+    df["course_name"] = df["course_name"].astype(str).str.strip().str.lower()
+    df = df[(df["course_name"] != "") & (df["course_name"] != "nan")]
+    parts = []
+    for typ in SLOT_TYPES:
+        column = f"{typ}_slots"
+        if column not in df.columns:
+            continue
+        required = np.trunc(pd.to_numeric(df[column], errors="coerce"))
+        part = pd.DataFrame({"trimester": df["trimester"], "course": df["course_name"], "type": typ,
+                             "required": required, "row": np.arange(len(df)), "order": SLOT_TYPES.index(typ)})
+        parts.append(part[part["required"] > 0])
+    if not parts:
+        return None
+    rows = pd.concat(parts).sort_values(["row", "order"], kind="stable")
+    rows["required"] = rows["required"].astype(int)
+    return rows[["trimester", "course", "type", "required"]]
+
+def curriculum_violations(df, groups, timetable_name, ga_input_file):
+    """
+    Sessions missing from the timetable against the GA input curricula. Each
+    EP sheet is read once (through the parsed-input cache) and normalized once
+    per request, however many groups it covers.
+    """
+    trimester_match = re.search(r'T(\d+)', timetable_name)
+    if not trimester_match:
+        return []
+    trimester_base = int(trimester_match.group(1))
+    sheets = load_excel_data(ga_input_file)
+
+    cohorts, curricula = [], {}
+    for group in groups:
+        ep = group.split("-")[0].upper()
+        year_code = int(group.split("-")[1][:2])
+        year = 1 if year_code == 23 else 2 if year_code == 22 else 3
+        actual_trim = map_trimester(trimester_base, year)
+        if not actual_trim or actual_trim == 9 or ep not in sheets:
+            continue
+        if ep not in curricula:
+            curricula[ep] = _curriculum(sheets[ep])
+        cohorts.append((group, ep, actual_trim))
+    curricula = [rows.assign(EP=ep) for ep, rows in curricula.items() if rows is not None]
+    if not cohorts or not curricula:
+        return []
+    # Groups in timetable order, each followed by its curriculum rows in sheet order
+    required = pd.DataFrame(cohorts, columns=["Group", "EP", "Trimester"]).merge(
+        pd.concat(curricula, ignore_index=True), left_on=["EP", "Trimester"], right_on=["EP", "trimester"])
+    if required.empty:
+        return []
+
+    # Every session counts as 10 slots of its course and type
+    actual = (df.assign(course=df["course"].str.strip().str.lower(), type=df["type"].str.strip().str.lower())
+              .groupby(["owner", "course", "type"]).size() * 10)
+    required["Actual"] = actual.reindex(
+        pd.MultiIndex.from_arrays([required["Group"], required["course"], required["type"]])
+    ).fillna(0).astype(int).to_numpy()
+    missing = required[required["Actual"] < required["required"]]
+    return [
+        {"Group": r.Group, "EP": r.EP, "Trimester": r.Trimester, "Course": r.course, "Type": r.type,
+         "Required": r.required, "Actual": r.Actual, "Missing": r.required - r.Actual}
+        for r in missing.itertuples(index=False)
+    ]
+
+# --- checks -------------------------------------------------------------------
+
+def check_conflicts_and_violations(timetable, timetable_name, ga_input_file):
+    df = sessions_frame(timetable)
+    conflicts = room_conflicts(df, ("gym",), joint_exception=False) + group_conflicts(df, joint_exception=False)
+    conflict_table = _html_table(conflicts, CONFLICT_COLUMNS)
+
+    violation_table = None
+    if ga_input_file:
+        violation_table = _html_table(curriculum_violations(df, list(timetable), timetable_name, ga_input_file))
+    return conflict_table, violation_table
+
 def advanced_conflict_and_violation_analysis(timetable, timetable_name, ga_input_file):
     """
     Advanced room/group conflict analysis allowing up to 5 groups with same subject/joint lecture in same slot+room.
     Used for the /check route.
+
+    All checks run on one flattened sessions frame: conflicts are groupbys
+    over (day, time, room) and (day, time, group).
     """
-    import pandas as pd
-    import re
-    from collections import defaultdict
-
-    conflicts = defaultdict(list)
-    room_usage = defaultdict(lambda: defaultdict(list))
-    group_usage = defaultdict(lambda: defaultdict(list))
-    for group, sessions in timetable.items():
-        for s in sessions:
-            key = (s["day"], s["time"])
-            room = s["room"]
-            group_id = s["group"]
-            room_usage[key][room].append((group_id, s["course"]))
-            group_usage[key][group_id].append(s["course"])
-
-    MAX_GROUPS_WITHOUT_CONFLICT = 5
-
-    # Room conflict with joint lecture exception logic
-    for key, rooms in room_usage.items():
-        for room, usage in rooms.items():
-            if room.strip().lower() in ("gym", "online"):
-                continue
-            if len(usage) > 1:
-                group_ids = [u[0].strip() for u in usage]
-                subjects = [get_subject(u[1]) for u in usage]
-                prefix_set = set(get_group_prefix(gid) for gid in group_ids)
-                subject_set = set(subjects)
-                if (
-                    len(prefix_set) == 1 and
-                    len(subject_set) == 1 and
-                    len(group_ids) <= MAX_GROUPS_WITHOUT_CONFLICT
-                ):
-                    continue  # Exception: joint lecture for same subject and group prefix
-                conflicts["Room conflict"].append((key, room, usage))
-
-    # Group conflict with exception logic
-    for key, groups in group_usage.items():
-        group_ids = [gid.strip() for gid in groups.keys()]
-        if len(groups) > 1:
-            subjects_per_group = [set(get_subject(c) for c in usage) for usage in groups.values()]
-            common_subjects = set.intersection(*subjects_per_group) if subjects_per_group else set()
-            prefixes = set(get_group_prefix(gid) for gid in group_ids)
-            if len(common_subjects) == 1 and len(prefixes) == 1 and len(group_ids) <= MAX_GROUPS_WITHOUT_CONFLICT:
-                continue  # Exception: joint lecture/group, skip as conflict
-        for group_id, usage in groups.items():
-            if len(usage) > 1:
-                conflicts["Group conflict"].append((key, group_id, [(group_id, c) for c in usage]))
-
-    # Prepare DataFrame
-    rows = []
-    for ctype, items in conflicts.items():
-        for item in items:
-            details = "; ".join(f"{a}: {b}" for a, b in item[2])
-            rows.append((ctype, item[0][0], item[0][1], item[1], details))
-    conflict_df = pd.DataFrame(rows, columns=["Conflict Type", "Day", "Time", "Entity", "Details"])
-    if not conflict_df.empty:
-        conflict_df.index += 1
-        conflict_df.reset_index(inplace=True)
-        conflict_df.rename(columns={"index": "No"}, inplace=True)
-        conflict_table = conflict_df.to_html(index=False, classes="table table-bordered table-striped table-hover")
-    else:
-        conflict_table = None
+    df = sessions_frame(timetable)
+    conflicts = room_conflicts(df, ("gym", "online"), joint_exception=True) \
+        + group_conflicts(df, joint_exception=True)
+    conflict_table = _html_table(conflicts, CONFLICT_COLUMNS)
 
-    # --- Use your old GA_Input violation logic as before ---
     violation_table = None
     if ga_input_file:
-        trimester_match = re.search(r'T(\d+)', timetable_name)
-        if trimester_match:
-            trimester_base = int(trimester_match.group(1))
-            xls = pd.ExcelFile(ga_input_file)
-            all_sheets = xls.sheet_names
-
-            def get_ep(g): return g.split("-")[0].upper()
-            def map_trimester(base, year):
-                m = {1: {1:1, 2:2, 3:3}, 2: {1:4, 2:5, 3:6}, 3:{1:7, 2:8}}
-                return m.get(year, {}).get(base)
-
-            group_course_type_count = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
-            for group, sessions in timetable.items():
-                for s in sessions:
-                    group_course_type_count[group][s["course"].strip().lower()][s["type"].strip().lower()] += 10
-
-            violations = []
-            for group in timetable:
-                ep = get_ep(group)
-                year_code = int(group.split("-")[1][:2])
-                year = 1 if year_code == 23 else 2 if year_code == 22 else 3
-                actual_trim = map_trimester(trimester_base, year)
-                if not actual_trim or actual_trim == 9 or ep not in all_sheets:
-                    continue
-                df = xls.parse(ep)
-                df.columns = [c.lower().strip() for c in df.columns]
-                if 'trimester' not in df.columns:
-                    continue
-                df = df[df['trimester'] == actual_trim]
-                df['course_name'] = df['course_name'].astype(str).str.strip().str.lower()
-
-                for _, row in df.iterrows():
-                    cname = row['course_name']
-                    if not cname or cname == 'nan':
-                        continue
-                    for typ in ['lecture', 'practice', 'lab']:
-                        sc = f"{typ}_slots"
-                        if not pd.isna(row.get(sc)) and int(row[sc]) > 0:
-                            req = int(row[sc])
-                            act = group_course_type_count[group][cname][typ]
-                            if act < req:
-                                violations.append({
-                                    "Group": group, "EP": ep, "Trimester": actual_trim,
-                                    "Course": cname, "Type": typ,
-                                    "Required": req, "Actual": act, "Missing": req - act
-                                })
-
-            violation_df = pd.DataFrame(violations)
-            if not violation_df.empty:
-                violation_df.index += 1
-                violation_df.reset_index(inplace=True)
-                violation_df.rename(columns={"index": "No"}, inplace=True)
-                violation_table = violation_df.to_html(index=False, classes="table table-bordered table-striped table-hover")
-
+        violation_table = _html_table(curriculum_violations(df, list(timetable), timetable_name, ga_input_file))
     return conflict_table, violation_table
@@ -0,0 +1,38 @@
+# benchmarks/extract_genes.py
+"""
+Micro-benchmark of extract_raw_genes on a synthetic curriculum: seconds and
+genes/second as the number of courses grows.
+
+    python -m benchmarks.extract_genes --courses 1000 5000 20000 --eps 20
+"""
+
+import argparse
+import time
+
+from scripts.data_loader import extract_raw_genes
+from tests.synthetic import synthetic_curriculum
+
+
+def main():
+    parser = argparse.ArgumentParser(description="extract_raw_genes time against curriculum size")
+    parser.add_argument("--courses", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--eps", type=int, default=20, help="Educational programmes (curriculum sheets)")
+    parser.add_argument("--groups-per-year", type=int, default=8)
+    parser.add_argument("--trimester", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    args = parser.parse_args()
+
+    print(f"{'courses':>7} | {'genes':>8} | {'seconds':>8} | {'genes/s':>10}")
+    for n_courses in args.courses:
+        groups_df, courses_df = synthetic_curriculum(n_courses, args.eps, args.groups_per_year)
+        n_courses = len(courses_df)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            genes = extract_raw_genes(groups_df, courses_df, args.trimester)
+            best = min(best, time.perf_counter() - start)
+        print(f"{n_courses:>7} | {len(genes):>8} | {best:>8.3f} | {len(genes) / best:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
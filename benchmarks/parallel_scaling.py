@@ -0,0 +1,70 @@
+# benchmarks/parallel_scaling.py
+"""
+Scaling report for the process-pool evolver: generations/second vs worker count.
+
+    python -m benchmarks.parallel_scaling 1 --input inputs/GA_Input.xlsx --workers 1 2 4 8 16 32
+"""
+
+import argparse
+import os
+import random
+import time
+
+from scripts import config
+from scripts.data_loader import preprocess_data, extract_raw_genes
+from scripts.problem import compile_problem
+from scripts.scheduler import generate_initial_population, evolve_population
+from scripts.parallel import ParallelEvolver
+
+
+def time_generations(problem, population, workers, generations):
+    """Seconds spent evolving ``generations`` generations with the given worker count."""
+    rooms = problem.teaching_rooms
+    if workers <= 1:
+        start = time.perf_counter()
+        for _ in range(generations):
+            population, _ = evolve_population(population, rooms)
+        return time.perf_counter() - start
+
+    evolver = ParallelEvolver(problem, population, workers)
+    try:
+        population = evolver.population([c.fitness for c in population])
+        start = time.perf_counter()
+        for _ in range(generations):
+            population, _ = evolver.evolve(population, rooms)
+        return time.perf_counter() - start
+    finally:
+        population = None
+        evolver.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generations/second of the GA against worker count")
+    parser.add_argument("trimester", type=int)
+    parser.add_argument("--input", default=None, help="Path to override default config.INPUT_FILE")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.input:
+        config.INPUT_FILE = args.input
+    random.seed(args.seed)
+
+    data = preprocess_data()
+    raw_genes = extract_raw_genes(data["groups"], data["courses"], args.trimester)
+    problem = compile_problem(raw_genes, data["rooms"]["Room"].tolist())
+    population = generate_initial_population(problem)
+
+    print(f"Sessions: {problem.n_sessions} | Population: {len(population)} | CPUs: {os.cpu_count()}")
+    print(f"{'workers':>7} | {'seconds':>8} | {'gen/s':>7} | {'speedup':>7}")
+    baseline = None
+    for workers in args.workers:
+        elapsed = time_generations(problem, population, workers, args.generations)
+        rate = args.generations / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>7} | {elapsed:>8.2f} | {rate:>7.2f} | {rate / baseline:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
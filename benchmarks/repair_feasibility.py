@@ -0,0 +1,89 @@
+# benchmarks/repair_feasibility.py
+"""
+Time to the first feasible schedule (zero hard penalty) with and without the
+repair operator, from the same initial population.
+
+    python -m benchmarks.repair_feasibility 1 --input inputs/GA_Input.xlsx --rates 0 0.3 1 --seconds 60
+
+Instances with more online lectures per group than evening days can never
+reach zero; the "hard <= baseline" column then shows how quickly each rate
+gets down to the best hard penalty the run without repair reached.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from scripts import config
+from scripts.data_loader import preprocess_data, extract_raw_genes
+from scripts.problem import compile_problem
+from scripts.scheduler import generate_initial_population, evolve_population
+from scripts.batch_evaluator import evaluate_population
+
+
+def best_hard(population):
+    problem = population[0].problem
+    hard, _ = evaluate_population(
+        problem,
+        np.stack([c.day_ids for c in population]),
+        np.stack([c.slot_ids for c in population]),
+        np.stack([c.room_ids for c in population]),
+    )
+    return int(hard.min())
+
+
+def trace(population, repair_rate, seconds, generations, seed):
+    """(elapsed, best hard so far) after every generation until the time or generation limit."""
+    random.seed(seed)
+    rooms = population[0].problem.teaching_rooms
+    points = [(0.0, best_hard(population))]
+    start = time.perf_counter()
+    for _ in range(generations):
+        population, _ = evolve_population(population, rooms, repair_rate)
+        points.append((time.perf_counter() - start, min(points[-1][1], best_hard(population))))
+        if points[-1][1] == 0 or points[-1][0] >= seconds:
+            break
+    return points
+
+
+def first_at_most(points, target):
+    return next((elapsed for elapsed, hard in points if hard <= target), None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-to-first-feasible schedule with and without repair")
+    parser.add_argument("trimester", type=int)
+    parser.add_argument("--input", default=None, help="Path to override default config.INPUT_FILE")
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.0, 0.3, 1.0])
+    parser.add_argument("--seconds", type=float, default=60.0, help="Time limit per rate")
+    parser.add_argument("--generations", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.input:
+        config.INPUT_FILE = args.input
+    random.seed(args.seed)
+
+    data = preprocess_data()
+    raw_genes = extract_raw_genes(data["groups"], data["courses"], args.trimester)
+    problem = compile_problem(raw_genes, data["rooms"]["Room"].tolist())
+    population = generate_initial_population(problem)
+
+    traces = {rate: trace(population, rate, args.seconds, args.generations, args.seed) for rate in args.rates}
+    baseline = traces[args.rates[0]][-1][1]
+
+    def fmt(value):
+        return f"{value:.2f}" if value is not None else "-"
+
+    print(f"Sessions: {problem.n_sessions} | Population: {len(population)} | "
+          f"initial best hard: {traces[args.rates[0]][0][1]}")
+    print(f"{'repair':>6} | {'gens':>5} | {'seconds':>7} | {'best hard':>9} | {'feasible s':>10} | {'hard <= baseline s':>18}")
+    for rate, points in traces.items():
+        print(f"{rate:>6.2f} | {len(points) - 1:>5} | {points[-1][0]:>7.2f} | {points[-1][1]:>9} | "
+              f"{fmt(first_at_most(points, 0)):>10} | {fmt(first_at_most(points, baseline)):>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# benchmarks/suite.py
+"""
+End-to-end scheduler benchmark on a seeded synthetic instance: wall time,
+evaluations/second and peak memory of every pipeline stage plus the final
+hard/soft penalties, appended as one run record to a JSON file so runs can be
+compared over time.
+
+    python -m benchmarks.suite --eps 8 --groups-per-year 6 --courses 6 --rooms 60 --output outputs/benchmarks.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from scripts import config
+from scripts.data_loader import preprocess_data, extract_raw_genes
+from scripts.evaluator import compute_penalties
+from scripts.exporter import export_to_excel
+from scripts.problem import compile_problem
+from scripts.scheduler import generate_initial_population, evolve_population, run_scheduler
+from scripts.batch_evaluator import penalties
+from tests.synthetic import synthetic_sheets, write_workbook
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """High-water mark of the process resident set size in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def measure(stages, name, fn, evaluations=None):
+    """Run ``fn()``, record its seconds, evaluations/second and the peak RSS so far under ``stages[name]``."""
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    stages[name] = {"seconds": round(seconds, 4), "peak_rss_mb": peak_rss_mb()}
+    if evaluations:
+        stages[name]["evaluations"] = evaluations
+        stages[name]["evals_per_second"] = round(evaluations / seconds, 1)
+    print(f"{name:>22} | {seconds:>8.3f} s" + (f" | {evaluations / seconds:>9.1f} evals/s" if evaluations else ""))
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def append_record(path, record):
+    """Append ``record`` to the JSON list stored at ``path``."""
+    runs = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            runs = json.load(f)
+    runs.append(record)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(runs, f, indent=2)
+
+
+def run_suite(eps, groups_per_year, courses, rooms, seed=0, trimester=1, time_budget=None, penalty_repeat=5):
+    """Benchmark every stage on one synthetic instance and return the run record."""
+    random.seed(seed)
+    stages = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = write_workbook(synthetic_sheets(eps, groups_per_year, courses, rooms, seed),
+                                  os.path.join(tmp, "synthetic.xlsx"))
+        cached = config.PARSED_CACHE_ENABLED
+        config.PARSED_CACHE_ENABLED = False  # time the real parse
+        try:
+            data = measure(stages, "preprocess_data", lambda: preprocess_data(workbook))
+        finally:
+            config.PARSED_CACHE_ENABLED = cached
+
+        raw_genes = measure(stages, "extract_raw_genes",
+                            lambda: extract_raw_genes(data["groups"], data["courses"], trimester))
+        room_names = data["rooms"]["Room"].tolist()
+        problem = compile_problem(raw_genes, room_names)
+
+        population = measure(stages, "initial_population", lambda: generate_initial_population(problem),
+                             evaluations=config.POPULATION_SIZE)
+        genes = min(population, key=lambda c: c.fitness).genes
+        measure(stages, "compute_penalties",
+                lambda: [compute_penalties(genes) for _ in range(penalty_repeat)], evaluations=penalty_repeat)
+        measure(stages, "evolve_population", lambda: evolve_population(population, problem.teaching_rooms),
+                evaluations=config.POPULATION_SIZE)
+
+        with contextlib.redirect_stdout(io.StringIO()):  # run_scheduler reports every generation
+            start = time.perf_counter()
+            best, progress = run_scheduler(raw_genes, room_names, verbose=False, workers=0, islands=0,
+                                           time_budget_seconds=time_budget)
+            seconds = time.perf_counter() - start
+        evaluations = config.POPULATION_SIZE * (len(progress) + 1)
+        stages["run_scheduler"] = {"seconds": round(seconds, 4), "peak_rss_mb": peak_rss_mb(),
+                                   "generations": len(progress), "evaluations": evaluations,
+                                   "evals_per_second": round(evaluations / seconds, 1)}
+        print(f"{'run_scheduler':>22} | {seconds:>8.3f} s | {evaluations / seconds:>9.1f} evals/s")
+        hard, soft = penalties(best)
+        fitness = best.fitness
+
+        measure(stages, "export_to_excel", lambda: export_to_excel(best, os.path.join(tmp, "timetable.xlsx")))
+
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "instance": {
+            "eps": eps, "groups_per_year": groups_per_year, "courses": courses, "rooms": rooms,
+            "seed": seed, "trimester": trimester,
+            "groups": len(problem.groups), "sessions": problem.n_sessions, "raw_genes": len(raw_genes),
+        },
+        "config": {"population_size": config.POPULATION_SIZE, "generations": config.GENERATIONS,
+                   "time_budget": time_budget},
+        "stages": stages,
+        "result": {"fitness": fitness, "hard": hard, "soft": soft},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler pipeline on a synthetic instance")
+    parser.add_argument("--eps", type=int, default=8, help="Educational programmes (curriculum sheets)")
+    parser.add_argument("--groups-per-year", type=int, default=6)
+    parser.add_argument("--courses", type=int, default=6, help="Courses per EP and trimester")
+    parser.add_argument("--rooms", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trimester", type=int, default=1)
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Run the GA for this many seconds instead of GENERATIONS")
+    parser.add_argument("--output", default=os.path.join("outputs", "benchmarks.json"),
+                        help="JSON file the run record is appended to")
+    args = parser.parse_args()
+
+    record = run_suite(args.eps, args.groups_per_year, args.courses, args.rooms, args.seed,
+                       args.trimester, args.time_budget)
+    instance, result = record["instance"], record["result"]
+    print(f"Sessions: {instance['sessions']} | Groups: {instance['groups']} | "
+          f"Hard: {result['hard']} | Soft: {result['soft']} | Fitness: {result['fitness']}")
+    append_record(args.output, record)
+    print(f"Appended run to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# benchmarks/synthetic.py
+"""
+Write a seeded synthetic GA input workbook (see ``tests/synthetic.py``).
+
+    python -m benchmarks.synthetic inputs/synthetic.xlsx --eps 12 --groups-per-year 6 --courses 6 --rooms 80
+"""
+
+import argparse
+
+from tests.synthetic import synthetic_sheets, write_workbook
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic GA input workbook")
+    parser.add_argument("output", help="Path of the .xlsx file to write")
+    parser.add_argument("--eps", type=int, default=8, help="Educational programmes (curriculum sheets)")
+    parser.add_argument("--groups-per-year", type=int, default=6)
+    parser.add_argument("--courses", type=int, default=6, help="Courses per EP and trimester")
+    parser.add_argument("--rooms", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sheets = synthetic_sheets(args.eps, args.groups_per_year, args.courses, args.rooms, args.seed)
+    write_workbook(sheets, args.output)
+    print(f"Wrote {args.output}: {len(sheets['Groups'])} groups, {len(sheets['Rooms'])} rooms, "
+          f"{sum(len(df) for name, df in sheets.items() if name not in ('Groups', 'Rooms'))} curriculum rows")
+
+
+if __name__ == "__main__":
+    main()
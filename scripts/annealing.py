@@ -0,0 +1,154 @@
+# scripts/annealing.py
+
+import math
+import random
+import time
+
+import numpy as np
+
+from scripts.problem import compile_problem
+from scripts.repair import _legal_cells
+from scripts.local_search import _group_sessions
+from scripts.anytime import BestSnapshot, ProgressThrottle
+from scripts.batch_evaluator import penalties
+from scripts.tracing import span
+from scripts.config import (
+    SA_EPOCHS,
+    SA_STEPS_PER_EPOCH,
+    SA_INITIAL_TEMPERATURE,
+    SA_COOLING,
+    SA_REHEAT_EPOCHS,
+    PROGRESS_INTERVAL_SECONDS,
+)
+
+
+def _neighbour(chromosome, legal_cells, group_sessions, rooms):
+    """
+    Apply one random move to an unpinned session (new cell, new room or a
+    swap with another unpinned session of the same group) and return the list
+    of ``(session, day, slot, room)`` that undoes it.
+    """
+    problem = chromosome.problem
+    n_slots = len(problem.slots)
+    s = problem.random_free_session()
+    if s is None:
+        return []
+    undo = [(s, int(chromosome.day_ids[s]), int(chromosome.slot_ids[s]), int(chromosome.room_ids[s]))]
+    kind = random.random()
+
+    if kind < 0.2 and not problem.session_online[s] and not problem.is_pe_session(s):
+        chromosome.move_gene(s, room=random.choice(rooms))
+    elif kind < 0.6:
+        other = random.choice(group_sessions[problem.session_group[s]])
+        undo.append((other, int(chromosome.day_ids[other]), int(chromosome.slot_ids[other]),
+                     int(chromosome.room_ids[other])))
+        _, day, slot, _ = undo[0]
+        chromosome.move_gene(s, day=undo[1][1], slot=undo[1][2])
+        chromosome.move_gene(other, day=day, slot=slot)
+    else:
+        cell = random.choice(legal_cells[s])
+        chromosome.move_gene(s, day=cell // n_slots, slot=cell % n_slots)
+    return undo
+
+
+def run_annealing(raw_genes, rooms, verbose=True, time_budget_seconds=None, snapshot=None, progress=None,
+                  stats=None):
+    """
+    Simulated annealing with reheating, behind the ``run_scheduler`` interface.
+
+    Starts from one greedy construction (``build_individual``), then applies
+    SA_STEPS_PER_EPOCH random moves per epoch with Metropolis acceptance under
+    a geometric cooling schedule. After SA_REHEAT_EPOCHS epochs without a new
+    best the temperature is raised back to half its initial value and the
+    search restarts from the best schedule. Every move is a delta update of the
+    incremental evaluator.
+
+    Returns ``(best_schedule, fitness_progress)`` with one progress entry per
+    epoch. With ``time_budget_seconds`` epochs continue past SA_EPOCHS until the
+    deadline; ``snapshot`` gets each epoch's best and can stop the run.
+    ``progress`` is throttled like run_scheduler's, with ``mean`` the fitness
+    of the current (not best) trajectory.
+    """
+    from scripts.scheduler import build_individual
+
+    problem = compile_problem(raw_genes, rooms)
+    snapshot = snapshot or BestSnapshot()
+    snapshot.start(time_budget_seconds)
+    if progress is not None:
+        progress = ProgressThrottle(progress, PROGRESS_INTERVAL_SECONDS)
+    start = time.perf_counter()
+    with span("initial_population"):
+        current = build_individual(problem)
+        current.calculate_fitness()
+    if stats is not None:
+        stats["initial_population_seconds"] = round(time.perf_counter() - start, 3)
+
+    legal = _legal_cells(problem)
+    legal_cells = [np.flatnonzero(row).tolist() for row in legal]
+    group_sessions = _group_sessions(problem)
+    rooms = problem.teaching_rooms
+
+    best = current.copy(with_evaluator=False)
+    snapshot.update(best, 0)
+    temperature = SA_INITIAL_TEMPERATURE
+    stagnant = 0
+    reheats = 0
+    fitness_progress = []
+
+    epoch = 0
+    while time_budget_seconds or epoch < SA_EPOCHS:
+        epoch += 1
+        improved = False
+        with span("epoch"):
+            for _ in range(SA_STEPS_PER_EPOCH):
+                before = current.fitness
+                undo = _neighbour(current, legal_cells, group_sessions, rooms)
+                delta = current.fitness - before
+                if delta <= 0 or random.random() < math.exp(-delta / temperature):
+                    if current.fitness < best.fitness:
+                        best = current.copy(with_evaluator=False)
+                        improved = True
+                else:
+                    for s, day, slot, room in reversed(undo):
+                        current.move_gene(s, day=day, slot=slot, room=room)
+
+        fitness_progress.append(best.fitness)
+        if improved:
+            snapshot.update(best, epoch)
+        else:
+            snapshot.progress(epoch)
+        if progress is not None:
+            progress(_progress_event(epoch, best, current.fitness, round(snapshot.elapsed(), 3)))
+        if verbose:
+            print(f"Epoch {epoch} | Temperature: {temperature:.1f} | "
+                  f"Current: {current.fitness} | Best Fitness: {best.fitness}")
+
+        if snapshot.should_stop():
+            if verbose:
+                print("Stopping: " + ("stop requested." if snapshot.stop_requested else "time budget spent."))
+            break
+
+        stagnant = 0 if improved else stagnant + 1
+        temperature *= SA_COOLING
+        if stagnant >= SA_REHEAT_EPOCHS:
+            # Reheat around the best schedule found so far
+            current = best.copy(with_evaluator=False)
+            current.calculate_fitness()
+            temperature = SA_INITIAL_TEMPERATURE / 2
+            stagnant = 0
+            reheats += 1
+
+    if progress is not None:
+        progress.flush()
+    if stats is not None:
+        stats["reheats"] = reheats
+    return best, fitness_progress
+
+
+def _progress_event(epoch, best, mean, elapsed):
+    """An epoch's progress record, built (``penalties`` included) only when the throttle sends it."""
+    def build():
+        hard, soft = penalties(best)
+        return {"generation": epoch, "best": best.fitness, "mean": mean,
+                "hard": hard, "soft": soft, "elapsed": elapsed}
+    return build
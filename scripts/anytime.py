@@ -0,0 +1,132 @@
+# scripts/anytime.py
+
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+
+class BestSnapshot:
+    """
+    Best-so-far schedule of a running search, safe to read from another thread.
+
+    The engine calls ``update`` whenever it finds a better schedule and checks
+    ``should_stop`` between generations; anyone holding the snapshot may call
+    ``get`` at any time and ``request_stop`` to end the run early.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._best = None
+        self.fitness = None
+        self.generation = 0
+        self.started = time.time()
+        self.deadline = None
+
+    def start(self, time_budget_seconds=None):
+        self.started = time.time()
+        self.deadline = self.started + time_budget_seconds if time_budget_seconds else None
+
+    def update(self, chromosome, generation):
+        """Record ``chromosome`` (copied) as the new best found at ``generation``."""
+        best = chromosome.copy(with_evaluator=False)
+        with self._lock:
+            self._best = best
+            self.fitness = best.fitness
+            self.generation = generation
+
+    def progress(self, generation):
+        with self._lock:
+            self.generation = generation
+
+    def get(self):
+        """An independent copy of the current best schedule, or None before the first generation."""
+        with self._lock:
+            best = self._best
+        return None if best is None else best.copy(with_evaluator=False)
+
+    def request_stop(self):
+        self._stop.set()
+
+    @property
+    def stop_requested(self):
+        return self._stop.is_set()
+
+    def should_stop(self):
+        """True once a stop was requested or the time budget is spent."""
+        return self._stop.is_set() or (self.deadline is not None and time.time() >= self.deadline)
+
+    def elapsed(self):
+        return time.time() - self.started
+
+
+class ProgressThrottle:
+    """
+    Rate-limited ``progress`` callback: engines pass each event as a
+    zero-argument function, and only events at least ``interval`` seconds
+    apart are built (their ``penalties`` call included) and forwarded.
+    ``flush`` forwards the last skipped event, so the final generation is
+    always reported.
+    """
+
+    def __init__(self, callback, interval):
+        self.callback = callback
+        self.interval = interval
+        self._last = None
+        self._pending = None
+
+    def __call__(self, make_event):
+        now = time.monotonic()
+        if self._last is not None and now - self._last < self.interval:
+            self._pending = make_event
+            return
+        self._last = now
+        self._pending = None
+        self.callback(make_event())
+
+    def flush(self):
+        if self._pending is not None:
+            make_event, self._pending = self._pending, None
+            self.callback(make_event())
+
+
+@contextmanager
+def stop_on_signals(snapshot, signals=(signal.SIGINT, signal.SIGTERM)):
+    """
+    Turn SIGINT/SIGTERM into ``snapshot.request_stop()`` while the block runs, so
+    the engine finishes its generation and returns the best schedule instead of
+    dying. A second signal falls back to the previous handler. Only the main
+    thread can install handlers; elsewhere this is a no-op.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield snapshot
+        return
+
+    previous = {}
+
+    def handler(signum, frame):
+        if snapshot.stop_requested:
+            signal.signal(signum, previous[signum])
+            signal.raise_signal(signum)
+            return
+        print(f"\n⏸️  Received {signal.Signals(signum).name}: finishing up with the best schedule so far...")
+        snapshot.request_stop()
+
+    for signum in signals:
+        previous[signum] = signal.signal(signum, handler)
+    try:
+        yield snapshot
+    finally:
+        for signum, old in previous.items():
+            signal.signal(signum, old)
+
+
+def ignore_interrupts():
+    """
+    Pool/island worker initializer: leave SIGINT to the main process, which
+    stops the run cleanly, and undo a ``stop_on_signals`` SIGTERM handler
+    inherited through fork so that terminating the pool still works.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
@@ -0,0 +1,134 @@
+# scripts/batch_evaluator.py
+
+import numpy as np
+from scripts.tracing import count
+
+def _session_tables(problem):
+    """NumPy copies of the per-session descriptors, built once per problem."""
+    tables = getattr(problem, "_batch_tables", None)
+    if tables is None or len(tables["group"]) != problem.n_sessions:
+        tables = {
+            "group": np.asarray(problem.session_group, dtype=np.int64),
+            "online": np.asarray(problem.session_online, dtype=bool),
+            "online_lecture": np.asarray(problem.session_online_lecture, dtype=bool),
+            "joint": np.asarray(problem.session_joint, dtype=np.int64),
+            "pe": np.asarray([problem.course_is_pe[c] for c in problem.session_course], dtype=bool),
+            "joint_is_lecture": np.asarray(problem.joint_is_lecture, dtype=bool),
+            "group_day_ok": np.asarray(problem.group_day_ok, dtype=bool).reshape(-1, len(problem.days)),
+            "group_slot_ok": np.asarray(problem.group_slot_ok, dtype=bool).reshape(-1, len(problem.slots)),
+            "is_online_slot": np.asarray(problem.is_online_slot, dtype=bool),
+            "slot_hours": np.asarray(problem.slot_hours, dtype=np.int64),
+        }
+        problem._batch_tables = tables
+    return tables
+
+def _duplicates_per_row(keys):
+    """Number of entries per row whose key already occurs earlier in the row."""
+    keys = np.sort(keys, axis=1)
+    return np.count_nonzero(keys[:, 1:] == keys[:, :-1], axis=1)
+
+def _segments(sorted_keys):
+    """Start and end offsets of the runs of equal values in a sorted 1-D array."""
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    ends = np.r_[starts[1:], len(sorted_keys)]
+    return starts, ends
+
+def evaluate_population(problem, day_ids, slot_ids, room_ids):
+    """
+    Hard and soft penalties of a whole population at once.
+
+    ``day_ids``, ``slot_ids`` and ``room_ids`` are (population x sessions) id
+    arrays; the result is two int64 arrays with the totals ``compute_penalties``
+    gives for each row.
+    """
+    t = _session_tables(problem)
+    days = np.asarray(day_ids, dtype=np.int64)
+    slots = np.asarray(slot_ids, dtype=np.int64)
+    rooms = np.asarray(room_ids, dtype=np.int64)
+    n_pop, n_sessions = days.shape
+    count("fitness_evaluations", n_pop)
+    n_days, n_slots, n_rooms = len(problem.days), len(problem.slots), len(problem.rooms)
+    group = t["group"][None, :]
+    rows = np.arange(n_pop, dtype=np.int64)[:, None]
+
+    hard = np.zeros(n_pop, dtype=np.int64)
+    soft = np.full(n_pop, problem.precedence_penalty, dtype=np.int64)
+    if n_sessions == 0:
+        return hard, soft
+
+    # --- Time range and slot validation ---
+    evening = t["is_online_slot"][slots]
+    day_bad = ~t["group_day_ok"][group, days]
+    slot_bad = ~t["group_slot_ok"][group, slots]
+    slot_penalty = np.where(t["online_lecture"][None, :], 1000 * ~evening, 100 * day_bad + 100 * slot_bad)
+    hard += slot_penalty.sum(axis=1)
+
+    # --- GROUP CONFLICTS: one session per group, day and slot ---
+    group_day = group * n_days + days
+    hard += 1000 * _duplicates_per_row(group_day * n_slots + slots)
+
+    # --- One session per group and day in the evening (online) slots ---
+    unique_fill = -1 - np.arange(n_sessions, dtype=np.int64)[None, :]
+    hard += 1000 * _duplicates_per_row(np.where(evening, group_day, unique_fill))
+
+    offline = ~t["online"]
+    if offline.any():
+        off_rows = np.broadcast_to(rows, (n_pop, n_sessions))[:, offline].ravel()
+        off_days = days[:, offline].ravel()
+        off_slots = slots[:, offline].ravel()
+        off_group = np.broadcast_to(group, (n_pop, n_sessions))[:, offline].ravel()
+
+        # --- ROOM CONFLICTS (offline only), joint lectures and gym PE excepted ---
+        off_rooms = rooms[:, offline].ravel()
+        joint = np.broadcast_to(t["joint"][None, :], (n_pop, n_sessions))[:, offline].ravel()
+        pe = np.broadcast_to(t["pe"][None, :], (n_pop, n_sessions))[:, offline].ravel()
+        bucket = ((off_rows * n_rooms + off_rooms) * n_days + off_days) * n_slots + off_slots
+        order = np.lexsort((joint, bucket))
+        bucket, joint, pe, off_rooms_sorted = bucket[order], joint[order], pe[order], off_rooms[order]
+        starts, ends = _segments(bucket)
+        size = ends - starts
+        room_is_gym = np.asarray(problem.room_is_gym, dtype=bool)
+        gym_pe = room_is_gym[off_rooms_sorted[starts]] & np.logical_and.reduceat(pe, starts)
+        single_lecture = (joint[starts] == joint[ends - 1]) & t["joint_is_lecture"][joint[starts]]
+        penalty = np.where(single_lecture, np.maximum(0, size - 5), size - 1) * 1000
+        penalty[gym_pe] = 0
+        bucket_rows = bucket[starts] // (n_rooms * n_days * n_slots)
+        hard += np.bincount(bucket_rows, weights=penalty, minlength=n_pop).astype(np.int64)
+
+        # --- SOFT: Gaps in group schedule per day (offline sessions only) ---
+        hours = t["slot_hours"][off_slots]
+        span = int(t["slot_hours"].max()) + 1
+        day_key = (off_rows * len(problem.groups) + off_group) * n_days + off_days
+        hour_key = np.unique(day_key * span + hours)
+        day_key, hours = hour_key // span, hour_key % span
+        starts, ends = _segments(day_key)
+        gaps = hours[ends - 1] - hours[starts] + 1 - (ends - starts)
+        gap_rows = day_key[starts] // (len(problem.groups) * n_days)
+        soft += 100 * np.bincount(gap_rows, weights=gaps, minlength=n_pop).astype(np.int64)
+
+    return hard, soft
+
+def score_population(population):
+    """Set ``fitness`` on every chromosome of a population with one batched evaluation."""
+    if not population:
+        return population
+    problem = population[0].problem
+    hard, soft = evaluate_population(
+        problem,
+        np.stack([c.day_ids for c in population]),
+        np.stack([c.slot_ids for c in population]),
+        np.stack([c.room_ids for c in population]),
+    )
+    for chromosome, total in zip(population, (hard + soft).tolist()):
+        chromosome.fitness = total
+    return population
+
+def penalties(chromosome):
+    """``(hard, soft)`` of a single chromosome."""
+    hard, soft = evaluate_population(
+        chromosome.problem,
+        chromosome.day_ids[None, :],
+        chromosome.slot_ids[None, :],
+        chromosome.room_ids[None, :],
+    )
+    return int(hard[0]), int(soft[0])
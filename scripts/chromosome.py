@@ -1,41 +1,98 @@
 # scripts/chromosome.py
 
 import random
-from typing import List
-from copy import deepcopy
-from scripts.gene import Gene
-from scripts.evaluator import evaluate_fitness
+import numpy as np
+from scripts.gene import GeneView
+from scripts.evaluator import IncrementalEvaluator
+from scripts.tracing import count
+from scripts.config import MAX_ROOM_IDS
+
+# Column dtypes: days and slots fit a byte, room ids include elective combinations
+DAY_DTYPE = np.int8
+SLOT_DTYPE = np.int8
+ROOM_DTYPE = np.int32
+# ProblemInstance.room_id never hands out an id the room column cannot hold
+assert MAX_ROOM_IDS - 1 <= np.iinfo(ROOM_DTYPE).max
 
 class Chromosome:
-    def __init__(self, genes: List[Gene]):
-        self.genes = genes  # list of Gene objects
+    def __init__(self, problem, day_ids, slot_ids, room_ids):
+        self.problem = problem  # shared ProblemInstance (session descriptors)
+        self.day_ids = np.asarray(day_ids, dtype=DAY_DTYPE)  # per-session day / slot / room ids
+        self.slot_ids = np.asarray(slot_ids, dtype=SLOT_DTYPE)
+        self.room_ids = np.asarray(room_ids, dtype=ROOM_DTYPE)
         self.fitness = None
+        self.evaluator = None  # built lazily by calculate_fitness
+        self.unassigned = []   # sessions construction could not place without a conflict
+        self._genes = None
+
+    # Gene-like views with names, for export and reporting
+    @property
+    def genes(self):
+        if self._genes is None:
+            self._genes = [GeneView(self, i) for i in range(len(self.day_ids))]
+        return self._genes
+
+    # Independent copy: three buffer copies plus, optionally, the evaluator's counters
+    def copy(self, with_evaluator=True):
+        clone = Chromosome(self.problem, self.day_ids.copy(), self.slot_ids.copy(), self.room_ids.copy())
+        clone.fitness = self.fitness
+        if with_evaluator and self.evaluator is not None:
+            clone.evaluator = self.evaluator.copy(clone.day_ids, clone.slot_ids, clone.room_ids)
+        return clone
 
     # Evaluate fitness score using constraint logic
     def calculate_fitness(self):
-        self.fitness = evaluate_fitness(self.genes)
+        # Full evaluation only once; later moves are applied incrementally
+        if self.evaluator is None:
+            self.evaluator = IncrementalEvaluator(self.problem, self.day_ids, self.slot_ids, self.room_ids)
+        self.fitness = self.evaluator.total
         return self.fitness
 
-    # Randomly mutate a gene's time, day, or room
+    # Change a session's day, slot or room and re-score only the touched slots
+    def move_gene(self, i, day=None, slot=None, room=None):
+        if self.evaluator is not None:
+            self.evaluator.remove(i)
+        if day is not None:
+            self.day_ids[i] = day
+        if slot is not None:
+            self.slot_ids[i] = slot
+        if room is not None:
+            self.room_ids[i] = room
+        if self.evaluator is not None:
+            self.evaluator.add(i)
+            self.fitness = self.evaluator.total
+            count("delta_evaluations")
+        else:
+            self.fitness = None  # stale until re-scored
+
+    # Randomly mutate a gene's time, day, or room (never a pinned session's)
     def mutate(self, timeslots, days, rooms):
-        gene = random.choice(self.genes)
-        if "physical education" in gene.course.lower() or gene.course.strip().upper() == "PE":
+        i = self.problem.random_free_session()
+        if i is None:
+            return
+        if self.problem.is_pe_session(i):
             # PE sessions keep the room fixed so only time or day may change
             attr = random.choice(["time", "day"])
         else:
             attr = random.choice(["time", "day", "room"])
+        count("mutations." + attr)
         if attr == "time":
-            gene.time = random.choice(timeslots)
+            self.move_gene(i, slot=random.choice(timeslots))
         elif attr == "day":
-            gene.day = random.choice(days)
+            self.move_gene(i, day=random.choice(days))
         elif attr == "room":
-            gene.room = random.choice(rooms)
+            self.move_gene(i, room=random.choice(rooms))
 
-    # One-point crossover to create a new offspring
+    # One-point crossover to create a new offspring; pinned sessions hold the
+    # same placement in every chromosome, so the child keeps them too
     def crossover(self, other: 'Chromosome') -> 'Chromosome':
-        point = random.randint(1, len(self.genes) - 1)
-        child_genes = self.genes[:point] + other.genes[point:]
-        return Chromosome(deepcopy(child_genes))
+        point = random.randint(1, len(self.day_ids) - 1)
+        return Chromosome(
+            self.problem,
+            np.concatenate((self.day_ids[:point], other.day_ids[point:])),
+            np.concatenate((self.slot_ids[:point], other.slot_ids[point:])),
+            np.concatenate((self.room_ids[:point], other.room_ids[point:])),
+        )
 
     def __str__(self):
         sorted_genes = sorted(self.genes, key=lambda g: (g.group, g.day, g.time))
@@ -8,11 +8,57 @@ GENERATIONS = 50
 MUTATION_RATE = 0.15      
 CROSSOVER_RATE = 0.9    
 EARLY_STOP_GENERATIONS = 3
+PARALLEL_WORKERS = 0     # >1 breeds and scores children on a process pool
+BATCH_SPLIT_ATTEMPTS = 5  # max sub-batches a joint lecture is split into before giving up
+REPAIR_RATE = 0.0         # share of children passed through the repair operator (0 = off)
+REPAIR_MAX_MOVES = 50     # sessions the repair operator may move per child
+MAX_ROOM_IDS = 1_000_000  # room table size (rooms + elective combinations); must fit chromosome.ROOM_DTYPE
+
+# Memetic stage: local search on the elite every few generations and on the final result
+LOCAL_SEARCH = "none"            # "none" or a name in local_search.LOCAL_SEARCHES
+LOCAL_SEARCH_INTERVAL = 5        # generations between elite improvements
+LOCAL_SEARCH_ELITE = 2           # fittest individuals improved each time
+LOCAL_SEARCH_SECONDS = 0.5       # time budget per elite improvement
+LOCAL_SEARCH_FINAL_SECONDS = 5.0 # time budget for the returned schedule
+
+# Search engine: "ga" (run_scheduler) or "sa" (annealing.run_annealing)
+ENGINE = "ga"
+SA_EPOCHS = 200                  # progress is reported once per epoch
+SA_STEPS_PER_EPOCH = 2000
+SA_INITIAL_TEMPERATURE = 100.0  # accepts a +100 gap hour often, a +1000 clash almost never
+SA_COOLING = 0.97                # temperature factor per epoch
+SA_REHEAT_EPOCHS = 20            # epochs without a new best before reheating
+
+# Island model (ISLANDS > 1 runs one sub-population per process)
+ISLANDS = 0
+MIGRATION_INTERVAL = 5        # generations between migrations
+MIGRATION_SIZE = 2            # best individuals sent per island
+MIGRATION_TOPOLOGY = "ring"   # "ring" or "full"
+ISLAND_EARLY_STOP_EPOCHS = 3  # migration epochs without a new global best
+
+# Background generation jobs of the web app (app/jobs.py)
+JOB_CONCURRENCY = 1      # generations running at the same time
+JOB_QUEUE_DEPTH = 8      # jobs allowed to wait for a slot; more are rejected
+JOB_HISTORY = 50         # finished jobs kept on disk
+PROGRESS_INTERVAL_SECONDS = 0.5  # least time between two progress events of a run
+
+# Finished web generations, keyed by workbook hash + trimester + these settings (scripts/result_cache.py)
+RESULT_CACHE_FOLDER = os.path.join("outputs", "cache")
+RESULT_CACHE_MAX_BYTES = 200 * 1024 * 1024  # least recently used entries are evicted beyond this
+
+# Parsed workbooks (sheets + preprocessed frames), keyed by workbook content (scripts/parsed_cache.py)
+PARSED_CACHE_ENABLED = True
+PARSED_CACHE_FOLDER = os.path.join("outputs", "parsed")
+PARSED_CACHE_MAX_ENTRIES = 16  # least recently used workbooks are evicted beyond this
+
+# Incremental re-scheduling from a previous timetable (scripts/incremental.py)
+INCREMENTAL_TIME_BUDGET = 3.0  # seconds of search over the released sessions
+
+RANDOM_SEED = None  # fixed seed for reproducible runs; None draws a fresh one each run
 
 INPUT_FILE = "inputs/Input_File_Template.xlsx"
-def get_output_paths(trimester: int):
+def get_output_paths(trimester: int, folder: str = "outputs"):
     """Return JSON and Excel output paths for a given trimester."""
-    folder = "outputs"
     os.makedirs(folder, exist_ok=True)
 
     json_path = os.path.join(folder, f"timetable_T{trimester}.json")
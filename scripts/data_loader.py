@@ -1,33 +1,48 @@
 # scripts/data_loader.py
 
 import pandas as pd
-from scripts.config import (
-    INPUT_FILE, EXCLUDED_COURSES, EXCLUDED_ROOMS, CURRENT_YEAR
-)
-
-def load_excel_data():
-    """Load all relevant sheets from GA_input.xlsx"""
-    xl = pd.ExcelFile(INPUT_FILE)
-    sheets = {sheet_name: xl.parse(sheet_name) for sheet_name in xl.sheet_names}
+from scripts import config
+from scripts.parsed_cache import ParsedInputCache
+from scripts.pinning import PINNED_SHEET
+from scripts.tracing import traced
+
+def parse_workbook(source):
+    """Parse every sheet of a workbook (path or binary file) into a dict of DataFrames"""
+    xl = pd.ExcelFile(source)
+    return {sheet_name: xl.parse(sheet_name) for sheet_name in xl.sheet_names}
+
+def load_excel_data(source=None):
+    """Load all sheets of the input workbook (config.INPUT_FILE by default), through the parsed-input cache"""
+    sheets, _ = ParsedInputCache().load(source or config.INPUT_FILE, parse_workbook)
     return sheets
 
 def determine_group_year(group_name: str) -> int:
     """Infer year of the group from its name like 'IT-2201'"""
     try:
         admission_year = int(group_name.split("-")[1][:2]) + 2000
-        study_year = CURRENT_YEAR - admission_year + 1
+        study_year = config.CURRENT_YEAR - admission_year + 1
         return study_year
     except Exception:
         return -1  # fallback if parsing fails
 
-def preprocess_data():
-    """Load, filter, and structure input data"""
-    data = load_excel_data()
+def preprocess_data(source=None):
+    """
+    Load, filter, and structure input data. The workbook is only parsed and
+    preprocessed when its content (or the exclusion/year settings) changed
+    since the last run; otherwise the frames come from the parsed-input cache.
+    """
+    _, frames = ParsedInputCache().load(source or config.INPUT_FILE, parse_workbook, build_frames)
+    return frames
 
-    groups_df = data.get("Groups")
+def build_frames(data):
+    """
+    Filter and structure the parsed sheets into groups/courses/rooms/instructors
+    frames. Settings are read at call time, like the parsed-input cache key.
+    """
+    groups_df = data.get("Groups").copy()
     curriculum_sheets = []
     for sheet_name, df in data.items():
-        if sheet_name not in ["Groups", "Rooms", "Instructors"]:
+        if sheet_name not in ["Groups", "Rooms", "Instructors", PINNED_SHEET]:
             df = df.copy()
             df["EP"] = sheet_name
             curriculum_sheets.append(df)
@@ -46,11 +61,11 @@ def preprocess_data():
     instructors_df = data.get("Instructors")
 
     # Filter out excluded rooms
-    rooms_df = rooms_df[~rooms_df["Room"].isin(EXCLUDED_ROOMS)]
+    rooms_df = rooms_df[~rooms_df["Room"].isin(config.EXCLUDED_ROOMS)]
 
     # Filter out excluded courses
     def is_valid_course(course):
-        return not any(x in str(course) for x in EXCLUDED_COURSES)
+        return not any(x in str(course) for x in config.EXCLUDED_COURSES)
     courses_df = courses_df[courses_df["course_name"].apply(is_valid_course)]
 
     # Add year info to groups
@@ -60,16 +75,21 @@ def preprocess_data():
         "groups": groups_df,
         "courses": courses_df,
         "rooms": rooms_df,
-        "instructors": instructors_df
+        "instructors": instructors_df,
+        "pinned": data.get(PINNED_SHEET),
     }
 
 
+@traced("extract_genes")
 def extract_raw_genes(groups_df, courses_df, trimester):
     """
     Advanced gene extraction: joint lectures, delivery_mode, batching
-    """
-    raw_genes = []
 
+    The curriculum is merged once with the (EP, study year) cohorts of the
+    groups instead of being re-filtered per cohort and per joint lecture.
+    Genes come out in curriculum order: the practice then lab sessions of each
+    course row for every group of its cohort, followed by the joint lectures.
+    """
     group_name_col = [c for c in groups_df.columns if "group" in c.lower()][0]
     course_name_col = "course_name"
     trimester_col = [c for c in courses_df.columns if "trimester" in c.lower()][0]
@@ -83,82 +103,54 @@ def extract_raw_genes(groups_df, courses_df, trimester):
 
     # Group groups by programme and study year
     groups_by_ep_year = {}
-    for _, g_row in groups_df.iterrows():
-        gname = g_row[group_name_col]
+    for gname in groups_df[group_name_col]:
         ep = get_ep(gname).upper().strip()
-        study_year = CURRENT_YEAR - admission_year(gname) + 1
+        study_year = config.CURRENT_YEAR - admission_year(gname) + 1
         groups_by_ep_year.setdefault((ep, study_year), []).append(gname)
+    cohort_groups = list(groups_by_ep_year.values())
+    cohorts = pd.DataFrame(
+        [(i, ep, (study_year - 1) * 3 + trimester) for i, (ep, study_year) in enumerate(groups_by_ep_year)],
+        columns=["cohort", "EP", "curriculum_trimester"],
+    )
 
     weeks_per_trimester = 10
 
-    # Aggregate joint lecture info
-    joint_lecture_slots = {}
-    joint_lecture_groups = {}
-
-    for (ep, study_year), g_list in groups_by_ep_year.items():
-        curriculum_trimester = (study_year - 1) * 3 + trimester
-        ep_courses = courses_df[
-            (courses_df["EP"] == ep) &
-            (courses_df[trimester_col] == curriculum_trimester)
-        ]
-        # Print for debug:
-        # print(f"EP: {ep} | Year: {study_year} | Trim: {curriculum_trimester} | Groups: {g_list} | Courses: {len(ep_courses)}")
-
-        type_to_column = {
-            "Lecture": "lecture_slots",
-            "Practice": "practice_slots",
-            "Lab": "lab_slots"
-        }
-
-        for _, c_row in ep_courses.iterrows():
-            course = c_row[course_name_col]
-            delivery = str(c_row.get(delivery_col)).strip().lower() if delivery_col and pd.notnull(c_row.get(delivery_col)) else "offline"
-            lec_val = c_row.get("lecture_slots", 0)
-            prac_val = c_row.get("practice_slots", 0)
-            lab_val = c_row.get("lab_slots", 0)
-            lec_total = int(lec_val) if pd.notnull(lec_val) else 0
-            prac_total = int(prac_val) if pd.notnull(prac_val) else 0
-            lab_total = int(lab_val) if pd.notnull(lab_val) else 0
-
-            lec_pw = lec_total // weeks_per_trimester
-            prac_pw = prac_total // weeks_per_trimester
-            lab_pw = lab_total // weeks_per_trimester
-
-            # Collect joint lectures
-            if lec_pw > 0:
-                joint_lecture_slots[(ep, study_year, course)] = lec_pw
-                joint_lecture_groups[(ep, study_year, course)] = g_list
-
-            if prac_pw > 0:
-                for g in g_list:
-                    for _ in range(prac_pw):
-                        raw_genes.append({
-                            "group": g,
-                            "course": course,
-                            "type": "Practice",
-                            "delivery_mode": "offline",
-                        })
-
-            if lab_pw > 0:
-                for g in g_list:
-                    for _ in range(lab_pw):
-                        raw_genes.append({
-                            "group": g,
-                            "course": course,
-                            "type": "Lab",
-                            "delivery_mode": "offline",
-                        })
-
-    # After all, build lecture genes as joint (batch by 5 if offline, all if online)
-    for (ep, study_year, course), slots in joint_lecture_slots.items():
-        row = courses_df[
-            (courses_df["EP"] == ep)
-            & (courses_df[trimester_col] == (study_year - 1) * 3 + trimester)
-            & (courses_df[course_name_col] == course)
-        ].iloc[0]
-        delivery = str(row.get(delivery_col)).strip().lower() if delivery_col and pd.notnull(row.get(delivery_col)) else "offline"
-
-        groups = joint_lecture_groups[(ep, study_year, course)]
+    # One row per course row of each cohort, in (cohort, curriculum row) order
+    courses = pd.DataFrame({
+        "row": range(len(courses_df)),
+        "EP": courses_df["EP"].to_numpy(),
+        "curriculum_trimester": courses_df[trimester_col].to_numpy(),
+        "course": courses_df[course_name_col].to_numpy(),
+    })
+    for kind, column in (("lecture", "lecture_slots"), ("practice", "practice_slots"), ("lab", "lab_slots")):
+        total = courses_df[column].fillna(0).astype(int).to_numpy() if column in courses_df.columns else 0
+        courses[kind] = total // weeks_per_trimester
+    if delivery_col:
+        delivery = courses_df[delivery_col]
+        courses["delivery"] = delivery.astype(str).str.strip().str.lower().where(delivery.notna(), "offline").to_numpy()
+    else:
+        courses["delivery"] = "offline"
+    table = courses.merge(cohorts, on=["EP", "curriculum_trimester"]).sort_values(["cohort", "row"], kind="stable")
+
+    raw_genes = []
+    for cohort, course, practice, lab in zip(table["cohort"], table["course"], table["practice"], table["lab"]):
+        for session_type, per_week in (("Practice", practice), ("Lab", lab)):
+            for g in cohort_groups[cohort] if per_week > 0 else ():
+                raw_genes.extend(
+                    {"group": g, "course": course, "type": session_type, "delivery_mode": "offline"}
+                    for _ in range(per_week)
+                )
+
+    # Joint lectures: a course listed twice keeps its first position, its last
+    # weekly count and the delivery mode of its first row
+    by_course = ["cohort", "course"]
+    lecture_slots = table[table["lecture"] > 0].groupby(by_course, sort=False)["lecture"].last()
+    lecture_delivery = table.groupby(by_course, sort=False)["delivery"].first()
+
+    # Build lecture genes as joint (batch by 5 if offline, all if online)
+    for (cohort, course), slots in lecture_slots.items():
+        delivery = lecture_delivery[(cohort, course)]
+        groups = cohort_groups[cohort]
         batches = [groups] if delivery == "online" else [groups[i:i+5] for i in range(0, len(groups), 5)]
 
         for _ in range(slots):
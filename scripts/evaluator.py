@@ -1,4 +1,5 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
+from scripts.tracing import count
 from scripts.config import (
     GROUP_YEAR_DAYS,
     FIRST_YEAR_TIMESLOTS,
@@ -13,6 +14,7 @@ def evaluate_fitness(genes):
 
 def compute_penalties(genes):
     """Calculate hard and soft penalties for a list of genes."""
+    count("fitness_evaluations")
     hard_penalty = 0
     soft_penalty = 0
 
@@ -122,3 +124,120 @@ def compute_penalties(genes):
             soft_penalty += gaps * 100
 
     return hard_penalty, soft_penalty
+
+
+def _room_bucket_penalty(problem, room, joint_keys):
+    """Hard penalty of one (room, day, slot) bucket given a Counter of its joint-lecture keys."""
+    size = sum(joint_keys.values())
+    if size <= 1:
+        return 0
+    # Gym (PE) is exempt from conflicts
+    if problem.room_is_gym[room] and all(problem.joint_is_pe[j] for j in joint_keys):
+        return 0
+    # Allow joint lectures (<=5 groups for same course/EP/year/type)
+    if len(joint_keys) == 1 and problem.joint_is_lecture[next(iter(joint_keys))]:
+        return 1000 * max(0, size - 5)
+    return 1000 * (size - 1)
+
+def _bump(counter, key, step):
+    counter[key] += step
+    if not counter[key]:
+        del counter[key]
+
+def _gap_hours(hours):
+    """Idle hours between the first and last offline session of a group's day."""
+    if not hours:
+        return 0
+    return max(hours) - min(hours) + 1 - len(hours)
+
+
+class IncrementalEvaluator:
+    """
+    Occupancy counters for one chromosome, so that moving a single session only
+    re-scores the buckets at its old and new position.
+
+    Totals always match ``compute_penalties`` for the same schedule; sessions must
+    be moved through ``remove``/``add`` (see ``Chromosome.move_gene``).
+    """
+
+    def __init__(self, problem, day_ids, slot_ids, room_ids):
+        self.problem = problem
+        self.day_ids = day_ids
+        self.slot_ids = slot_ids
+        self.room_ids = room_ids
+        self.n_days = len(problem.days)
+        self.n_slots = len(problem.slots)
+
+        self.hard = 0
+        self.soft = problem.precedence_penalty  # depends on session order only, never on moves
+        self.group_slots = Counter()                      # (group, day, slot) -> sessions
+        self.room_slots = defaultdict(Counter)            # (room, day, slot) -> joint key -> sessions
+        self.evening_slots = Counter()                    # (group, day) -> sessions at online times
+        self.offline_hours = defaultdict(Counter)         # (group, day) -> hour -> offline sessions
+
+        count("fitness_evaluations")
+        for i in range(problem.n_sessions):
+            self.add(i)
+
+    @property
+    def total(self):
+        return self.hard + self.soft
+
+    def copy(self, day_ids, slot_ids, room_ids):
+        """Counters of this evaluator, bound to a copy of the chromosome's columns."""
+        clone = IncrementalEvaluator.__new__(IncrementalEvaluator)
+        clone.problem = self.problem
+        clone.day_ids, clone.slot_ids, clone.room_ids = day_ids, slot_ids, room_ids
+        clone.n_days, clone.n_slots = self.n_days, self.n_slots
+        clone.hard, clone.soft = self.hard, self.soft
+        clone.group_slots = self.group_slots.copy()
+        clone.room_slots = defaultdict(Counter, {k: v.copy() for k, v in self.room_slots.items() if v})
+        clone.evening_slots = self.evening_slots.copy()
+        clone.offline_hours = defaultdict(Counter, {k: v.copy() for k, v in self.offline_hours.items() if v})
+        return clone
+
+    def add(self, i):
+        """Account for session ``i`` at its current day/slot/room."""
+        self._update(i, 1)
+
+    def remove(self, i):
+        """Take session ``i`` out of its current day/slot/room."""
+        self._update(i, -1)
+
+    def _update(self, i, step):
+        p = self.problem
+        group = p.session_group[i]
+        day, slot = int(self.day_ids[i]), int(self.slot_ids[i])
+
+        # --- Time range and slot validation ---
+        if p.session_online_lecture[i]:
+            if not p.is_online_slot[slot]:
+                self.hard += step * 1000
+        else:
+            if not p.group_day_ok[group][day]:
+                self.hard += step * 100
+            if not p.group_slot_ok[group][slot]:
+                self.hard += step * 100
+
+        key_day = group * self.n_days + day
+        key_group = key_day * self.n_slots + slot
+        before = self.group_slots[key_group]
+        self.group_slots[key_group] = before + step
+        self.hard += 1000 * (max(0, before + step - 1) - max(0, before - 1))
+
+        if p.is_online_slot[slot]:
+            before = self.evening_slots[key_day]
+            self.evening_slots[key_day] = before + step
+            self.hard += 1000 * (max(0, before + step - 1) - max(0, before - 1))
+
+        if not p.session_online[i]:
+            room = int(self.room_ids[i])
+            bucket = self.room_slots[(room * self.n_days + day) * self.n_slots + slot]
+            self.hard -= _room_bucket_penalty(p, room, bucket)
+            _bump(bucket, p.session_joint[i], step)
+            self.hard += _room_bucket_penalty(p, room, bucket)
+
+            hours = self.offline_hours[key_day]
+            self.soft -= 100 * _gap_hours(hours)
+            _bump(hours, p.slot_hours[slot], step)
+            self.soft += 100 * _gap_hours(hours)
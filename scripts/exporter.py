@@ -1,10 +1,11 @@
 import json
-import pandas as pd
 from pathlib import Path
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+from openpyxl.styles.borders import DEFAULT_BORDER
 from openpyxl.utils import get_column_letter
-from openpyxl import load_workbook
+from openpyxl import Workbook
 import os
+from scripts.tracing import traced
 
 def is_physical_education(course_name):
     name = str(course_name).lower().strip()
@@ -20,6 +21,7 @@ def export_schedule(chromosome, json_path, excel_path):
     export_to_json(chromosome, json_path)
     export_to_excel(chromosome, excel_path)
 
+@traced("export")
 def export_to_json(chromosome, path):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     data = chromosome.to_json()
@@ -35,14 +37,59 @@ def export_to_json(chromosome, path):
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
-def export_to_excel(chromosome, path):
-    thin_border = Border(
-        left=Side(style='thin'), right=Side(style='thin'),
-        top=Side(style='thin'), bottom=Side(style='thin')
-    )
-    header_fill = PatternFill(start_color="C0C0C0", end_color="C0C0C0", fill_type="solid")
-
-    rows = []
+# --- GROUP SHEET LAYOUT ---
+COLUMNS = ["Day of the week", "Time", "Discipline", "Classroom", "Type", "Lecturer"]
+DAY_ORDER = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+SIGNATURE = "Director Of Academic Affairs Department __________"
+
+THIN_BORDER = Border(
+    left=Side(style='thin'), right=Side(style='thin'),
+    top=Side(style='thin'), bottom=Side(style='thin')
+)
+HEADER_FILL = PatternFill(start_color="C0C0C0", end_color="C0C0C0", fill_type="solid")
+TITLE_FONT = Font(name="Times New Roman", size=12, bold=True)
+HEADER_FONT = Font(name="Times New Roman", bold=True, size=7)
+DAY_FONT = Font(name="Times New Roman", size=11)
+CELL_FONT = Font(name="Times New Roman", size=7)
+SIGNATURE_FONT = Font(name="Times New Roman", size=10)
+CENTER = Alignment(horizontal="center")
+CENTER_MIDDLE = Alignment(horizontal='center', vertical='center')
+CELL_ALIGNMENT = Alignment(wrap_text=True, horizontal="center", vertical="top")
+RIGHT = Alignment(horizontal="right")
+
+
+def style_table(wb):
+    """
+    Register each cell style of the group sheets in ``wb`` once, as a named
+    style, and return their names by role. Assigning a name to ``cell.style``
+    copies the registered style onto the cell in one step, instead of
+    re-hashing a font, alignment, border and fill for every cell.
+    """
+    def style(name, font, alignment, border=DEFAULT_BORDER, fill=None):
+        # Borderless cells share the workbook's default border, as plain cells do
+        named = NamedStyle(name=f"Timetable {name}", font=font, alignment=alignment, border=border)
+        if fill is not None:
+            named.fill = fill
+        wb.add_named_style(named)
+        return named.name
+
+    return {
+        "title": style("title", TITLE_FONT, CENTER),
+        "header": style("header", HEADER_FONT, CENTER_MIDDLE, THIN_BORDER, HEADER_FILL),
+        "day": style("day", DAY_FONT, CELL_ALIGNMENT, THIN_BORDER),
+        "cell": style("cell", CELL_FONT, CELL_ALIGNMENT, THIN_BORDER),
+        "day_block": style("day block", DAY_FONT, CENTER_MIDDLE, THIN_BORDER),
+        "signature": style("signature", SIGNATURE_FONT, RIGHT),
+    }
+
+
+def schedule_rows(chromosome):
+    """
+    ``{group: [row values in COLUMNS order]}`` with each group's rows in
+    day/time order, Discipline and Classroom split onto one line per entry.
+    """
+    day_rank = {day: i for i, day in enumerate(DAY_ORDER)}
+    rows = {}
     for gene in sorted(chromosome.genes, key=lambda g: (g.group, g.day, g.time)):
         if getattr(gene, "delivery_mode", "offline") == "online" and gene.type.lower() == "lecture":
             room = "Online"
@@ -50,90 +97,68 @@ def export_to_excel(chromosome, path):
             room = "Gym"
         else:
             room = gene.room
-        rows.append({
-            "Group": gene.group,
-            "Day of the week": gene.day,
-            "Time": gene.time,
-            "Discipline": gene.course,
-            "Classroom": room,
-            "Type": gene.type,
-            "Lecturer": getattr(gene, "instructor", "")
-        })
-
-    df = pd.DataFrame(rows)
-    writer = pd.ExcelWriter(path, engine="openpyxl")
+        course, room = (
+            value.replace('/', '\n').replace(',', '\n') if isinstance(value, str) else value
+            for value in (gene.course, room)
+        )
+        rows.setdefault(gene.group, []).append(
+            [gene.day, gene.time, course, room, gene.type, getattr(gene, "instructor", None) or None]
+        )
+    for group_rows in rows.values():
+        # Stable, so sessions sharing a day and time keep their (group, day, time) order
+        group_rows.sort(key=lambda row: (day_rank.get(row[0], len(DAY_ORDER)), row[1]))
+    return dict(sorted(rows.items()))
+
+
+def write_group_sheet(ws, rows, styles):
+    """
+    Fill one group's worksheet in a single pass: title row, styled header,
+    session rows with merged day blocks, column widths and signature line.
+    ``styles`` is the workbook's ``style_table``.
+    """
+    ws["A1"] = f"Group {ws.title}"
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=6)
+    ws["A1"].style = styles["title"]
+    widths = [len(ws["A1"].value)] + [0] * 5
+
+    for col, name in enumerate(COLUMNS, start=1):
+        ws.cell(row=3, column=col, value=name).style = styles["header"]
+        widths[col - 1] = max(widths[col - 1], len(name))
+
+    # Each day's cells in column A are merged into one block
+    current_day = None
+    start_row = 4
+    for row_idx, values in enumerate(rows, start=4):
+        if values[0] != current_day:
+            if current_day is not None:
+                ws.merge_cells(start_row=start_row, start_column=1, end_row=row_idx - 1, end_column=1)
+                ws.cell(row=start_row, column=1).style = styles["day_block"]
+            current_day = values[0]
+            start_row = row_idx
+        for col, value in enumerate(values, start=1):
+            ws.cell(row=row_idx, column=col, value=value).style = styles["day" if col == 1 else "cell"]
+            if value:
+                widths[col - 1] = max(widths[col - 1], len(str(value)))
+
+    last_row = 3 + len(rows)
+    if current_day and start_row < last_row:
+        ws.merge_cells(start_row=start_row, start_column=1, end_row=last_row, end_column=1)
+        ws.cell(row=start_row, column=1).style = styles["day_block"]
+
+    for col, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(col)].width = min(width + 2, 30)
+
+    # Director signature line
+    ws.cell(row=last_row + 2, column=6, value=SIGNATURE).style = styles["signature"]
+
+
+@traced("export")
+def export_to_excel(chromosome, path):
+    """Write one formatted sheet per group, building the workbook once in memory and saving it once."""
     Path(path).parent.mkdir(parents=True, exist_ok=True)
-
-    DAY_ORDER = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
-
-    for group, group_df in df.groupby("Group"):
-        group_df["Day of the week"] = pd.Categorical(group_df["Day of the week"], categories=DAY_ORDER, ordered=True)
-        sheet_df = group_df.sort_values(by=["Day of the week", "Time"])
-        sheet_df.drop(columns=["Group"], inplace=True)
-        sheet_name = group[:31]
-        sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
-
-    writer.close()
-
-    # === APPLY FORMATTING ===
-    wb = load_workbook(path)
-    for sheet in wb.sheetnames:
-        ws = wb[sheet]
-
-        # Add group title
-        ws.insert_rows(1)
-        ws.insert_rows(2)
-        ws["A1"] = f"Group {sheet}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=6)
-        ws["A1"].font = Font(name="Times New Roman", size=12, bold=True)
-        ws["A1"].alignment = Alignment(horizontal="center")
-
-        # Apply header style
-        for cell in ws[3]:
-            cell.font = Font(name="Times New Roman", bold=True, size=7)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.fill = header_fill
-            cell.border = thin_border
-
-        # Group same Day values and format all cells
-        current_day = None
-        start_row = 4
-        for row_idx in range(4, ws.max_row + 1):
-            day_cell = ws.cell(row=row_idx, column=1)
-            is_same_day = (day_cell.value == current_day)
-            if not is_same_day:
-                if current_day is not None:
-                    ws.merge_cells(start_row=start_row, start_column=1, end_row=row_idx - 1, end_column=1)
-                    ws.cell(row=start_row, column=1).alignment = Alignment(horizontal='center', vertical='center')
-                current_day = day_cell.value
-                start_row = row_idx
-
-            for col in range(1, 7):
-                cell = ws.cell(row=row_idx, column=col)
-                if col == 3 or col == 4:  # Discipline or Classroom
-                    if isinstance(cell.value, str):
-                        cell.value = cell.value.replace('/', '\n').replace(',', '\n')
-                font_size = 11 if col == 1 or row_idx == 3 else 7
-                cell.font = Font(name="Times New Roman", size=font_size)
-                cell.alignment = Alignment(wrap_text=True, horizontal="center", vertical="top")
-                cell.border = thin_border
-
-        # Merge final day block
-        if current_day and start_row < ws.max_row:
-            ws.merge_cells(start_row=start_row, start_column=1, end_row=ws.max_row, end_column=1)
-            ws.cell(row=start_row, column=1).alignment = Alignment(horizontal='center', vertical='center')
-
-        # Auto-width
-        for col in ws.columns:
-            max_length = max((len(str(cell.value)) for cell in col if cell.value), default=0)
-            adjusted_length = min(max_length + 2, 30)
-            col_letter = get_column_letter(col[0].column)
-            ws.column_dimensions[col_letter].width = adjusted_length
-
-        # Add director signature line
-        last_row = ws.max_row + 2
-        ws.cell(row=last_row, column=6).value = "Director Of Academic Affairs Department __________"
-        ws.cell(row=last_row, column=6).alignment = Alignment(horizontal="right")
-        ws.cell(row=last_row, column=6).font = Font(name="Times New Roman", size=10)
-
+    wb = Workbook()
+    wb.remove(wb.active)
+    styles = style_table(wb)
+    for group, rows in schedule_rows(chromosome).items():
+        write_group_sheet(wb.create_sheet(group[:31]), rows, styles)
     wb.save(path)
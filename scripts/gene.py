@@ -27,3 +27,65 @@ class Gene:
     def __str__(self):
         return (f"{self.day} {self.time} | {self.course:25} | {self.type:<8} | "
                 f"{self.room:<10} | {self.delivery_mode:<7} | {self.instructor or 'TBD'}")
+
+
+class GeneView:
+    """
+    Gene-like view of one session of an array-backed Chromosome.
+
+    Reads names from the shared ProblemInstance; assigning ``day``, ``time`` or
+    ``room`` writes the id back into the chromosome (and its evaluator), so code
+    written against ``Gene`` keeps working unchanged.
+    """
+    __slots__ = ("chromosome", "index")
+    instructor = None
+
+    def __init__(self, chromosome, index):
+        self.chromosome = chromosome
+        self.index = index
+
+    @property
+    def group(self):
+        p = self.chromosome.problem
+        return p.groups[p.session_group[self.index]]
+
+    @property
+    def course(self):
+        p = self.chromosome.problem
+        return p.courses[p.session_course[self.index]]
+
+    @property
+    def type(self):
+        p = self.chromosome.problem
+        return p.types[p.session_type[self.index]]
+
+    @property
+    def delivery_mode(self):
+        return "online" if self.chromosome.problem.session_online[self.index] else "offline"
+
+    @property
+    def day(self):
+        return self.chromosome.problem.days[self.chromosome.day_ids[self.index]]
+
+    @day.setter
+    def day(self, value):
+        self.chromosome.move_gene(self.index, day=self.chromosome.problem.day_index[value])
+
+    @property
+    def time(self):
+        return self.chromosome.problem.slots[self.chromosome.slot_ids[self.index]]
+
+    @time.setter
+    def time(self, value):
+        self.chromosome.move_gene(self.index, slot=self.chromosome.problem.slot_index[value])
+
+    @property
+    def room(self):
+        return self.chromosome.problem.rooms[self.chromosome.room_ids[self.index]]
+
+    @room.setter
+    def room(self, value):
+        self.chromosome.move_gene(self.index, room=self.chromosome.problem.parse_room(value))
+
+    to_dict = Gene.to_dict
+    __str__ = Gene.__str__
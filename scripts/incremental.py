@@ -0,0 +1,158 @@
+# scripts/incremental.py
+
+import time
+from collections import Counter
+
+import numpy as np
+
+from scripts.annealing import run_annealing
+from scripts.batch_evaluator import _session_tables
+from scripts.pinning import load_pins, apply_pins, session_key
+from scripts.problem import compile_problem
+from scripts.repair import _legal_cells, hard_violations
+
+
+def _key(entry):
+    return session_key(entry["group"], entry["course"], entry["type"])
+
+
+def _placement(entry):
+    return _key(entry) + (entry["day"], entry["time"], ",".join(p.strip() for p in entry["room"].split(",")))
+
+
+def diff_previous(previous, raw_genes, rooms):
+    """
+    Compare a previous timetable (entries as returned by ``load_pins``) with
+    the sessions and rooms of the new input.
+
+    Returns ``(kept, report)``: ``kept`` are the previous entries that can stay
+    where they are (their session still exists and their rooms still exist);
+    the report lists added/removed sessions and groups and the entries whose
+    room disappeared.
+    """
+    valid_rooms = {room.strip() for room in rooms} | {"Gym", "Online"}
+    sessions = Counter()
+    for gene in raw_genes:
+        for group in gene["joint_groups"] if "joint_groups" in gene else [gene["group"]]:
+            sessions[session_key(group, gene["course"], gene["type"])] += 1
+    before = Counter(_key(entry) for entry in previous)
+
+    kept, lost_room = [], []
+    for entry in previous:
+        if any(part.strip() not in valid_rooms for part in entry["room"].split(",")):
+            lost_room.append(entry)
+        else:
+            kept.append(entry)
+
+    new_groups = {group for group, _, _ in sessions}
+    old_groups = {entry["group"] for entry in previous}
+    report = {
+        "added": sum((sessions - before).values()),
+        "removed": sum((before - sessions).values()),
+        "groups_added": sorted(new_groups - old_groups),
+        "groups_removed": sorted(old_groups - new_groups),
+        "rooms_removed": sorted({part.strip() for e in lost_room for part in e["room"].split(",")} - valid_rooms),
+        "room_changes": len(lost_room),
+    }
+    return kept, report
+
+
+def conflicting_neighbours(chromosome):
+    """
+    Pinned sessions to release around the free ones: those in a hard violation
+    that share a group cell, a room cell or an evening with a free session,
+    plus those sitting in a cell they may no longer use.
+    """
+    problem = chromosome.problem
+    t = _session_tables(problem)
+    n_slots, n_days = len(problem.slots), len(problem.days)
+    n_cells = n_days * n_slots
+    days = chromosome.day_ids.astype(np.int64)
+    cells = days * n_slots + chromosome.slot_ids
+    rooms = chromosome.room_ids.astype(np.int64)
+    free = ~problem.pinned
+
+    bad = np.zeros(problem.n_sessions, dtype=bool)
+    bad[hard_violations(chromosome)] = True
+
+    group_cell = t["group"] * n_cells + cells
+    related = np.isin(group_cell, group_cell[free])
+    room_is_gym = np.asarray(problem.room_is_gym, dtype=bool)
+    shared = ~t["online"] & ~(t["pe"] & room_is_gym[rooms])
+    room_cell = rooms * n_cells + cells
+    related |= shared & np.isin(room_cell, room_cell[free & shared])
+    evening = t["is_online_slot"][chromosome.slot_ids]
+    group_day = t["group"] * n_days + days
+    related |= evening & np.isin(group_day, group_day[free & evening])
+
+    illegal = ~_legal_cells(problem)[np.arange(problem.n_sessions), cells]
+    return np.flatnonzero(problem.pinned & ((bad & related) | illegal))
+
+
+def _entry(problem, chromosome, s):
+    return {
+        "group": problem.groups[problem.session_group[s]],
+        "course": problem.courses[problem.session_course[s]],
+        "type": problem.types[problem.session_type[s]],
+        "day": problem.days[chromosome.day_ids[s]],
+        "time": problem.slots[chromosome.slot_ids[s]],
+        "room": problem.rooms[chromosome.room_ids[s]],
+    }
+
+
+def count_moved(previous, chromosome):
+    """Sessions of ``chromosome`` that existed in ``previous`` but no longer sit at the same day, time and room."""
+    problem = chromosome.problem
+    now = [_entry(problem, chromosome, s) for s in range(problem.n_sessions)]
+    existed = sum((Counter(map(_key, now)) & Counter(map(_key, previous))).values())
+    unchanged = sum((Counter(map(_placement, now)) & Counter(map(_placement, previous))).values())
+    return existed - unchanged
+
+
+def reschedule(previous_path, raw_genes, rooms, time_budget_seconds, verbose=True, snapshot=None, stats=None,
+               search=None):
+    """
+    Re-schedule after an input change, keeping the previous timetable
+    (``timetable_T{n}.json``) wherever it is still valid.
+
+    Every previous session whose session and rooms still exist is pinned; a
+    first construction places the new and displaced sessions around them,
+    the pinned sessions they then conflict with (or that sit in a cell they may
+    no longer use) are released, and ``search`` (default: simulated annealing)
+    re-optimizes only the free sessions for ``time_budget_seconds``.
+
+    Returns ``(best_schedule, report)``; the report holds the input diff,
+    the pinned/free/released counts and ``moved``, the number of previously
+    scheduled sessions whose day, time or room changed.
+    """
+    from scripts.scheduler import build_individual
+
+    start = time.perf_counter()
+    previous = load_pins(previous_path)
+    kept, report = diff_previous(previous, raw_genes, rooms)
+
+    genes, pins = apply_pins(raw_genes, kept, rooms)
+    first = build_individual(compile_problem(genes, rooms))
+    released = [_entry(first.problem, first, s) for s in conflicting_neighbours(first)]
+    if released:
+        remaining = Counter(map(_placement, released))
+        still_kept = []
+        for entry in kept:
+            if remaining[_placement(entry)]:
+                remaining[_placement(entry)] -= 1
+            else:
+                still_kept.append(entry)
+        genes, pins = apply_pins(raw_genes, still_kept, rooms)
+    report.update(pinned=pins["pinned"], free=pins["free"], released=len(released))
+
+    if pins["free"]:
+        search = search or run_annealing
+        best, _ = search(genes, rooms, verbose=verbose, time_budget_seconds=time_budget_seconds,
+                         snapshot=snapshot, stats=stats)
+    else:
+        best = build_individual(compile_problem(genes, rooms))
+        best.calculate_fitness()
+
+    report["moved"] = count_moved(previous, best)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return best, report
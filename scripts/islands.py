@@ -0,0 +1,211 @@
+# scripts/islands.py
+
+import random
+import time
+import traceback
+import multiprocessing as mp
+
+from scripts.chromosome import Chromosome
+from scripts.anytime import ignore_interrupts
+from scripts.batch_evaluator import penalties
+from scripts.config import GENERATIONS, ISLAND_EARLY_STOP_EPOCHS
+
+TOPOLOGIES = ("ring", "full")
+
+
+# Islands intern elective room combinations independently, so migrants carry
+# the names of the rooms their ids refer to (only those, not the whole table).
+
+def _columns(chromosome):
+    room_ids, room_names = chromosome.problem.export_rooms(chromosome.room_ids)
+    return (chromosome.day_ids, chromosome.slot_ids, room_ids, chromosome.fitness, room_names)
+
+def _from_columns(problem, columns):
+    day_ids, slot_ids, room_ids, fitness, room_names = columns
+    chromosome = Chromosome(problem, day_ids, slot_ids, problem.adopt_rooms(room_ids, room_names))
+    chromosome.fitness = fitness
+    return chromosome
+
+def _progress_event(problem, best_columns, generation, best, mean, elapsed):
+    """An epoch's progress record, built (``penalties`` included) only when the throttle sends it."""
+    def build():
+        hard, soft = penalties(_from_columns(problem, best_columns))
+        return {"generation": generation, "best": best, "mean": mean,
+                "hard": hard, "soft": soft, "elapsed": elapsed}
+    return build
+
+def _island_main(conn, problem, seed, migration_size, repair_rate=0.0, local_search=None):
+    """One island: evolve for the requested generations, then trade migrants with the main process."""
+    try:
+        _evolve_island(conn, problem, seed, migration_size, repair_rate, local_search)
+    except Exception:
+        # The traceback travels instead of the epoch's reply; run_islands raises it
+        conn.send(traceback.format_exc())
+    conn.close()
+
+def _evolve_island(conn, problem, seed, migration_size, repair_rate, local_search):
+    from scripts.scheduler import generate_initial_population, evolve_population
+    from scripts.local_search import improve_elite
+    from scripts.config import LOCAL_SEARCH_INTERVAL, LOCAL_SEARCH_ELITE, LOCAL_SEARCH_SECONDS
+
+    ignore_interrupts()
+
+    random.seed(seed)
+    rooms = problem.teaching_rooms
+    start = time.perf_counter()
+    population = generate_initial_population(problem)
+    construction = time.perf_counter() - start
+    best = min(population, key=lambda x: x.fitness).copy(with_evaluator=False)
+    generation = -1
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        generations, immigrants = message
+
+        # Immigrants replace the worst individuals
+        if immigrants:
+            population.sort(key=lambda x: x.fitness)
+            population[-len(immigrants):] = [_from_columns(problem, c) for c in immigrants]
+
+        history = []
+        for _ in range(generations):
+            generation += 1
+            if local_search and generation and generation % LOCAL_SEARCH_INTERVAL == 0:
+                improve_elite(population, local_search, LOCAL_SEARCH_ELITE, LOCAL_SEARCH_SECONDS)
+            population, generation_best = evolve_population(population, rooms, repair_rate)
+            if generation_best.fitness < best.fitness:
+                best = generation_best.copy(with_evaluator=False)
+            history.append(best.fitness)
+
+        current_best = min(population, key=lambda x: x.fitness)
+        if current_best.fitness < best.fitness:
+            best = current_best.copy(with_evaluator=False)
+            history[-1:] = [best.fitness]
+        # The island's best-so-far always travels, followed by its current leaders
+        emigrants = sorted([best] + population, key=lambda x: x.fitness)[:migration_size]
+        conn.send((history, [_columns(c) for c in emigrants], _columns(best), construction))
+
+
+def _receive(conn, process, index):
+    """An island's epoch reply; a RuntimeError if the island failed or died."""
+    try:
+        reply = conn.recv()
+    except EOFError:
+        process.join(timeout=1)
+        raise RuntimeError(f"Island {index} exited unexpectedly (exit code {process.exitcode})") from None
+    if isinstance(reply, str):
+        raise RuntimeError(f"Island {index} failed:\n{reply}")
+    return reply
+
+
+def _route_migrants(emigrants, topology, migration_size):
+    """Immigrants for each island, given every island's emigrants."""
+    n = len(emigrants)
+    if topology == "ring":
+        return [emigrants[(i - 1) % n] for i in range(n)]
+    routed = []
+    for i in range(n):
+        pool = [c for j in range(n) if j != i for c in emigrants[j]]
+        routed.append(sorted(pool, key=lambda c: c[3])[:migration_size])
+    return routed
+
+
+def run_islands(problem, islands, interval, topology="ring", migration_size=2, verbose=True,
+                repair_rate=0.0, local_search=None, snapshot=None, until_deadline=False,
+                progress=None):
+    """
+    Island-model GA: ``islands`` populations evolve in their own processes and
+    every ``interval`` generations their best ``migration_size`` individuals
+    migrate along a ring or to every other island (``topology="full"``).
+
+    Returns ``(best_schedule, fitness_progress, island_histories, construction)``
+    where ``fitness_progress`` is the global best per generation and
+    ``construction`` the slowest island's initial-population time in seconds.
+
+    ``snapshot`` (an ``anytime.BestSnapshot``) receives each new global best and
+    is checked for a stop request or spent budget after every migration epoch;
+    with ``until_deadline`` the run ignores GENERATIONS and early stopping.
+    ``progress`` (a ``ProgressThrottle``) is offered the last generation of each
+    epoch; its ``mean`` is the mean of the islands' best-so-far fitness.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology: {topology!r} (expected one of {TOPOLOGIES})")
+
+    connections, processes = [], []
+    for _ in range(islands):
+        parent_conn, child_conn = mp.Pipe()
+        process = mp.Process(
+            target=_island_main,
+            args=(child_conn, problem, random.getrandbits(64), migration_size, repair_rate, local_search),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        connections.append(parent_conn)
+        processes.append(process)
+
+    island_histories = [[] for _ in range(islands)]
+    fitness_progress = []
+    best_columns = None
+    stagnant = 0
+    construction = 0.0
+    immigrants = [[] for _ in range(islands)]
+    try:
+        while until_deadline or len(fitness_progress) < GENERATIONS:
+            generations = interval if until_deadline else min(interval, GENERATIONS - len(fitness_progress))
+            for conn, incoming in zip(connections, immigrants):
+                conn.send((generations, incoming))
+            replies = [_receive(conn, process, k) for k, (conn, process) in enumerate(zip(connections, processes))]
+
+            emigrants = []
+            improved = False
+            for history, (k_history, k_emigrants, k_best, k_construction) in zip(island_histories, replies):
+                history.extend(k_history)
+                construction = max(construction, k_construction)
+                emigrants.append(k_emigrants)
+                if best_columns is None or k_best[3] < best_columns[3]:
+                    best_columns = k_best
+                    improved = True
+            stagnant = 0 if improved else stagnant + 1
+            if snapshot is not None:
+                if improved:
+                    snapshot.update(_from_columns(problem, best_columns), len(island_histories[0]))
+                else:
+                    snapshot.progress(len(island_histories[0]))
+            immigrants = _route_migrants(emigrants, topology, migration_size)
+
+            for generation in range(len(fitness_progress), len(island_histories[0])):
+                fitness_progress.append(min(h[generation] for h in island_histories))
+            if progress is not None:
+                progress(_progress_event(
+                    problem, best_columns, len(fitness_progress), fitness_progress[-1],
+                    round(sum(h[-1] for h in island_histories) / islands, 1),
+                    round(snapshot.elapsed(), 3) if snapshot is not None else None,
+                ))
+            if verbose:
+                print(f"Generation {len(fitness_progress)} | Best Fitness: {fitness_progress[-1]} | "
+                      f"Islands: {[h[-1] for h in island_histories]}")
+
+            if snapshot is not None and snapshot.should_stop():
+                if verbose:
+                    print("Stopping: " + ("stop requested." if snapshot.stop_requested else "time budget spent."))
+                break
+            # Early stop once the global best has been flat for several migration epochs
+            if stagnant >= ISLAND_EARLY_STOP_EPOCHS and not until_deadline:
+                if verbose:
+                    print("Stopping early due to no improvement.")
+                break
+    finally:
+        for conn in connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    return _from_columns(problem, best_columns), fitness_progress, island_histories, construction
@@ -0,0 +1,105 @@
+# scripts/local_search.py
+
+import random
+import time
+
+import numpy as np
+
+from scripts.repair import _legal_cells
+
+
+def _group_sessions(problem):
+    """Free (unpinned) session ids per group id, built once per problem."""
+    sessions = getattr(problem, "_group_sessions", None)
+    if sessions is None or sum(map(len, sessions)) != len(problem.free_sessions):
+        sessions = [[] for _ in problem.groups]
+        for s in problem.free_sessions.tolist():
+            sessions[problem.session_group[s]].append(s)
+        problem._group_sessions = sessions
+    return sessions
+
+
+def hill_climb(chromosome, seconds):
+    """
+    First-improvement hill climbing within one group's week: pick a random
+    unpinned session, then try moving it to each of its legal cells and
+    swapping its cell with each other unpinned session of the group, in
+    random order, keeping the first change that lowers the fitness. Every
+    trial is a delta update of the chromosome's incremental evaluator. Runs
+    until ``seconds`` have passed.
+
+    Returns the number of accepted changes.
+    """
+    problem = chromosome.problem
+    if chromosome.evaluator is None:
+        chromosome.calculate_fitness()
+    n_slots = len(problem.slots)
+    legal = _legal_cells(problem)
+    group_sessions = _group_sessions(problem)
+    day_ids, slot_ids = chromosome.day_ids, chromosome.slot_ids
+
+    accepted = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        s = problem.random_free_session()
+        if s is None:
+            break
+        current = chromosome.fitness
+        day, slot = int(day_ids[s]), int(slot_ids[s])
+
+        moves = [("move", int(cell)) for cell in np.flatnonzero(legal[s]) if cell != day * n_slots + slot]
+        moves += [("swap", other) for other in group_sessions[problem.session_group[s]] if other != s]
+        random.shuffle(moves)
+        for kind, target in moves:
+            if time.perf_counter() >= deadline:
+                break
+            if kind == "move":
+                chromosome.move_gene(s, day=target // n_slots, slot=target % n_slots)
+                if chromosome.fitness < current:
+                    accepted += 1
+                    break
+                chromosome.move_gene(s, day=day, slot=slot)
+            else:
+                other_day, other_slot = int(day_ids[target]), int(slot_ids[target])
+                if (other_day, other_slot) == (day, slot):
+                    continue
+                chromosome.move_gene(s, day=other_day, slot=other_slot)
+                chromosome.move_gene(target, day=day, slot=slot)
+                if chromosome.fitness < current:
+                    accepted += 1
+                    break
+                chromosome.move_gene(target, day=other_day, slot=other_slot)
+                chromosome.move_gene(s, day=day, slot=slot)
+    return accepted
+
+
+# Local-search stages selectable by name (run_generate.py --local-search, the web form)
+LOCAL_SEARCHES = {
+    "hill_climb": hill_climb,
+}
+
+
+def local_search_name(name):
+    """``name`` of a selected local search, with "none" and an empty name turned into None."""
+    if not name or name == "none":
+        return None
+    return name
+
+
+def get_local_search(name):
+    """The local-search function registered as ``name``; None for "none" or an empty name."""
+    name = local_search_name(name)
+    if name is None:
+        return None
+    if name not in LOCAL_SEARCHES:
+        raise ValueError(f"Unknown local search: {name!r} (expected one of {sorted(LOCAL_SEARCHES)})")
+    return LOCAL_SEARCHES[name]
+
+
+def improve_elite(population, local_search, elite, seconds):
+    """
+    Run ``local_search`` in place on the ``elite`` fittest chromosomes, sharing
+    ``seconds`` between them. Returns the number of accepted changes.
+    """
+    leaders = sorted(population, key=lambda x: x.fitness)[:elite]
+    return sum(local_search(chromosome, seconds / len(leaders)) for chromosome in leaders)
@@ -0,0 +1,91 @@
+# scripts/occupancy.py
+
+import random
+import numpy as np
+
+
+class Occupancy:
+    """
+    Busy masks used by the constructive phase.
+
+    Every group and every room has a row of bits over the day x slot grid
+    (cell = day * n_slots + slot), and each room pool keeps a per-cell count of
+    free rooms, so "is there a free cell with k free rooms for these groups?"
+    is a handful of mask operations instead of a scan over all rooms.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.n_slots = len(problem.slots)
+        n_cells = len(problem.days) * self.n_slots
+        self.group_busy = np.zeros((len(problem.groups), n_cells), dtype=bool)
+        self.room_busy = np.zeros((len(problem.rooms), n_cells), dtype=bool)
+        self.allowed = _allowed_cells(problem)
+
+        # Joint lectures may use any listed room, single sessions never the gym
+        teaching = np.asarray(problem.teaching_rooms, dtype=np.int64)
+        self.pools = {
+            "all": teaching,
+            "no_gym": teaching[~np.asarray(problem.room_is_gym, dtype=bool)[teaching]],
+        }
+        self.in_pool = {}
+        self.free_count = {}
+        for name, rooms in self.pools.items():
+            member = np.zeros(len(problem.rooms), dtype=bool)
+            member[rooms] = True
+            self.in_pool[name] = member
+            self.free_count[name] = np.full(n_cells, len(rooms), dtype=np.int64)
+
+    def book(self, groups, cell, rooms=()):
+        """Mark ``cell`` busy for the given group ids and room ids."""
+        self.group_busy[groups, cell] = True
+        for room in rooms:
+            if not self.room_busy[room, cell]:
+                self.room_busy[room, cell] = True
+                for name, member in self.in_pool.items():
+                    if member[room]:
+                        self.free_count[name][cell] -= 1
+
+    def feasible_cells(self, groups, pool, needed):
+        """Cells allowed for the first group, free for all groups, with ``needed`` free rooms in ``pool``."""
+        mask = self.allowed[groups[0]] & ~self.group_busy[groups].any(axis=0)
+        if needed:
+            mask &= self.free_count[pool] >= needed
+        return mask
+
+    def group_cells(self, groups, pool, needed):
+        """Per-group version of ``feasible_cells``: a (groups x cells) mask, each row with its own allowed cells."""
+        mask = self.allowed[groups] & ~self.group_busy[groups]
+        if needed:
+            mask &= self.free_count[pool] >= needed
+        return mask
+
+    def pick_cell(self, mask, day_major=False):
+        """
+        Random cell of a mask, or None. Uniform over the cells by default; with
+        ``day_major`` a random day that has a free cell is chosen first, which is
+        what walking shuffled days and then shuffled slots amounts to.
+        """
+        cells = np.flatnonzero(mask)
+        if not len(cells):
+            return None
+        if day_major:
+            days = cells // self.n_slots
+            cells = cells[days == random.choice(np.unique(days).tolist())]
+        return int(random.choice(cells.tolist()))
+
+    def pick_rooms(self, cell, pool, needed):
+        """``needed`` distinct random free rooms of ``pool`` at ``cell``."""
+        rooms = self.pools[pool]
+        free = rooms[~self.room_busy[rooms, cell]]
+        return random.sample(free.tolist(), needed)
+
+
+def _allowed_cells(problem):
+    cells = getattr(problem, "_allowed_cells", None)
+    if cells is None:
+        day_ok = np.asarray(problem.group_day_ok, dtype=bool).reshape(len(problem.groups), -1)
+        slot_ok = np.asarray(problem.group_slot_ok, dtype=bool).reshape(len(problem.groups), -1)
+        cells = (day_ok[:, :, None] & slot_ok[:, None, :]).reshape(len(problem.groups), -1)
+        problem._allowed_cells = cells
+    return cells
@@ -0,0 +1,158 @@
+# scripts/parallel.py
+
+import random
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+from scripts.chromosome import Chromosome, DAY_DTYPE, SLOT_DTYPE, ROOM_DTYPE
+from scripts.batch_evaluator import evaluate_population
+from scripts.anytime import ignore_interrupts
+
+COLUMN_DTYPES = (DAY_DTYPE, SLOT_DTYPE, ROOM_DTYPE)
+
+
+class SharedPopulation:
+    """Day/slot/room columns of a whole population as (population x sessions) shared-memory arrays."""
+
+    def __init__(self, n_pop, n_sessions, names=None):
+        self.shape = (n_pop, n_sessions)
+        self.owner = names is None
+        self.blocks = []
+        for k, dtype in enumerate(COLUMN_DTYPES):
+            size = max(1, n_pop * n_sessions * np.dtype(dtype).itemsize)
+            if self.owner:
+                self.blocks.append(shared_memory.SharedMemory(create=True, size=size))
+            else:
+                self.blocks.append(shared_memory.SharedMemory(name=names[k]))
+        self.days, self.slots, self.rooms = (
+            np.ndarray(self.shape, dtype=dtype, buffer=block.buf)
+            for dtype, block in zip(COLUMN_DTYPES, self.blocks)
+        )
+
+    @property
+    def names(self):
+        return [block.name for block in self.blocks]
+
+    def chromosomes(self, problem):
+        """Chromosomes whose columns are views on the shared rows (no copies)."""
+        return [Chromosome(problem, self.days[k], self.slots[k], self.rooms[k]) for k in range(self.shape[0])]
+
+    def store(self, k, chromosome):
+        self.days[k] = chromosome.day_ids
+        self.slots[k] = chromosome.slot_ids
+        self.rooms[k] = chromosome.room_ids
+
+    def close(self):
+        self.days = self.slots = self.rooms = None
+        for block in self.blocks:
+            if self.owner:
+                block.unlink()
+            try:
+                block.close()
+            except BufferError:
+                pass  # a chromosome still views the block; the mapping goes away with it
+
+
+# --- worker side -------------------------------------------------------------
+
+_worker = {}
+
+def _init_worker(problem, names, shape):
+    ignore_interrupts()
+    _worker["problem"] = problem
+    _worker["buffers"] = [SharedPopulation(*shape, names=n) for n in names]
+
+def _breed(task):
+    """Build children ``start:stop`` of the next generation in place; return their fitness only."""
+    from scripts.scheduler import make_child
+
+    src, dst, start, stop, seed, rooms, repair_rate = task
+    random.seed(seed)
+    problem = _worker["problem"]
+    source = _worker["buffers"][src]
+    target = _worker["buffers"][dst]
+    parents = source.chromosomes(problem)
+    for k in range(start, stop):
+        target.store(k, make_child(parents, rooms, repair_rate))
+    hard, soft = evaluate_population(
+        problem, target.days[start:stop], target.slots[start:stop], target.rooms[start:stop]
+    )
+    return (hard + soft).tolist()
+
+
+def _build(seed):
+    """Build one individual of the initial population; only columns and the rooms they use travel back."""
+    from scripts.scheduler import build_individual
+
+    random.seed(seed)
+    problem = _worker["problem"]
+    chromosome = build_individual(problem)
+    room_ids, room_names = problem.export_rooms(chromosome.room_ids)
+    return chromosome.day_ids, chromosome.slot_ids, room_ids, room_names, chromosome.unassigned
+
+
+# --- main side ---------------------------------------------------------------
+
+def build_population(problem, size, workers):
+    """Build ``size`` independent individuals on a process pool (unscored)."""
+    seeds = [random.getrandbits(64) for _ in range(size)]
+    with mp.Pool(workers, initializer=_init_worker, initargs=(problem, [], None)) as pool:
+        built = pool.map(_build, seeds)
+    # Workers intern elective room combinations on their own copy of the problem
+    population = []
+    for day_ids, slot_ids, room_ids, room_names, unassigned in built:
+        chromosome = Chromosome(problem, day_ids, slot_ids, problem.adopt_rooms(room_ids, room_names))
+        chromosome.unassigned = unassigned
+        population.append(chromosome)
+    return population
+
+
+class ParallelEvolver:
+    """
+    Runs ``evolve_population`` generations on a process pool.
+
+    The population lives in two shared-memory buffers (current and next
+    generation); workers read parents from one, write their share of the
+    children into the other and send back only the fitness values.
+    """
+
+    def __init__(self, problem, population, workers):
+        self.problem = problem
+        self.workers = workers
+        shape = (len(population), problem.n_sessions)
+        self.buffers = [SharedPopulation(*shape), SharedPopulation(*shape)]
+        self.current = 0
+        for k, chromosome in enumerate(population):
+            self.buffers[0].store(k, chromosome)
+        self.pool = mp.Pool(
+            workers,
+            initializer=_init_worker,
+            initargs=(problem, [b.names for b in self.buffers], shape),
+        )
+
+    def population(self, fitness):
+        chromosomes = self.buffers[self.current].chromosomes(self.problem)
+        for chromosome, value in zip(chromosomes, fitness):
+            chromosome.fitness = value
+        return chromosomes
+
+    def evolve(self, population, rooms, repair_rate=0.0):
+        """Same contract as ``scheduler.evolve_population`` for a population from ``population()``."""
+        best = min(population, key=lambda x: x.fitness)
+        size = len(population)
+        src, dst = self.current, 1 - self.current
+        chunk = -(-size // self.workers)
+        tasks = [
+            (src, dst, start, min(start + chunk, size), random.getrandbits(64), rooms, repair_rate)
+            for start in range(0, size, chunk)
+        ]
+        fitness = [value for part in self.pool.map(_breed, tasks) for value in part]
+        self.current = dst
+        return self.population(fitness), best
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+        for buffer in self.buffers:
+            buffer.close()
@@ -0,0 +1,138 @@
+# scripts/parsed_cache.py
+
+import hashlib
+import io
+import os
+import pickle
+import shutil
+import uuid
+
+from scripts import config
+from scripts.tracing import span, count
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
+# (path, mtime, size) -> content digest, so an unchanged workbook is hashed once per process
+_digests = {}
+
+
+# Bumped whenever data_loader.build_frames changes what it returns
+FRAMES_VERSION = 2
+
+
+def _settings():
+    """Config values (and the frames layout) that change what preprocess_data builds from the same sheets."""
+    return {
+        "FRAMES_VERSION": FRAMES_VERSION,
+        "CURRENT_YEAR": config.CURRENT_YEAR,
+        "EXCLUDED_ROOMS": list(config.EXCLUDED_ROOMS),
+        "EXCLUDED_COURSES": list(config.EXCLUDED_COURSES),
+    }
+
+
+def read_source(source):
+    """
+    ``(digest, data)`` for a workbook given as a path or an open binary file
+    (e.g. a Flask upload). ``data`` is the bytes for a file object and None for
+    a path. Paths are re-hashed only when their mtime or size changes.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        st = os.stat(source)
+        stamp = (os.path.abspath(source), st.st_mtime_ns, st.st_size)
+        digest = _digests.get(stamp)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(source, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            digest = _digests[stamp] = h.hexdigest()
+        return digest, None
+
+    data = source.read()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return hashlib.sha256(data).hexdigest(), data
+
+
+class ParsedInputCache:
+    """
+    Parsed workbooks on disk, one pickle per workbook content hash holding the
+    raw sheets and the preprocessed frames (plus the settings they were built
+    with). Entries are keyed by content, so editing the workbook invalidates
+    its entry; changed preprocessing settings rebuild the frames from the
+    cached sheets. Pickle is used because it round-trips every pandas dtype
+    without optional dependencies.
+    """
+
+    def __init__(self, folder=None, max_entries=None):
+        folder = folder or config.PARSED_CACHE_FOLDER
+        self.folder = folder if os.path.isabs(folder) else os.path.join(PROJECT_ROOT, folder)
+        self.max_entries = config.PARSED_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+    def _entry(self, digest):
+        return os.path.join(self.folder, f"{digest}.pkl")
+
+    def get(self, digest):
+        """The cached entry dict for ``digest`` (marking it recently used), else None."""
+        path = self._entry(digest)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)  # LRU order is the file mtime
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+        return entry
+
+    def put(self, digest, entry):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp = os.path.join(self.folder, f".tmp-{uuid.uuid4().hex}")
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._entry(digest))
+        self.evict()
+
+    def evict(self):
+        """Delete least-recently-used entries beyond ``max_entries``."""
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith(".pkl"):
+                continue
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.folder, name)), name))
+            except FileNotFoundError:
+                continue
+        for _, name in sorted(entries, reverse=True)[self.max_entries:]:
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def load(self, source, parse, preprocess=None):
+        """
+        Sheets (and, with ``preprocess``, frames) of the workbook ``source``.
+
+        ``parse(excel_source)`` reads all sheets into a dict of DataFrames and
+        ``preprocess(sheets)`` turns them into the frames dict; both only run on
+        a cache miss. Returns ``(sheets, frames)``; frames is None without
+        ``preprocess``.
+        """
+        with span("load"):
+            digest, data = read_source(source)
+            entry = self.get(digest) if config.PARSED_CACHE_ENABLED else None
+            count("input_cache.misses" if entry is None else "input_cache.hits")
+            changed = False
+            if entry is None:
+                entry = {"sheets": parse(source if data is None else io.BytesIO(data))}
+                changed = True
+        settings = _settings()
+        if preprocess is not None and entry.get("settings") != settings:
+            with span("preprocess"):
+                entry["frames"] = preprocess(entry["sheets"])
+            entry["settings"] = settings
+            changed = True
+        if changed and config.PARSED_CACHE_ENABLED:
+            self.put(digest, entry)
+        return entry["sheets"], entry.get("frames") if preprocess is not None else None
@@ -0,0 +1,137 @@
+# scripts/pinning.py
+
+import json
+
+from scripts.config import DAYS, FIRST_YEAR_TIMESLOTS, UPPER_YEAR_TIMESLOTS, ONLINE_LECTURE_TIMES
+
+# Workbook sheet holding hand-placed sessions (one row per group session)
+PINNED_SHEET = "Pinned"
+
+# Accepted column names of the sheet, lower-case, per field
+SHEET_COLUMNS = {
+    "group": ("group",),
+    "course": ("course", "course_name", "discipline"),
+    "type": ("type",),
+    "day": ("day", "day of the week"),
+    "time": ("time",),
+    "room": ("room", "classroom"),
+}
+
+TIMES = set(FIRST_YEAR_TIMESLOTS) | set(UPPER_YEAR_TIMESLOTS) | set(ONLINE_LECTURE_TIMES)
+
+
+def _time(value):
+    """'HH:MM' for a time cell: a string like '9:00' or '09:00:00', or a datetime/time object."""
+    if hasattr(value, "strftime"):
+        return value.strftime("%H:%M")
+    hours, _, minutes = str(value).strip().partition(":")
+    return f"{int(hours):02d}:{minutes[:2] or '00'}" if hours.isdigit() else str(value).strip()
+
+
+def _pin(group, course, typ, day, time, room):
+    # Names keep their spelling (workbooks carry trailing spaces); matching ignores them
+    return {
+        "group": str(group).strip(),
+        "course": str(course),
+        "type": str(typ).strip().capitalize(),
+        "day": str(day).strip()[:3].capitalize(),
+        "time": _time(time),
+        "room": str(room),
+    }
+
+
+def session_key(group, course, typ):
+    """Whitespace- and case-insensitive identity of a group's session of a course."""
+    return str(group).strip(), str(course).strip(), str(typ).strip().lower()
+
+
+def load_pins(path):
+    """Pinned sessions from a JSON file in the ``Chromosome.to_json`` / exported timetable format."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return [
+        _pin(entry.get("group", group), entry["course"], entry["type"], entry["day"], entry["time"],
+             entry.get("room", entry.get("Room")))
+        for group, entries in data.items() for entry in entries
+    ]
+
+
+def pins_from_sheet(df):
+    """Pinned sessions from a ``Pinned`` workbook sheet (Group, Course, Type, Day, Time, Room columns)."""
+    if df is None:
+        return []
+    columns = {}
+    lower = {str(c).lower().strip(): c for c in df.columns}
+    for field, names in SHEET_COLUMNS.items():
+        column = next((lower[n] for n in names if n in lower), None)
+        if column is None:
+            raise ValueError(f"{PINNED_SHEET} sheet has no {field!r} column (expected one of {names})")
+        columns[field] = column
+    df = df.dropna(subset=[columns["group"], columns["course"]])
+    return [
+        _pin(*(row[columns[field]] for field in SHEET_COLUMNS))
+        for _, row in df.iterrows()
+    ]
+
+
+def apply_pins(raw_genes, pins, rooms=()):
+    """
+    Attach pins to the matching sessions of ``raw_genes`` and return
+    ``(raw_genes, report)``.
+
+    A pin matches one not yet pinned session with the same group, course and
+    type (in gene order); its room names are spelled as in ``rooms``. A pinned
+    session becomes a single-group gene with a ``"pinned"`` placement, so the
+    other groups of its joint lecture are still placed together. The pieces of
+    a split gene keep its ``"order_group"``, so ``compile_problem`` lays their
+    sessions out where the unsplit gene's were and the (order-dependent)
+    practice-before-lecture penalty does not change with pinning. The report
+    counts pinned and free sessions and lists the pins that matched no session
+    or name an unknown day/time.
+    """
+    report = {"pinned": 0, "free": 0, "unmatched": [], "invalid": []}
+    spelling = {room.strip(): room for room in rooms}
+    wanted = {}
+    for pin in pins:
+        if pin["day"] not in DAYS or pin["time"] not in TIMES or not pin["room"].strip():
+            report["invalid"].append(pin)
+            continue
+        wanted.setdefault(session_key(pin["group"], pin["course"], pin["type"]), []).append(pin)
+
+    genes = []
+    for gene in raw_genes:
+        joint = "joint_groups" in gene
+        order_group = gene.get("order_group") or (gene["joint_groups"][0] if joint else gene["group"])
+        free_groups = []
+        for group in gene["joint_groups"] if joint else [gene["group"]]:
+            queue = wanted.get(session_key(group, gene["course"], gene["type"]))
+            if not queue:
+                free_groups.append(group)
+                continue
+            pin = queue.pop(0)
+            room = ",".join(spelling.get(part.strip(), part) for part in pin["room"].split(","))
+            genes.append({
+                "group": group,
+                "course": gene["course"],
+                "type": gene["type"],
+                "delivery_mode": gene.get("delivery_mode", "offline"),
+                "pinned": {"day": pin["day"], "time": pin["time"], "room": room},
+                "order_group": order_group,
+            })
+            report["pinned"] += 1
+        report["free"] += len(free_groups)
+        if free_groups:
+            genes.append(dict(gene, joint_groups=free_groups, order_group=order_group) if joint else gene)
+
+    report["unmatched"] = [pin for queue in wanted.values() for pin in queue]
+    return genes, report
+
+
+def describe_pins(report):
+    """One-line summary of an ``apply_pins`` report."""
+    line = f"{report['pinned']} pinned / {report['free']} free sessions"
+    if report["unmatched"]:
+        line += f", {len(report['unmatched'])} pin(s) matched no session"
+    if report["invalid"]:
+        line += f", {len(report['invalid'])} pin(s) with an unknown day/time/room ignored"
+    return line
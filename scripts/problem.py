@@ -0,0 +1,247 @@
+# scripts/problem.py
+
+import random
+
+import numpy as np
+from scripts.config import (
+    DAYS,
+    FIRST_YEAR_TIMESLOTS,
+    UPPER_YEAR_TIMESLOTS,
+    ONLINE_LECTURE_TIMES,
+    GROUP_YEAR_DAYS,
+    SESSION_TYPES,
+    MAX_ROOM_IDS,
+)
+
+def is_pe_course(course):
+    return "physical education" in course.lower() or course.strip().upper() == "PE"
+
+def parse_group(group_name):
+    """Return (EP, study year) for a group name like 'IT-2301'."""
+    ep = group_name.split("-")[0].upper()
+    year_num = int(group_name.split("-")[1][:2])
+    admission_year = 2000 + year_num
+    study_year = 2024 - admission_year
+    return ep, study_year
+
+
+class ProblemInstance:
+    """
+    Integer-encoded form of one scheduling problem.
+
+    Groups, EPs, courses, rooms, days and time slots get dense ids once, and every
+    session of ``raw_genes`` (one per group of a joint lecture) gets a row in the
+    ``session_*`` tables. The GA works on these ids only; names are looked up again
+    when a schedule is exported.
+    """
+
+    def __init__(self, rooms):
+        self.days = list(DAYS)
+        self.slots = sorted(set(FIRST_YEAR_TIMESLOTS) | set(UPPER_YEAR_TIMESLOTS) | set(ONLINE_LECTURE_TIMES))
+        self.day_index = {d: i for i, d in enumerate(self.days)}
+        self.slot_index = {t: i for i, t in enumerate(self.slots)}
+        self.slot_hours = [int(t[:2]) for t in self.slots]
+        self.online_slots = [self.slot_index[t] for t in ONLINE_LECTURE_TIMES]
+        self.is_online_slot = [t in ONLINE_LECTURE_TIMES for t in self.slots]
+
+        self.types = list(SESSION_TYPES)
+        self.type_index = {t: i for i, t in enumerate(self.types)}
+
+        self.eps, self.ep_index = [], {}
+        self.groups, self.group_index = [], {}
+        self.group_ep, self.group_year = [], []
+        self.group_days, self.group_slots = [], []          # allowed ids, in config order
+        self.group_day_ok, self.group_slot_ok = [], []      # masks over all days / slots
+
+        self.courses, self.course_index = [], {}
+        self.course_is_pe, self.course_room_count = [], []
+
+        self.rooms, self.room_index = [], {}
+        self.room_is_gym = []
+        self.teaching_rooms = [self.room_id(r) for r in rooms]
+        self.gym_room = self.room_id("Gym")
+        self.online_room = self.room_id("Online")
+
+        # Joint-lecture key: (course, type, EP, study year) -> id
+        self.joint_index = {}
+        self.joint_is_lecture, self.joint_is_pe = [], []
+
+        self.session_group, self.session_course, self.session_type = [], [], []
+        self.session_online, self.session_online_lecture = [], []
+        self.session_joint, self.session_batch = [], []
+        self.batches = []                                   # raw gene -> list of session ids
+        self.batch_joint = []                               # raw gene had "joint_groups"
+        self.session_pin = []                               # (day, slot, room) ids of a pinned session, else None
+        self.pinned = np.zeros(0, dtype=bool)               # set by compile_problem
+        self.free_sessions = np.zeros(0, dtype=np.int64)    # sessions the search may move
+        self.precedence_penalty = 0
+
+    def __deepcopy__(self, memo):
+        # Shared by every chromosome of a run, never copied with them
+        return self
+
+    # --- interning -------------------------------------------------------
+
+    def group_id(self, name):
+        gid = self.group_index.get(name)
+        if gid is None:
+            gid = len(self.groups)
+            ep, study_year = parse_group(name)
+            if ep not in self.ep_index:
+                self.ep_index[ep] = len(self.eps)
+                self.eps.append(ep)
+            allowed_days = GROUP_YEAR_DAYS.get(study_year, [])
+            allowed_slots = FIRST_YEAR_TIMESLOTS if study_year == 1 else UPPER_YEAR_TIMESLOTS
+            self.group_index[name] = gid
+            self.groups.append(name)
+            self.group_ep.append(self.ep_index[ep])
+            self.group_year.append(study_year)
+            self.group_days.append([self.day_index[d] for d in allowed_days])
+            self.group_slots.append([self.slot_index[t] for t in allowed_slots])
+            self.group_day_ok.append([d in allowed_days for d in self.days])
+            self.group_slot_ok.append([t in allowed_slots for t in self.slots])
+        return gid
+
+    def course_id(self, name):
+        cid = self.course_index.get(name)
+        if cid is None:
+            cid = len(self.courses)
+            self.course_index[name] = cid
+            self.courses.append(name)
+            self.course_is_pe.append(is_pe_course(name))
+            self.course_room_count.append(name.count("/") + 1)
+        return cid
+
+    def room_id(self, name):
+        """
+        Id of a room string; elective room combinations like 'A,B' get their own id.
+        The table never grows past MAX_ROOM_IDS, so ids always fit the chromosome columns.
+        """
+        rid = self.room_index.get(name)
+        if rid is None:
+            rid = len(self.rooms)
+            if rid >= MAX_ROOM_IDS:
+                raise RuntimeError(f"Room table is full ({MAX_ROOM_IDS} rooms and room combinations); "
+                                   f"cannot add {name!r}")
+            self.room_index[name] = rid
+            self.rooms.append(name)
+            self.room_is_gym.append(name.strip().lower() == "gym")
+        return rid
+
+    def combination_id(self, room_ids):
+        """
+        Id of the room combination of real room ids ``room_ids``. Parts are
+        joined in room-table order, so every pick of the same rooms shares one id.
+        """
+        return self.room_id(",".join(self.rooms[r] for r in sorted(room_ids)))
+
+    def parse_room(self, name):
+        """Id of a room string as genes and pins spell it: comma-joined rooms go through ``combination_id``."""
+        parts = name.split(",")
+        if len(parts) == 1:
+            return self.room_id(name)
+        return self.combination_id([self.room_id(part) for part in parts])
+
+    def export_rooms(self, room_ids):
+        """
+        ``room_ids`` renumbered over just the rooms they use, with those rooms'
+        names: what another copy of this problem needs to ``adopt_rooms`` them.
+        """
+        used, local = np.unique(np.asarray(room_ids), return_inverse=True)
+        return local.astype(np.asarray(room_ids).dtype), [self.rooms[r] for r in used]
+
+    def adopt_rooms(self, room_ids, names):
+        """Translate room ids from another copy of this problem (whose room table is ``names``)."""
+        mapping = np.asarray([self.room_id(name) for name in names], dtype=np.int64)
+        return mapping[np.asarray(room_ids, dtype=np.int64)]
+
+    def joint_id(self, course, typ, group):
+        key = (course, typ, self.group_ep[group], self.group_year[group])
+        jid = self.joint_index.get(key)
+        if jid is None:
+            jid = len(self.joint_is_lecture)
+            self.joint_index[key] = jid
+            self.joint_is_lecture.append(self.types[typ].lower() == "lecture")
+            self.joint_is_pe.append(self.course_is_pe[course])
+        return jid
+
+    # --- sessions --------------------------------------------------------
+
+    def add_batch(self, groups, course, typ, delivery_mode, joint=False, pinned=None):
+        """
+        Register one raw gene; a joint lecture becomes one session per group.
+        ``pinned`` ({"day", "time", "room"} names) fixes the placement of its sessions.
+        """
+        course = self.course_id(course)
+        if typ not in self.type_index:
+            self.type_index[typ] = len(self.types)
+            self.types.append(typ)
+        typ = self.type_index[typ]
+        online = delivery_mode == "online"
+        pin = None
+        if pinned is not None:
+            # Parts are interned now, so occupancy masks cover the pinned rooms
+            pin = (self.day_index[pinned["day"]], self.slot_index[pinned["time"]], self.parse_room(pinned["room"]))
+        batch = len(self.batches)
+        sessions = []
+        for name in groups:
+            group = self.group_id(name)
+            sessions.append(len(self.session_group))
+            self.session_group.append(group)
+            self.session_course.append(course)
+            self.session_type.append(typ)
+            self.session_online.append(online)
+            self.session_online_lecture.append(online and self.types[typ].lower() == "lecture")
+            self.session_joint.append(self.joint_id(course, typ, group))
+            self.session_batch.append(batch)
+            self.session_pin.append(pin)
+        self.batches.append(sessions)
+        self.batch_joint.append(joint)
+        return sessions
+
+    @property
+    def n_sessions(self):
+        return len(self.session_group)
+
+    def is_pe_session(self, session):
+        return self.course_is_pe[self.session_course[session]]
+
+    def random_free_session(self):
+        """A random session the search may move (None when every session is pinned)."""
+        if not len(self.free_sessions):
+            return None
+        return int(self.free_sessions[random.randrange(len(self.free_sessions))])
+
+
+def compile_problem(raw_genes, rooms):
+    """One-time compile step from ``extract_raw_genes`` output to a ProblemInstance."""
+    problem = ProblemInstance(rooms)
+
+    def get_gene_group(gene):
+        if "order_group" in gene:  # a piece of a joint gene split by apply_pins
+            return gene["order_group"]
+        if "joint_groups" in gene:
+            return gene["joint_groups"][0]
+        else:
+            return gene["group"]
+
+    # Sessions are laid out in the order the constructive phase places them
+    for gene_data in sorted(raw_genes, key=get_gene_group):
+        joint = "joint_groups" in gene_data
+        groups = gene_data["joint_groups"] if joint else [gene_data["group"]]
+        problem.add_batch(groups, gene_data["course"], gene_data["type"], gene_data.get("delivery_mode", "offline"), joint,
+                          gene_data.get("pinned"))
+    problem.pinned = np.asarray([pin is not None for pin in problem.session_pin], dtype=bool)
+    problem.free_sessions = np.flatnonzero(~problem.pinned)
+
+    # --- PRACTICE BEFORE LECTURE: depends on session order only ---
+    seen_lectures = set()
+    lecture = problem.type_index["Lecture"]
+    practice = problem.type_index["Practice"]
+    for group, course, typ in zip(problem.session_group, problem.session_course, problem.session_type):
+        if typ == lecture:
+            seen_lectures.add((group, course))
+        elif typ == practice and (group, course) not in seen_lectures:
+            problem.precedence_penalty += 10
+
+    return problem
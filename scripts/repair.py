@@ -0,0 +1,136 @@
+# scripts/repair.py
+
+import random
+import numpy as np
+
+from scripts.batch_evaluator import _session_tables
+from scripts.occupancy import _allowed_cells
+
+
+def _legal_cells(problem):
+    """(sessions x cells) mask of the cells each session may legally occupy, built once per problem."""
+    cells = getattr(problem, "_legal_cells", None)
+    if cells is None or len(cells) != problem.n_sessions:
+        t = _session_tables(problem)
+        allowed = _allowed_cells(problem)
+        day_ok = t["group_day_ok"]
+        evening = np.tile(t["is_online_slot"], len(problem.days))
+        online_cells = np.repeat(day_ok, len(problem.slots), axis=1) & evening[None, :]
+        cells = np.where(
+            t["online_lecture"][:, None],
+            online_cells[t["group"]],
+            allowed[t["group"]],
+        )
+        problem._legal_cells = cells
+    return cells
+
+
+def hard_violations(chromosome):
+    """
+    Session ids involved in a hard violation: group clash, room double-booking
+    (joint lectures sharing a room and PE in the gym excepted), two evening
+    sessions for a group on one day, or a day/slot the session may not use.
+    """
+    problem = chromosome.problem
+    t = _session_tables(problem)
+    n_slots = len(problem.slots)
+    n_cells = len(problem.days) * n_slots
+    days = chromosome.day_ids.astype(np.int64)
+    cells = days * n_slots + chromosome.slot_ids
+    rooms = chromosome.room_ids.astype(np.int64)
+    group = t["group"]
+    sessions = np.arange(problem.n_sessions)
+
+    bad = ~_legal_cells(problem)[sessions, cells]
+
+    group_cell = group * n_cells + cells
+    bad |= np.bincount(group_cell)[group_cell] > 1
+
+    evening = t["is_online_slot"][chromosome.slot_ids]
+    group_day = np.where(evening, group * len(problem.days) + days, -1)
+    counts = np.bincount(group_day[evening], minlength=1)
+    bad[evening] |= counts[group_day[evening]] > 1
+
+    # A room cell is double-booked when it holds more than one occupant, a
+    # joint lecture counting as a single occupant
+    room_is_gym = np.asarray(problem.room_is_gym, dtype=bool)
+    shared = ~t["online"] & ~(t["pe"] & room_is_gym[rooms])
+    occupant = np.where(t["joint_is_lecture"][t["joint"]], -1 - t["joint"], sessions)
+    room_cell = (rooms * n_cells + cells)[shared]
+    pairs = np.unique(np.stack([room_cell, occupant[shared]]), axis=1)
+    occupants = np.bincount(pairs[0], minlength=1)
+    bad[shared] |= occupants[room_cell] > 1
+    return np.flatnonzero(bad)
+
+
+def repair(chromosome, max_moves):
+    """
+    Move up to ``max_moves`` sessions that take part in a hard violation to the
+    nearest legal cell (in day-major cell order) that is free for their group
+    and their room. When the room is taken at every such cell, a single-room
+    session moves to another free room instead. The fitness goes stale.
+    """
+    problem = chromosome.problem
+    t = _session_tables(problem)
+    violators = hard_violations(chromosome)
+    violators = violators[~problem.pinned[violators]]  # pinned sessions stay; their neighbours move
+    if not len(violators):
+        return 0
+    n_slots = len(problem.slots)
+    n_cells = len(problem.days) * n_slots
+    legal = _legal_cells(problem)
+    room_is_gym = np.asarray(problem.room_is_gym, dtype=bool)
+
+    cells = chromosome.day_ids.astype(np.int64) * n_slots + chromosome.slot_ids
+    rooms = chromosome.room_ids.astype(np.int64)
+    group_busy = np.zeros((len(problem.groups), n_cells), dtype=np.int64)
+    np.add.at(group_busy, (t["group"], cells), 1)
+    evening = np.tile(t["is_online_slot"], len(problem.days))
+    evening_busy = np.zeros((len(problem.groups), len(problem.days)), dtype=np.int64)
+    in_evening = evening[cells]
+    np.add.at(evening_busy, (t["group"][in_evening], cells[in_evening] // n_slots), 1)
+    room_busy = np.zeros((len(problem.rooms), n_cells), dtype=np.int64)
+    counted = ~t["online"] & ~(t["pe"] & room_is_gym[rooms])
+    np.add.at(room_busy, (rooms[counted], cells[counted]), 1)
+
+    # Sessions of single-room, non-PE courses may also change room
+    single_rooms = np.asarray([r for r in problem.teaching_rooms if not problem.room_is_gym[r]], dtype=np.int64)
+    course_rooms = np.asarray(problem.course_room_count)[problem.session_course]
+    swappable = counted & ~t["pe"] & (course_rooms == 1)
+
+    positions = np.arange(n_cells)
+    moved = 0
+    violators = violators.tolist()
+    random.shuffle(violators)
+    for s in violators[:max_moves]:
+        g, cell, room = t["group"][s], cells[s], rooms[s]
+        group_busy[g, cell] -= 1
+        if evening[cell]:
+            evening_busy[g, cell // n_slots] -= 1
+        if counted[s]:
+            room_busy[room, cell] -= 1
+
+        free = legal[s] & (group_busy[g] == 0)
+        free &= ~evening | np.repeat(evening_busy[g] == 0, n_slots)
+        keep_room = free & (room_busy[room] == 0) if counted[s] else free
+        candidates = np.flatnonzero(keep_room)
+        new_room = room
+        if not len(candidates) and swappable[s]:
+            # The room is taken wherever the group is free: take another single room
+            candidates = np.flatnonzero(free & (room_busy[single_rooms] == 0).any(axis=0))
+        if len(candidates):
+            target = int(candidates[np.argmin(np.abs(positions[candidates] - cell))])
+            if room_busy[room, target] and counted[s]:
+                new_room = int(random.choice(single_rooms[room_busy[single_rooms, target] == 0].tolist()))
+            if target != cell or new_room != room:
+                chromosome.move_gene(s, day=target // n_slots, slot=target % n_slots, room=new_room)
+                cells[s], rooms[s] = target, new_room
+                moved += 1
+            cell, room = target, new_room
+
+        group_busy[g, cell] += 1
+        if evening[cell]:
+            evening_busy[g, cell // n_slots] += 1
+        if counted[s]:
+            room_busy[room, cell] += 1
+    return moved
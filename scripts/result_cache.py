@@ -0,0 +1,120 @@
+# scripts/result_cache.py
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+from scripts import config
+
+# Settings that do not change which schedule a run produces
+_NOT_HYPERPARAMETERS = ("INPUT_FILE",)
+_NOT_HYPERPARAMETER_PREFIXES = ("JOB_", "RESULT_CACHE_", "PARSED_CACHE_")
+
+
+def hyperparameters():
+    """Every upper-case ``scripts.config`` setting that can influence the generated schedule."""
+    params = {}
+    for name in sorted(dir(config)):
+        if not name.isupper() or name in _NOT_HYPERPARAMETERS or name.startswith(_NOT_HYPERPARAMETER_PREFIXES):
+            continue
+        value = getattr(config, name)
+        try:
+            json.dumps(value)
+        except TypeError:
+            continue
+        params[name] = value
+    return params
+
+
+def cache_key(workbook_path, trimester, options=None):
+    """
+    Content address of a generation: SHA-256 of the workbook bytes, the
+    trimester, the config hyperparameters and the run options (engine, seed...).
+    """
+    digest = hashlib.sha256()
+    with open(workbook_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps(
+        {"trimester": int(trimester), "config": hyperparameters(), "options": options or {}},
+        sort_keys=True,
+    ).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Finished generations on disk, one folder per cache key holding the
+    metrics and the output files, evicted least-recently-used once the
+    folder grows past ``max_bytes``. Entries are written to a temporary
+    folder and renamed into place, so concurrent processes never see half of one.
+    """
+
+    def __init__(self, folder=None, max_bytes=None):
+        self.folder = folder or config.RESULT_CACHE_FOLDER
+        self.max_bytes = config.RESULT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def _entry(self, key):
+        return os.path.join(self.folder, key)
+
+    def get(self, key):
+        """
+        ``{"metrics": ..., "files": {name: path}}`` for a cached key (marking it
+        recently used), else None. An entry (or the whole folder) removed while
+        it is read is a miss; callers reading the files afterwards must treat
+        OSError the same way, since ``evict`` may still delete them.
+        """
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, "metrics.json"), encoding="utf-8") as f:
+                metrics = json.load(f)
+            os.utime(entry)  # LRU order is the folder mtime
+            names = os.listdir(entry)
+        except (OSError, json.JSONDecodeError):
+            return None
+        files = {name: os.path.join(entry, name) for name in names if name != "metrics.json"}
+        return {"metrics": metrics, "files": files}
+
+    def put(self, key, metrics, files):
+        """Store ``metrics`` and copies of ``files`` (paths) under ``key``, then evict down to the size limit."""
+        os.makedirs(self.folder, exist_ok=True)
+        tmp = os.path.join(self.folder, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        for path in files:
+            shutil.copyfile(path, os.path.join(tmp, os.path.basename(path)))
+        with open(os.path.join(tmp, "metrics.json"), "w", encoding="utf-8") as f:
+            json.dump(metrics, f)
+        shutil.rmtree(self._entry(key), ignore_errors=True)
+        try:
+            os.replace(tmp, self._entry(key))
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)  # another process stored the same key first
+        self.evict()
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits in ``max_bytes``."""
+        entries = []
+        for name in os.listdir(self.folder):
+            entry = self._entry(name)
+            if name.startswith("."):
+                # Temporary folder of a writer that died mid-put
+                if time.time() - os.path.getmtime(entry) > 3600:
+                    shutil.rmtree(entry, ignore_errors=True)
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+                entries.append((os.path.getmtime(entry), size, entry))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
@@ -0,0 +1,184 @@
+# scripts/run_batch.py
+"""
+Batch generation: every (workbook, trimester) pair in one command.
+
+Each workbook is parsed once, then the independent generations run on a
+process pool and write their outputs through config.get_output_paths
+(``outputs/`` for a single workbook, ``outputs/<workbook name>/`` for several;
+see ``output_folders`` for workbooks sharing a name).
+
+    python -m scripts.run_batch --trimesters 1 2 3 --inputs inputs/A.xlsx inputs/B.xlsx --jobs 3
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import time
+
+from scripts.data_loader import preprocess_data, extract_raw_genes
+from scripts.scheduler import run_scheduler
+from scripts.annealing import run_annealing
+from scripts.local_search import LOCAL_SEARCHES
+from scripts.anytime import ignore_interrupts
+from scripts.batch_evaluator import penalties
+from scripts.exporter import export_schedule
+from scripts.pinning import pins_from_sheet, apply_pins, describe_pins
+from scripts.config import get_output_paths
+from scripts import config
+
+
+def run_job(job):
+    """
+    Run one generation and export it. ``job`` is a dict with the workbook
+    label, trimester, raw genes, rooms, output folder, seed and run options;
+    returns a summary row. Searches run single-process: the batch itself
+    is what is spread over the pool.
+    """
+    start = time.time()
+    random.seed(job["seed"])  # None reseeds from the OS; forked workers would otherwise share one stream
+    options = job["options"]
+    if options["engine"] == "sa":
+        best_schedule, fitness_progress = run_annealing(
+            job["raw_genes"], job["rooms"], verbose=False,
+            time_budget_seconds=options["time_budget"],
+        )
+    else:
+        best_schedule, fitness_progress = run_scheduler(
+            job["raw_genes"], job["rooms"], verbose=False, workers=0, islands=0,
+            repair_rate=options["repair_rate"],
+            local_search=options["local_search"],
+            time_budget_seconds=options["time_budget"],
+        )
+    # Scored before export, which rewrites Gym/Online rooms in place
+    fitness = best_schedule.fitness
+    hard, soft = penalties(best_schedule)
+
+    json_out, excel_out = get_output_paths(job["trimester"], job["folder"])
+    export_schedule(best_schedule, json_out, excel_out)
+    return {
+        "workbook": job["workbook"],
+        "trimester": job["trimester"],
+        "sessions": len(best_schedule.genes),
+        "fitness": fitness,
+        "hard": hard,
+        "soft": soft,
+        "generations": len(fitness_progress),
+        "seconds": time.time() - start,
+        "excel": excel_out,
+    }
+
+
+def output_folders(inputs):
+    """
+    ``(label, output folder)`` of each workbook: ``outputs`` for a single one,
+    else ``outputs/<workbook name>``. Workbooks sharing a name (in different
+    folders) are labelled by their path below the inputs' common folder
+    instead, so their outputs do not overwrite each other.
+    """
+    paths = [os.path.abspath(path) for path in inputs]
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    if len(paths) == 1:
+        return [(names[0], "outputs")]
+    common = os.path.commonpath([os.path.dirname(path) for path in paths])
+    labels = [name if names.count(name) == 1 else os.path.splitext(os.path.relpath(path, common))[0]
+              for path, name in zip(paths, names)]
+    return [(label, os.path.join("outputs", label)) for label in labels]
+
+
+def build_jobs(inputs, trimesters, options, seed):
+    """
+    One job per (workbook, trimester) with sessions; each workbook is parsed
+    once and its Pinned sheet, if any, applies to every trimester.
+    """
+    jobs, skipped = [], []
+    for path, (name, folder) in zip(inputs, output_folders(inputs)):
+        data = preprocess_data(path)
+        rooms = data["rooms"]["Room"].tolist()
+        pins = pins_from_sheet(data["pinned"])
+        for trimester in trimesters:
+            raw_genes = extract_raw_genes(data["groups"], data["courses"], trimester)
+            if not raw_genes:
+                skipped.append((name, trimester))
+                continue
+            if pins:
+                raw_genes, report = apply_pins(raw_genes, pins, rooms)
+                print(f"📌 {name} T{trimester}: {describe_pins(report)}")
+            jobs.append({
+                "workbook": name,
+                "trimester": trimester,
+                "raw_genes": raw_genes,
+                "rooms": rooms,
+                "folder": folder,
+                "seed": None if seed is None else seed + len(jobs),
+                "options": options,
+            })
+    return jobs, skipped
+
+
+def print_summary(results):
+    print(f"{'workbook':<24} | {'T':>2} | {'sessions':>8} | {'fitness':>9} | {'hard':>7} | {'soft':>7} | "
+          f"{'gens':>5} | {'seconds':>8} | output")
+    for r in results:
+        print(f"{r['workbook'][:24]:<24} | {r['trimester']:>2} | {r['sessions']:>8} | {r['fitness']:>9} | "
+              f"{r['hard']:>7} | {r['soft']:>7} | {r['generations']:>5} | {r['seconds']:>8.1f} | {r['excel']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate schedules for several trimesters and/or workbooks")
+    parser.add_argument("--trimesters", type=int, nargs="+", default=[1, 2, 3],
+                        help="Trimester numbers (default: 1 2 3)")
+    parser.add_argument("--inputs", nargs="+", default=None,
+                        help="Input workbooks (default: config.INPUT_FILE)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Generations running at the same time (default: one per CPU)")
+    parser.add_argument("--engine", choices=["ga", "sa"], default=None,
+                        help="Search engine: genetic algorithm or simulated annealing (default: config.ENGINE)")
+    parser.add_argument("--repair-rate", type=float, default=None,
+                        help="Share of children passed through the repair operator (default: config.REPAIR_RATE)")
+    parser.add_argument("--local-search", choices=["none", *LOCAL_SEARCHES], default=None,
+                        help="Memetic local search (default: config.LOCAL_SEARCH)")
+    parser.add_argument("--time-budget", type=float, default=None, metavar="SECONDS",
+                        help="Search time per generation job (ignores generation limits)")
+    parser.add_argument("--seed", type=int, default=config.RANDOM_SEED,
+                        help="Seed of the first job; later jobs use seed+1, seed+2, ... (default: config.RANDOM_SEED)")
+    args = parser.parse_args()
+
+    inputs = args.inputs or [config.INPUT_FILE]
+    if len({os.path.abspath(path) for path in inputs}) < len(inputs):
+        parser.error("the same workbook is listed more than once in --inputs")
+    options = {
+        "engine": args.engine or config.ENGINE,
+        "repair_rate": args.repair_rate,
+        "local_search": args.local_search,
+        "time_budget": args.time_budget,
+    }
+
+    start = time.time()
+    print(f"🔍 Preprocessing {len(inputs)} workbook(s)...")
+    jobs, skipped = build_jobs(inputs, args.trimesters, options, args.seed)
+    for name, trimester in skipped:
+        print(f"❗ {name} T{trimester}: no sessions for this trimester, skipped.")
+    if not jobs:
+        return
+
+    processes = min(args.jobs or os.cpu_count() or 1, len(jobs))
+    print(f"⚙️ Running {len(jobs)} generation(s) on {processes} process(es)...")
+    results = []
+    if processes <= 1:
+        for job in jobs:
+            results.append(run_job(job))
+            print(f"✅ {job['workbook']} T{job['trimester']}: fitness {results[-1]['fitness']}")
+    else:
+        with mp.Pool(processes, initializer=ignore_interrupts) as pool:
+            for result in pool.imap(run_job, jobs):
+                results.append(result)
+                print(f"✅ {result['workbook']} T{result['trimester']}: fitness {result['fitness']}")
+
+    print()
+    print_summary(results)
+    print(f"⏱️  Total batch time: {time.time() - start:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
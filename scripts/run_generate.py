@@ -7,21 +7,66 @@ import sys
 
 from scripts.data_loader import preprocess_data, extract_raw_genes
 from scripts.scheduler import run_scheduler
+from scripts.annealing import run_annealing
+from scripts.local_search import LOCAL_SEARCHES, local_search_name
+from scripts.anytime import BestSnapshot, stop_on_signals
 from scripts.exporter import export_schedule
+from scripts.pinning import load_pins, pins_from_sheet, apply_pins, describe_pins
 from scripts.config import get_output_paths
 from scripts import config
+from scripts import tracing
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate schedule using Genetic Algorithm")
     parser.add_argument("trimester", type=int, help="Trimester number (e.g. 1, 2, or 3)")
     parser.add_argument("--input", help="Path to override default config.INPUT_FILE", default=None)
+    parser.add_argument("--engine", choices=["ga", "sa"], default=None,
+                        help="Search engine: genetic algorithm or simulated annealing (default: config.ENGINE)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Breed and score children on N processes (default: config.PARALLEL_WORKERS)")
+    parser.add_argument("--islands", type=int, default=None,
+                        help="Evolve N sub-populations in parallel with migration (default: config.ISLANDS)")
+    parser.add_argument("--migration-interval", type=int, default=None,
+                        help="Generations between island migrations (default: config.MIGRATION_INTERVAL)")
+    parser.add_argument("--topology", choices=["ring", "full"], default=None,
+                        help="Island migration topology (default: config.MIGRATION_TOPOLOGY)")
+    parser.add_argument("--repair-rate", type=float, default=None,
+                        help="Share of children passed through the hard-constraint repair operator, 0-1 "
+                             "(default: config.REPAIR_RATE)")
+    parser.add_argument("--local-search", choices=["none", *LOCAL_SEARCHES], default=None,
+                        help="Memetic local search on the elite and the final schedule "
+                             "(default: config.LOCAL_SEARCH)")
+    parser.add_argument("--time-budget", type=float, default=None, metavar="SECONDS",
+                        help="Keep searching until this many seconds have passed (ignores generation limits)")
+    parser.add_argument("--pins", default=None, metavar="JSON",
+                        help="Sessions to keep fixed, as a timetable JSON (default: the workbook's Pinned sheet)")
+    parser.add_argument("--no-input-cache", action="store_true",
+                        help="Re-parse the workbook instead of using the parsed-input cache")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print phase timings and hot-path counters at the end of the run")
+    parser.add_argument("--cprofile", default=None, metavar="PATH",
+                        help="Also dump cProfile stats of the run to PATH (pstats format, implies --profile)")
     args = parser.parse_args()
 
+    engine = args.engine or config.ENGINE
+    if engine == "sa":
+        ga_only = [flag for flag, value in (("--workers", args.workers), ("--islands", args.islands),
+                                            ("--migration-interval", args.migration_interval),
+                                            ("--topology", args.topology), ("--repair-rate", args.repair_rate),
+                                            ("--local-search", local_search_name(args.local_search)))
+                   if value is not None]
+        if ga_only:
+            parser.error(f"{', '.join(ga_only)} only apply to the genetic algorithm (--engine ga)")
+
     if args.input:
         config.INPUT_FILE = args.input
+    if args.no_input_cache:
+        config.PARSED_CACHE_ENABLED = False
 
     trimester = args.trimester
+    if args.profile or args.cprofile:
+        tracing.enable(args.cprofile)
 
     start_ts = datetime.datetime.now()
     start_time = time.time()
@@ -30,7 +75,9 @@ def main():
     print(f"📄 Input file: {config.INPUT_FILE}")
 
     print("🔍 Preprocessing input data...")
+    preprocess_start = time.time()
     data = preprocess_data()
+    print(f"⏱️  Input loaded in {time.time() - preprocess_start:.2f} sec")
     groups_df = data["groups"]
     courses_df = data["courses"]
     rooms_df = data["rooms"]
@@ -40,16 +87,58 @@ def main():
     if not raw_genes:
         print("❗ No genes were generated. Check your input data for this trimester and year.")
         sys.exit(1)
+    pins = load_pins(args.pins) if args.pins else pins_from_sheet(data["pinned"])
+    if pins:
+        raw_genes, pin_report = apply_pins(raw_genes, pins, rooms_df["Room"].tolist())
+        print(f"📌 Pinned sessions: {describe_pins(pin_report)}")
 
     valid_rooms = rooms_df["Room"].tolist()
-    print("⚙️ Running genetic algorithm scheduler...")
-    best_schedule, fitness_progress = run_scheduler(raw_genes, valid_rooms)
+    stats = {}
+    # Ctrl+C / SIGTERM end the search after the current generation; the best so far is still exported
+    with stop_on_signals(BestSnapshot()) as snapshot:
+        if engine == "sa":
+            print("⚙️ Running simulated annealing scheduler...")
+            best_schedule, fitness_progress = run_annealing(
+                raw_genes, valid_rooms,
+                time_budget_seconds=args.time_budget,
+                snapshot=snapshot,
+                stats=stats,
+            )
+        else:
+            print("⚙️ Running genetic algorithm scheduler...")
+            best_schedule, fitness_progress = run_scheduler(
+                raw_genes, valid_rooms,
+                workers=args.workers,
+                islands=args.islands,
+                migration_interval=args.migration_interval,
+                topology=args.topology,
+                repair_rate=args.repair_rate,
+                local_search=args.local_search,
+                time_budget_seconds=args.time_budget,
+                snapshot=snapshot,
+                stats=stats,
+            )
+    if snapshot.stop_requested:
+        print("⏸️  Search interrupted: exporting the best schedule found so far.")
 
     print(f"✅ Best fitness found: {best_schedule.fitness}")
-    print(f"📈 Total generations run: {len(fitness_progress)}")
+    print(f"📈 Total {'epochs' if engine == 'sa' else 'generations'} run: {len(fitness_progress)}")
+    print(f"🧱 Initial population built in {stats['initial_population_seconds']:.2f} seconds")
+    if stats.get("unassigned"):
+        print(f"⚠️  {len(stats['unassigned'])} session(s) found no free slot during construction:")
+        for entry in stats["unassigned"][:10]:
+            print(f"   - {entry['group']} | {entry['course']} ({entry['type']})")
+        if len(stats["unassigned"]) > 10:
+            print(f"   ... and {len(stats['unassigned']) - 10} more")
+    if "local_search" in stats:
+        print(f"🧗 Local search: {stats['local_search']['before']} -> {stats['local_search']['after']}")
+    for k, history in enumerate(stats.get("island_histories", []), start=1):
+        print(f"🏝️  Island {k} best fitness: {history[-1]}")
 
     json_out, excel_out = get_output_paths(trimester)
-    export_schedule(best_schedule, json_out, excel_out)
+    # An export that has started is finished even if a signal arrives now
+    with stop_on_signals(snapshot):
+        export_schedule(best_schedule, json_out, excel_out)
 
     end_ts = datetime.datetime.now()
     elapsed = time.time() - start_time
@@ -58,6 +147,13 @@ def main():
     print(f"📁 Output files saved to:\n   Excel: {excel_out}\n   JSON:  {json_out}")
     print(f"📊 Final gene count in schedule: {len(best_schedule.genes)}")
 
+    profile = tracing.disable()
+    if profile is not None:
+        print("🔬 Profile:")
+        print(tracing.format_report(profile))
+        if args.cprofile:
+            print(f"   cProfile stats written to {args.cprofile}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,77 @@
+# scripts/run_incremental.py
+"""
+Incremental re-scheduling: update a previous timetable after the input
+workbook changed, moving as few sessions as possible.
+
+    python -m scripts.run_incremental 1 --previous outputs/timetable_T1.json --input inputs/GA_Input.xlsx
+"""
+
+import argparse
+import sys
+import time
+
+from scripts.data_loader import preprocess_data, extract_raw_genes
+from scripts.scheduler import run_scheduler
+from scripts.annealing import run_annealing
+from scripts.anytime import BestSnapshot, stop_on_signals
+from scripts.batch_evaluator import penalties
+from scripts.incremental import reschedule
+from scripts.exporter import export_schedule
+from scripts.config import get_output_paths
+from scripts import config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-schedule a previous timetable after an input change")
+    parser.add_argument("trimester", type=int, help="Trimester number (e.g. 1, 2, or 3)")
+    parser.add_argument("--previous", default=None, metavar="JSON",
+                        help="Previous timetable (default: the trimester's output JSON)")
+    parser.add_argument("--input", help="Path to override default config.INPUT_FILE", default=None)
+    parser.add_argument("--engine", choices=["ga", "sa"], default="sa",
+                        help="Search over the released sessions (default: sa)")
+    parser.add_argument("--time-budget", type=float, default=config.INCREMENTAL_TIME_BUDGET, metavar="SECONDS",
+                        help="Search time (default: config.INCREMENTAL_TIME_BUDGET)")
+    args = parser.parse_args()
+
+    if args.input:
+        config.INPUT_FILE = args.input
+    json_out, excel_out = get_output_paths(args.trimester)
+    previous = args.previous or json_out
+
+    start_time = time.time()
+    print(f"📄 Input file: {config.INPUT_FILE}")
+    print(f"🗂️  Previous timetable: {previous}")
+    data = preprocess_data()
+    raw_genes = extract_raw_genes(data["groups"], data["courses"], args.trimester)
+    if not raw_genes:
+        print("❗ No genes were generated. Check your input data for this trimester and year.")
+        sys.exit(1)
+
+    search = run_annealing if args.engine == "sa" else run_scheduler
+    with stop_on_signals(BestSnapshot()) as snapshot:
+        best_schedule, report = reschedule(
+            previous, raw_genes, data["rooms"]["Room"].tolist(), args.time_budget,
+            verbose=False, snapshot=snapshot, search=search,
+        )
+    hard, soft = penalties(best_schedule)
+
+    print(f"➕ Sessions added: {report['added']} | ➖ removed: {report['removed']}")
+    if report["groups_added"] or report["groups_removed"]:
+        print(f"👥 Groups added: {', '.join(report['groups_added']) or '-'} | "
+              f"removed: {', '.join(report['groups_removed']) or '-'}")
+    if report["rooms_removed"]:
+        print(f"🚪 Rooms removed: {', '.join(report['rooms_removed'])} "
+              f"({report['room_changes']} session(s) displaced)")
+    print(f"📌 {report['pinned']} session(s) kept in place, {report['free']} re-optimized "
+          f"({report['released']} conflicting neighbour(s) released)")
+    print(f"🔀 Sessions moved versus the previous timetable: {report['moved']}")
+    print(f"✅ Fitness: {best_schedule.fitness} (hard {hard}, soft {soft}) in {report['seconds']:.2f} seconds")
+
+    with stop_on_signals(snapshot):
+        export_schedule(best_schedule, json_out, excel_out)
+    print(f"⏱️  Total time: {time.time() - start_time:.2f} seconds")
+    print(f"📁 Output files saved to:\n   Excel: {excel_out}\n   JSON:  {json_out}")
+
+
+if __name__ == "__main__":
+    main()
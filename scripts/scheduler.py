@@ -1,323 +1,396 @@
 import random
-from copy import deepcopy
-from collections import defaultdict
+import time
+import numpy as np
 from scripts.chromosome import Chromosome
-from scripts.gene import Gene
+from scripts.batch_evaluator import score_population, penalties
+from scripts.occupancy import Occupancy
+from scripts.parallel import ParallelEvolver, build_population
+from scripts.islands import run_islands
+from scripts.problem import compile_problem
+from scripts.repair import repair
+from scripts.local_search import get_local_search, improve_elite
+from scripts.anytime import BestSnapshot, ProgressThrottle
+from scripts.tracing import count, span, traced
 from scripts.config import (
     POPULATION_SIZE,
     GENERATIONS,
     CROSSOVER_RATE,
     MUTATION_RATE,
     EARLY_STOP_GENERATIONS,
-    FIRST_YEAR_TIMESLOTS,
-    UPPER_YEAR_TIMESLOTS,
-    GROUP_YEAR_DAYS,
-    ONLINE_LECTURE_TIMES,
+    PARALLEL_WORKERS,
+    BATCH_SPLIT_ATTEMPTS,
+    REPAIR_RATE,
+    REPAIR_MAX_MOVES,
+    LOCAL_SEARCH,
+    LOCAL_SEARCH_INTERVAL,
+    LOCAL_SEARCH_ELITE,
+    LOCAL_SEARCH_SECONDS,
+    LOCAL_SEARCH_FINAL_SECONDS,
+    ISLANDS,
+    MIGRATION_INTERVAL,
+    MIGRATION_SIZE,
+    MIGRATION_TOPOLOGY,
+    PROGRESS_INTERVAL_SECONDS,
 )
-import itertools
-
-def get_valid_slots_for_group(group_name):
-    year = int(group_name.split("-")[1][:2])
-    admission_year = 2000 + year
-    study_year = 2024 - admission_year
-    days = GROUP_YEAR_DAYS.get(study_year, [])
-    if study_year == 1:
-        slots = [f"{hour:02d}:00" for hour in range(8, 14)]
+
+def get_valid_slots_for_group(problem, group):
+    """Allowed day and slot ids of a group id (fresh lists, safe to shuffle)."""
+    return list(problem.group_days[group]), list(problem.group_slots[group])
+
+def place_sessions(problem, placement, occupancy, sessions, cell, room, booked_rooms=()):
+    """Write sessions into the placement columns at ``cell`` and mark their groups/rooms busy."""
+    day, slot = divmod(cell, occupancy.n_slots)
+    day_ids, slot_ids, room_ids = placement
+    for s in sessions:
+        day_ids[s] = day
+        slot_ids[s] = slot
+        room_ids[s] = room
+    occupancy.book([problem.session_group[s] for s in sessions], cell, booked_rooms)
+
+def place_randomly(problem, placement, occupancy, session):
+    """Last resort for a session that found no free slot; conflicts are left to the penalties."""
+    group = problem.session_group[session]
+    if problem.session_online_lecture[session]:
+        room = problem.online_room
+        slots = problem.online_slots
     else:
-        slots = [f"{hour:02d}:00" for hour in range(8, 20)]
-    return days, slots
+        room = problem.gym_room if problem.is_pe_session(session) else random.choice(problem.teaching_rooms)
+        slots = problem.group_slots[group]
+    days = problem.group_days[group] or range(len(problem.days))
+    cell = random.choice(days) * occupancy.n_slots + random.choice(slots)
+    place_sessions(problem, placement, occupancy, [session], cell, room)
 
-def get_group_ep_year(group_name):
-    ep = group_name.split("-")[0].upper()
-    year_num = int(group_name.split("-")[1][:2])
-    admission_year = 2000 + year_num
-    study_year = 2024 - admission_year
-    return ep, study_year
+def assign_online(problem, placement, occupancy, sessions, days):
+    """Online lectures take the earliest free evening slot on the first day (in ``days`` order) that has one."""
+    n_slots = occupancy.n_slots
+    for s in sessions:
+        busy = occupancy.group_busy[problem.session_group[s]]
+        cell = next((day * n_slots + slot for day in days for slot in problem.online_slots
+                     if not busy[day * n_slots + slot]), None)
+        if cell is None:
+            # If all allowed slots are booked, still assign randomly (will be penalized for conflicts)
+            cell = random.choice(days) * n_slots + random.choice(problem.online_slots)
+        place_sessions(problem, placement, occupancy, [s], cell, problem.online_room)
+
+def assign_offline(problem, placement, occupancy, sessions, pool, day_major=False):
+    """Place sessions together in a random free cell that still has enough free rooms in ``pool``."""
+    groups = [problem.session_group[s] for s in sessions]
+    needed_rooms = problem.course_room_count[problem.session_course[sessions[0]]]
+    cell = occupancy.pick_cell(occupancy.feasible_cells(groups, pool, needed_rooms), day_major)
+    if cell is None:
+        return False
+    rooms = occupancy.pick_rooms(cell, pool, needed_rooms)
+    room = problem.combination_id(rooms)
+    place_sessions(problem, placement, occupancy, sessions, cell, room, rooms)
+    return True
 
-def get_elective_room_count(course_name):
-    return course_name.count("/") + 1
+def split_batch(problem, placement, occupancy, sessions, pool):
+    """
+    Greedy max-cover split of a batch that does not fit as a whole: place the
+    largest subset of groups that shares a free cell, then repeat with the rest,
+    at most ``BATCH_SPLIT_ATTEMPTS`` times. Returns the sessions left unplaced.
+    """
+    needed_rooms = problem.course_room_count[problem.session_course[sessions[0]]]
+    remaining = list(sessions)
+    for _ in range(BATCH_SPLIT_ATTEMPTS):
+        if not remaining:
+            break
+        groups = [problem.session_group[s] for s in remaining]
+        fits = occupancy.group_cells(groups, pool, needed_rooms)
+        cover = fits.sum(axis=0)
+        best = cover.max()
+        if best == 0:
+            break
+        cell = occupancy.pick_cell(cover == best)
+        subgroup = [s for s, ok in zip(remaining, fits[:, cell]) if ok]
+        rooms = occupancy.pick_rooms(cell, pool, needed_rooms)
+        room = problem.combination_id(rooms)
+        place_sessions(problem, placement, occupancy, subgroup, cell, room, rooms)
+        remaining = [s for s in remaining if s not in subgroup]
+    return remaining
 
-def try_assign_batch(groups, course, typ, days, slots, rooms, group_used, room_used, genes, delivery_mode="offline"):
+def try_assign_batch(problem, sessions, placement, occupancy):
+    """Place a joint batch, splitting it if needed; returns the sessions that could not be placed."""
     # Only support offline practices/labs!
     # For online lecture: assign all to Online, allowed times only
-    if delivery_mode == "online" and typ.lower() == "lecture":
-        online_slots = ONLINE_LECTURE_TIMES
-        for g in groups:
-            assigned = False
-            for day in days:
-                for time in online_slots:
-                    if time not in group_used[g][day]:
-                        genes.append(Gene(
-                            group=g,
-                            course=course,
-                            type=typ,
-                            day=day,
-                            time=time,
-                            room="Online",
-                            delivery_mode="online"
-                        ))
-                        group_used[g][day].add(time)
-                        assigned = True
-                        break
-                if assigned:
-                    break
-            if not assigned:
-                # If all allowed slots are booked, still assign randomly (will be penalized for conflicts)
-                day = random.choice(days)
-                time = random.choice(online_slots)
-                genes.append(Gene(
-                    group=g,
-                    course=course,
-                    type=typ,
-                    day=day,
-                    time=time,
-                    room="Online",
-                    delivery_mode="online"
-                ))
-                group_used[g][day].add(time)
-        return True
+    if problem.session_online_lecture[sessions[0]]:
+        days, _ = get_valid_slots_for_group(problem, problem.session_group[sessions[0]])
+        random.shuffle(days)
+        assign_online(problem, placement, occupancy, sessions, days)
+        count("try_assign_batch.online")
+        return []
 
     # Else: offline as before
-    random.shuffle(days)
-    random.shuffle(slots)
-    random.shuffle(rooms)
-    needed_rooms = get_elective_room_count(course)
-    for day in days:
-        for time in slots:
-            if any(time in group_used[g][day] for g in groups):
-                continue
-            available_rooms = [room for room in rooms if not room_used[room][day][time]]
-            if len(available_rooms) >= needed_rooms:
-                room_string = ",".join(available_rooms[:needed_rooms])
-                for g in groups:
-                    genes.append(Gene(
-                        group=g,
-                        course=course,
-                        type=typ,
-                        day=day,
-                        time=time,
-                        room=room_string,
-                        delivery_mode="offline"
-                    ))
-                    group_used[g][day].add(time)
-                    group_ep, group_year = get_group_ep_year(g)
-                    for assigned_room in available_rooms[:needed_rooms]:
-                        room_used[assigned_room][day][time][g] = (course, typ, group_ep, group_year)
-                return True
-
-    # Fallback as before...
-    if len(groups) == 1:
-        g = groups[0]
-        # Try ALL day-time combinations, shuffled (KEY FIX)
-        day_time_pairs = [(d, t) for d in days for t in slots]
-        random.shuffle(day_time_pairs)
-        for day, time in day_time_pairs:
-            if time in group_used[g][day]:
+    if assign_offline(problem, placement, occupancy, sessions, "all", day_major=True):
+        count("try_assign_batch.whole")
+        return []
+
+    # Fallback: split into the fewest sub-batches the free cells allow
+    if len(sessions) == 1:
+        count("try_assign_batch.no_cell")
+        return list(sessions)
+    count("try_assign_batch.split")
+    remaining = split_batch(problem, placement, occupancy, sessions, "all")
+    count("try_assign_batch.split_unplaced", len(remaining))
+    return remaining
+
+def place_pinned(problem, placement, occupancy):
+    """Write every pinned session at its fixed cell and room before anything else is placed."""
+    for s in np.flatnonzero(problem.pinned):
+        day, slot, room = problem.session_pin[s]
+        if room == problem.online_room:
+            booked = ()
+        else:
+            booked = [problem.room_index[part] for part in problem.rooms[room].split(",")]
+        place_sessions(problem, placement, occupancy, [s], day * occupancy.n_slots + slot, room, booked)
+
+def build_individual(problem):
+    """
+    Greedy constructive placement of every session into one (unscored)
+    chromosome. Sessions that found no free cell are listed in the
+    chromosome's ``unassigned`` and still get a random (penalized) placement.
+    """
+    placement = ([None] * problem.n_sessions, [None] * problem.n_sessions, [None] * problem.n_sessions)
+    occupancy = Occupancy(problem)
+    pinned = problem.pinned.any()
+    if pinned:
+        place_pinned(problem, placement, occupancy)
+    for sessions, joint in zip(problem.batches, problem.batch_joint):
+        if pinned:
+            sessions = [s for s in sessions if not problem.pinned[s]]
+            if not sessions:
                 continue
-            available_rooms = [room for room in rooms if not room_used[room][day][time]]
-            if len(available_rooms) >= needed_rooms:
-                room_string = ",".join(available_rooms[:needed_rooms])
-                genes.append(Gene(
-                    group=g,
-                    course=course,
-                    type=typ,
-                    day=day,
-                    time=time,
-                    room=room_string,
-                    delivery_mode="offline"
-                ))
-                group_used[g][day].add(time)
-                group_ep, group_year = get_group_ep_year(g)
-                for assigned_room in available_rooms[:needed_rooms]:
-                    room_used[assigned_room][day][time][g] = (course, typ, group_ep, group_year)
-                return True
-        return False
+        session = sessions[0]
+        group = problem.session_group[session]
+        if joint:
+            try_assign_batch(problem, sessions, placement, occupancy)
+        elif problem.session_online_lecture[session]:
+            # Schedule online lectures only at allowed time slots
+            days, _ = get_valid_slots_for_group(problem, group)
+            random.shuffle(days)
+            assign_online(problem, placement, occupancy, sessions, days)
+        elif problem.is_pe_session(session):
+            # PE always goes to the gym, which never limits how many groups it takes
+            cell = occupancy.pick_cell(occupancy.feasible_cells([group], "all", 0))
+            if cell is not None:
+                place_sessions(problem, placement, occupancy, sessions, cell, problem.gym_room, [problem.gym_room])
+        else:
+            assign_offline(problem, placement, occupancy, sessions, "no_gym")
+
+    # Sessions that found no free slot still need a position in the chromosome
+    unassigned = [session for session in range(problem.n_sessions) if placement[0][session] is None]
+    count("unassigned_sessions", len(unassigned))
+    for session in unassigned:
+        place_randomly(problem, placement, occupancy, session)
+    chromosome = Chromosome(problem, *placement)
+    chromosome.unassigned = unassigned
+    return chromosome
+
+@traced("initial_population")
+def generate_initial_population(problem, workers=0):
+    if workers > 1:
+        # Individuals are independent: build them on a process pool
+        population = build_population(problem, POPULATION_SIZE, workers)
     else:
-        for sz in range(len(groups) - 1, 0, -1):
-            for subgroups in itertools.combinations(groups, sz):
-                assigned = try_assign_batch(list(subgroups), course, typ, days, slots, rooms, group_used, room_used, genes)
-                if assigned:
-                    rest = [g for g in groups if g not in subgroups]
-                    try_assign_batch(rest, course, typ, days, slots, rooms, group_used, room_used, genes)
-                    return True
-        return False
+        population = [build_individual(problem) for _ in range(POPULATION_SIZE)]
+    return score_population(population)
 
-def generate_initial_population(raw_genes, rooms):
-    population = []
-    for _ in range(POPULATION_SIZE):
-        genes = []
-        group_used = defaultdict(lambda: defaultdict(set))
-        room_used = defaultdict(lambda: defaultdict(lambda: defaultdict(dict)))
-        def get_gene_group(gene):
-            if "joint_groups" in gene:
-                return gene["joint_groups"][0]
-            else:
-                return gene["group"]
-        raw_genes_sorted = sorted(raw_genes, key=get_gene_group)
-        for gene_data in raw_genes_sorted:
-            typ = gene_data["type"]
-            delivery_mode = gene_data.get("delivery_mode", "offline")
-            if "joint_groups" in gene_data:
-                groups = gene_data["joint_groups"]
-                course = gene_data["course"]
-                group = groups[0]
-                days, slots = get_valid_slots_for_group(group)
-                try_assign_batch(groups, course, typ, days, slots, rooms, group_used, room_used, genes, delivery_mode)
-            else:
-                group = gene_data["group"]
-                course = gene_data["course"]
-                days, slots = get_valid_slots_for_group(group)
-                random.shuffle(days)
-                random.shuffle(slots)
-                is_pe = "physical education" in course.lower() or course.strip().upper() == "PE"
-                if typ.lower() == "lecture" and delivery_mode == "online":
-                    # Schedule online lectures only at allowed time slots
-                    online_slots = ONLINE_LECTURE_TIMES
-                    assigned = False
-                    for day in days:
-                        for time in online_slots:
-                            if time not in group_used[group][day]:
-                                genes.append(Gene(
-                                    group=group,
-                                    course=course,
-                                    type=typ,
-                                    day=day,
-                                    time=time,
-                                    room="Online",
-                                    delivery_mode="online"
-                                ))
-                                group_used[group][day].add(time)
-                                assigned = True
-                                break
-                        if assigned:
-                            break
-                    if not assigned:
-                        day = random.choice(days)
-                        time = random.choice(online_slots)
-                        genes.append(Gene(
-                            group=group,
-                            course=course,
-                            type=typ,
-                            day=day,
-                            time=time,
-                            room="Online",
-                            delivery_mode="online"
-                        ))
-                        group_used[group][day].add(time)
-                    continue
-                if is_pe:
-                    room = "Gym"
-                    candidate_rooms = ["Gym"]
-                else:
-                    candidate_rooms = [r for r in rooms if r.strip().lower() != "gym"]
-                    random.shuffle(candidate_rooms)
-                found = False
-                elective_room_count = get_elective_room_count(course)
-                # Try ALL day-time combinations, shuffled (KEY FIX)
-                day_time_pairs = [(d, t) for d in days for t in slots]
-                random.shuffle(day_time_pairs)
-                for day, time in day_time_pairs:
-                    if time in group_used[group][day]:
-                        continue
-                    if is_pe:
-                        genes.append(Gene(
-                            group=group,
-                            course=course,
-                            type=typ,
-                            day=day,
-                            time=time,
-                            room="Gym",
-                            delivery_mode="offline"
-                        ))
-                        group_used[group][day].add(time)
-                        room_used["Gym"][day][time][group] = (course, typ, "GYM", 0)
-                        found = True
-                        break
-                    else:
-                        available_rooms = [room for room in candidate_rooms if not room_used[room][day][time]]
-                        if len(available_rooms) >= elective_room_count:
-                            room_string = ",".join(available_rooms[:elective_room_count])
-                            genes.append(Gene(
-                                group=group,
-                                course=course,
-                                type=typ,
-                                day=day,
-                                time=time,
-                                room=room_string,
-                                delivery_mode="offline"
-                            ))
-                            group_used[group][day].add(time)
-                            ep, study_year_val = get_group_ep_year(group)
-                            for assigned_room in available_rooms[:elective_room_count]:
-                                room_used[assigned_room][day][time][group] = (course, typ, ep, study_year_val)
-                            found = True
-                            break
-                if not found:
-                    # Could not assign—could add to an "unassigned" list or log
-                    pass
-        chromosome = Chromosome(genes)
-        chromosome.calculate_fitness()
-        population.append(chromosome)
-    return population
+def describe_sessions(problem, sessions):
+    """Readable (group, course, type) entries for a list of session ids."""
+    return [
+        {
+            "group": problem.groups[problem.session_group[s]],
+            "course": problem.courses[problem.session_course[s]],
+            "type": problem.types[problem.session_type[s]],
+        }
+        for s in sessions
+    ]
 
 def select_parents(population):
     sorted_pop = sorted(population, key=lambda x: x.fitness)
     return sorted_pop[:2]
 
-def evolve_population(population, rooms):
+def make_child(population, rooms, repair_rate=0.0):
+    """
+    Crossover (or clone) two random parents and mutate one session of the child;
+    with probability ``repair_rate`` the child's hard violations are then repaired.
+    """
+    problem = population[0].problem
+    parent1, parent2 = random.sample(population, 2)
+    if random.random() < CROSSOVER_RATE:
+        child = parent1.crossover(parent2)
+        count("crossovers")
+    else:
+        child = random.choice([parent1, parent2]).copy(with_evaluator=False)
+
+    # mutate only allowed fields for online lectures; pinned sessions are never mutated
+    i = problem.random_free_session()
+    if i is None:
+        pass
+    elif problem.session_online_lecture[i]:
+        group = problem.session_group[i]
+        attr = random.choice(["time", "day"])
+        count("mutations." + attr)
+        if attr == "time":
+            child.move_gene(i, slot=random.choice(problem.online_slots))
+        elif attr == "day":
+            days, _ = get_valid_slots_for_group(problem, group)
+            child.move_gene(i, day=random.choice(days))
+        # Never mutate room for online lectures!
+    else:
+        days, slots = get_valid_slots_for_group(problem, problem.session_group[i])
+        child.mutate(timeslots=slots, days=days, rooms=rooms)
+
+    if repair_rate and random.random() < repair_rate:
+        repair(child, REPAIR_MAX_MOVES)
+    return child
+
+def evolve_population(population, rooms, repair_rate=0.0):
     next_gen = []
     best = min(population, key=lambda x: x.fitness)
 
     while len(next_gen) < POPULATION_SIZE:
-        parent1, parent2 = random.sample(population, 2)
-        if random.random() < CROSSOVER_RATE:
-            child = parent1.crossover(parent2)
-        else:
-            child = deepcopy(random.choice([parent1, parent2]))
-
-        # mutate only allowed fields for online lectures
-        gene = random.choice(child.genes)
-        if getattr(gene, "delivery_mode", "offline") == "online" and gene.type.lower() == "lecture":
-            attr = random.choice(["time", "day"])
-            if attr == "time":
-                gene.time = random.choice(ONLINE_LECTURE_TIMES)
-            elif attr == "day":
-                days, _ = get_valid_slots_for_group(gene.group)
-                gene.day = random.choice(days)
-            # Never mutate room for online lectures!
-        else:
-            group = gene.group
-            days, slots = get_valid_slots_for_group(group)
-            child.mutate(timeslots=slots, days=days, rooms=rooms)
-        child.calculate_fitness()
-        next_gen.append(child)
+        next_gen.append(make_child(population, rooms, repair_rate))
+    # Score all children in one vectorized call
+    score_population(next_gen)
     return next_gen, best
 
-def run_scheduler(raw_genes, rooms, verbose=True):
-    population = generate_initial_population(raw_genes, rooms)
+def run_scheduler(raw_genes, rooms, verbose=True, workers=None, islands=None,
+                  migration_interval=None, topology=None, repair_rate=None, local_search=None,
+                  time_budget_seconds=None, snapshot=None, progress=None, stats=None):
+    """
+    Run the GA and return ``(best_schedule, fitness_progress)``.
+
+    With ``time_budget_seconds`` the run ignores GENERATIONS and early stopping
+    and evolves until the deadline. ``snapshot`` (an ``anytime.BestSnapshot``)
+    receives every new best schedule and can stop the run between generations.
+    ``progress``, if given, is called with a dict of generation, best, mean,
+    hard, soft and elapsed (see ``progress_event``) at most once per
+    PROGRESS_INTERVAL_SECONDS, and always for the last generation.
+    """
+    problem = compile_problem(raw_genes, rooms)
+    repair_rate = REPAIR_RATE if repair_rate is None else repair_rate
+    local_search = get_local_search(LOCAL_SEARCH if local_search is None else local_search)
+    snapshot = snapshot or BestSnapshot()
+    snapshot.start(time_budget_seconds)
+    if progress is not None:
+        progress = ProgressThrottle(progress, PROGRESS_INTERVAL_SECONDS)
+
+    islands = ISLANDS if islands is None else islands
+    if islands > 1:
+        best_schedule, best_fitness_progress, island_histories, construction = run_islands(
+            problem,
+            islands,
+            MIGRATION_INTERVAL if migration_interval is None else migration_interval,
+            MIGRATION_TOPOLOGY if topology is None else topology,
+            MIGRATION_SIZE,
+            verbose,
+            repair_rate,
+            local_search,
+            snapshot,
+            bool(time_budget_seconds),
+            progress,
+        )
+        if progress is not None:
+            progress.flush()
+        if stats is not None:
+            stats["initial_population_seconds"] = round(construction, 3)
+            stats["island_histories"] = island_histories
+        return polish(best_schedule, local_search, snapshot, verbose, stats), best_fitness_progress
+
+    workers = PARALLEL_WORKERS if workers is None else workers
+    start = time.perf_counter()
+    population = generate_initial_population(problem, workers)
+    if stats is not None:
+        stats["initial_population_seconds"] = round(time.perf_counter() - start, 3)
+        stats["unassigned"] = describe_sessions(problem, min(population, key=lambda x: x.fitness).unassigned)
+    rooms = problem.teaching_rooms
+
+    evolver = None
+    evolve = evolve_population
+    if workers > 1:
+        # Population moves into shared memory; workers breed and score the children
+        evolver = ParallelEvolver(problem, population, workers)
+        population = evolver.population([c.fitness for c in population])
+        evolve = evolver.evolve
 
     best_fitness = float("inf")
     stagnant = 0
     best_fitness_progress = []  # Track best fitness at each generation
 
-    for generation in range(GENERATIONS):
-        population, best = evolve_population(population, rooms)
-
-        if best.fitness < best_fitness:
-            best_fitness = best.fitness
-            best_schedule = best
-            stagnant = 0
-        else:
-            stagnant += 1
+    try:
+        generation = 0
+        while time_budget_seconds or generation < GENERATIONS:
+            if local_search and generation and generation % LOCAL_SEARCH_INTERVAL == 0:
+                # Memetic step: the elite climbs before it breeds
+                improve_elite(population, local_search, LOCAL_SEARCH_ELITE, LOCAL_SEARCH_SECONDS)
+            with span("generation"):
+                population, best = evolve(population, rooms, repair_rate)
+            generation += 1
 
-        best_fitness_progress.append(best_fitness)
-        if verbose:
-            print(f"Generation {generation + 1} | Best Fitness: {best_fitness}")
+            if best.fitness < best_fitness:
+                best_fitness = best.fitness
+                best_schedule = best.copy(with_evaluator=False)
+                snapshot.update(best_schedule, generation)
+                stagnant = 0
+            else:
+                snapshot.progress(generation)
+                stagnant += 1
 
-        if stagnant >= EARLY_STOP_GENERATIONS:
+            best_fitness_progress.append(best_fitness)
             if verbose:
-                print("Stopping early due to no improvement.")
-            break
-        print("Best fitness progress:", best_fitness_progress)
+                print(f"Generation {generation} | Best Fitness: {best_fitness}")
+            if progress is not None:
+                progress(progress_event(generation, best_schedule, population, snapshot))
+
+            if snapshot.should_stop():
+                if verbose:
+                    print("Stopping: " + ("stop requested." if snapshot.stop_requested else "time budget spent."))
+                break
+            if stagnant >= EARLY_STOP_GENERATIONS and not time_budget_seconds:
+                if verbose:
+                    print("Stopping early due to no improvement.")
+                break
+            print("Best fitness progress:", best_fitness_progress)
+    finally:
+        if evolver is not None:
+            population = best = None
+            evolver.close()
+    if progress is not None:
+        progress.flush()
+
+    return polish(best_schedule, local_search, snapshot, verbose, stats), best_fitness_progress
+
+def progress_event(generation, best, population, snapshot):
+    """
+    One progress record (best-so-far fitness with its hard/soft split, mean
+    fitness, elapsed seconds) as a zero-argument function for ``ProgressThrottle``:
+    the ``penalties`` call only runs for records that are sent.
+    """
+    mean = round(sum(c.fitness for c in population) / len(population), 1)
+    elapsed = round(snapshot.elapsed(), 3)
+
+    def build():
+        hard, soft = penalties(best)
+        return {"generation": generation, "best": best.fitness, "mean": mean,
+                "hard": hard, "soft": soft, "elapsed": elapsed}
+    return build
 
-    return best_schedule, best_fitness_progress
+def polish(schedule, local_search, snapshot, verbose=True, stats=None):
+    """
+    Final local-search pass over the returned schedule (no-op without a local
+    search or after a stop request; never past the time budget).
+    """
+    if local_search is None or snapshot.stop_requested:
+        return schedule
+    seconds = LOCAL_SEARCH_FINAL_SECONDS
+    if snapshot.deadline is not None:
+        seconds = min(seconds, max(0.0, snapshot.deadline - time.time()))
+    before = schedule.fitness
+    local_search(schedule, seconds)
+    snapshot.update(schedule, snapshot.generation)
+    if verbose:
+        print(f"Local search: {before} -> {schedule.fitness}")
+    if stats is not None:
+        stats["local_search"] = {"before": before, "after": schedule.fitness}
+    return schedule
@@ -0,0 +1,131 @@
+# scripts/tracing.py
+"""
+Opt-in phase timings and hot-path counters for one generation run.
+
+The pipeline calls ``span(name)`` around its phases and ``count(name)`` on
+its hot paths; both return at once unless ``enable`` has installed a trace,
+so an unprofiled run only pays a global lookup per call. Only the calling
+process is traced: work done on process pools (``--workers``/``--islands``)
+shows up in the spans but not in the counters.
+"""
+
+import cProfile
+import functools
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+_trace = None
+_NO_SPAN = nullcontext()
+
+
+class Trace:
+    """Span timings (calls, total and slowest seconds per name) and counters of a traced run."""
+
+    def __init__(self, cprofile_path=None):
+        self.started = time.perf_counter()
+        self.spans = {}  # name -> [calls, seconds, max seconds]
+        self.counters = Counter()
+        self.cprofile_path = cprofile_path
+        self.profiler = cProfile.Profile() if cprofile_path else None
+
+    def add_span(self, name, seconds):
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def report(self):
+        """JSON-serializable summary: total seconds, spans in first-seen order and sorted counters."""
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+            "spans": {
+                name: {"calls": calls, "seconds": round(seconds, 4), "max_seconds": round(longest, 4)}
+                for name, (calls, seconds, longest) in self.spans.items()
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add_span(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def enable(cprofile_path=None):
+    """Start tracing into a fresh ``Trace`` (and cProfile, dumped to ``cprofile_path`` by ``disable``)."""
+    global _trace
+    _trace = Trace(cprofile_path)
+    if _trace.profiler is not None:
+        _trace.profiler.enable()
+    return _trace
+
+
+def disable():
+    """Stop tracing and return the trace's report (None if tracing was off)."""
+    global _trace
+    trace, _trace = _trace, None
+    if trace is None:
+        return None
+    if trace.profiler is not None:
+        trace.profiler.disable()
+        # pstats format: snakeviz / flameprof / gprof2dot turn it into a flame graph
+        trace.profiler.dump_stats(trace.cprofile_path)
+    return trace.report()
+
+
+def enabled():
+    return _trace is not None
+
+
+def count(name, n=1):
+    """Add ``n`` to counter ``name`` of the active trace."""
+    if _trace is not None:
+        _trace.counters[name] += n
+
+
+def span(name):
+    """Context manager timing its block under ``name`` in the active trace."""
+    if _trace is None:
+        return _NO_SPAN
+    return _Span(_trace, name)
+
+
+def traced(name):
+    """Decorator timing every call of the function as span ``name``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _trace is None:
+                return fn(*args, **kwargs)
+            with _Span(_trace, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def format_report(report):
+    """Plain-text table of a ``Trace.report()`` for the command line."""
+    lines = [f"{'span':<20} | {'calls':>6} | {'seconds':>9} | {'max':>8}"]
+    for name, entry in report["spans"].items():
+        lines.append(f"{name:<20} | {entry['calls']:>6} | {entry['seconds']:>9.3f} | {entry['max_seconds']:>8.3f}")
+    lines.append(f"{'total':<20} | {'':>6} | {report['total_seconds']:>9.3f} |")
+    if report["counters"]:
+        width = max(len(name) for name in report["counters"])
+        lines.append("")
+        lines.extend(f"{name:<{width}} | {value:>10}" for name, value in report["counters"].items())
+    return "\n".join(lines)
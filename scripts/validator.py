@@ -5,49 +5,53 @@ from scripts.config import (
     FIRST_YEAR_TIMESLOTS,
     UPPER_YEAR_TIMESLOTS,
     GROUP_YEAR_DAYS,
-    ONLINE_LECTURE_TIMES,
 )
 
 def validate_schedule(chromosome):
     errors = []
+    p = chromosome.problem
 
     room_conflicts = defaultdict(list)
     group_conflicts = defaultdict(list)
 
-    for gene in chromosome.genes:
+    first_year_slots = {p.slot_index[t] for t in FIRST_YEAR_TIMESLOTS}
+    upper_year_slots = {p.slot_index[t] for t in UPPER_YEAR_TIMESLOTS}
+    year_days = {}
+
+    for i in range(p.n_sessions):
+        group = p.session_group[i]
+        day, slot, room = chromosome.day_ids[i], chromosome.slot_ids[i], chromosome.room_ids[i]
         # Handle online lectures: only check group/time and slot
-        if getattr(gene, "delivery_mode", "offline") == "online" and gene.type.lower() == "lecture":
+        if p.session_online_lecture[i]:
             # Accept only the predefined evening times
-            if gene.time not in ONLINE_LECTURE_TIMES:
-                errors.append(f"{gene.group} online lecture at invalid time: {gene.time}")
+            if not p.is_online_slot[slot]:
+                errors.append(f"{p.groups[group]} online lecture at invalid time: {p.slots[slot]}")
         else:
-            room_key = (gene.room, gene.day, gene.time)
-            group_key = (gene.group, gene.day, gene.time)
-
-            room_conflicts[room_key].append(gene)
-            group_conflicts[group_key].append(gene)
+            room_conflicts[(room, day, slot)].append(i)
+            group_conflicts[(group, day, slot)].append(i)
 
             # Classic day/time checks
-            year = int(gene.group.split("-")[1][:2])
-            admission_year = 2000 + year
             # NOTE: double-check if '+1' is required for your year logic
-            study_year = 2024 - admission_year + 1
-            allowed_days = GROUP_YEAR_DAYS.get(study_year, [])
-            allowed_slots = FIRST_YEAR_TIMESLOTS if study_year == 1 else UPPER_YEAR_TIMESLOTS
+            study_year = p.group_year[group] + 1
+            if study_year not in year_days:
+                year_days[study_year] = {p.day_index[d] for d in GROUP_YEAR_DAYS.get(study_year, [])}
+            allowed_slots = first_year_slots if study_year == 1 else upper_year_slots
 
-            if gene.day not in allowed_days:
-                errors.append(f"{gene.group} scheduled on invalid day: {gene.day}")
-            if gene.time not in allowed_slots:
-                errors.append(f"{gene.group} scheduled at invalid time: {gene.time}")
+            if day not in year_days[study_year]:
+                errors.append(f"{p.groups[group]} scheduled on invalid day: {p.days[day]}")
+            if slot not in allowed_slots:
+                errors.append(f"{p.groups[group]} scheduled at invalid time: {p.slots[slot]}")
 
     # Room and group conflict detection
-    for key, sessions in room_conflicts.items():
+    for (room, day, slot), sessions in room_conflicts.items():
         if len(sessions) > 1:
-            errors.append(f"Room conflict at {key}: {[g.group for g in sessions]}")
+            key = (p.rooms[room], p.days[day], p.slots[slot])
+            errors.append(f"Room conflict at {key}: {[p.groups[p.session_group[i]] for i in sessions]}")
 
-    for key, sessions in group_conflicts.items():
+    for (group, day, slot), sessions in group_conflicts.items():
         if len(sessions) > 1:
-            errors.append(f"Group conflict at {key}: {[g.course for g in sessions]}")
+            key = (p.groups[group], p.days[day], p.slots[slot])
+            errors.append(f"Group conflict at {key}: {[p.courses[p.session_course[i]] for i in sessions]}")
 
     if not errors:
         print("✅ Validation passed: No hard constraint violations found.")
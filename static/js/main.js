@@ -122,27 +122,77 @@ document.addEventListener('DOMContentLoaded', function () {
             const formData = new FormData();
             formData.append('file', fileInput.files[0]);
             formData.append('trimester', trimester);
+            formData.append('engine', document.getElementById('engine').value);
+            formData.append('local_search', document.getElementById('localSearch').value);
+            formData.append('time_budget', document.getElementById('timeBudget').value);
+            if (document.getElementById('noCache').checked) formData.append('no_cache', '1');
             this.disabled = true;
-            this.innerHTML = 'Processing... <span class="spinner-border spinner-border-sm"></span>';
+            this.innerHTML = 'Queued... <span class="spinner-border spinner-border-sm"></span>';
+            const cancelBtn = document.getElementById('cancelBtn');
             try {
                 const response = await fetch('/generate_schedule', { method: 'POST', body: formData });
-                if (!response.ok) throw new Error("Failed to generate schedule!");
-                const metrics = await response.json();
+                const job = await response.json();
+                if (!response.ok) throw new Error(job.error || "Failed to generate schedule!");
+                cancelBtn.style.display = "block";
+                cancelBtn.onclick = () => fetch(job.cancel_url, { method: 'POST' });
+                const stream = streamProgress(job);
+                const finished = await waitForJob(job, status => {
+                    const p = status.progress || {};
+                    const label = status.status === 'running'
+                        ? `Generation ${p.generation || 0} | best ${p.best_fitness ?? '-'}`
+                        : 'Queued...';
+                    this.innerHTML = `${label} <span class="spinner-border spinner-border-sm"></span>`;
+                });
+                stream.close();
+                if (finished.status === 'cancelled') throw new Error("Schedule generation was cancelled.");
+                if (finished.status !== 'done') throw new Error(finished.error || "Failed to generate schedule!");
+                const metrics = await (await fetch(job.result_url)).json();
                 showMetrics(metrics);
                 showFitnessProgress(metrics);
                 document.getElementById('downloadLinks').style.display = "flex";
-                triggerDownload(`/download_excel?trimester=${trimester}`);
-                triggerDownload(`/download_json?trimester=${trimester}`);
+                triggerDownload(metrics.downloads.excel);
+                triggerDownload(metrics.downloads.json);
                 this.innerHTML = "Generate Schedule";
             } catch (e) {
                 alert("Error: " + e.message);
                 this.innerHTML = "Generate Schedule";
             }
+            cancelBtn.style.display = "none";
             this.disabled = false;
         });
     }
 });
 
+// Plot each generation on the fitness chart as soon as the server reports it
+function streamProgress(job) {
+    fitnessTrendChart.data.labels = [];
+    fitnessTrendChart.data.datasets.length = 1;
+    fitnessTrendChart.data.datasets[0].data = [];
+    fitnessTrendChart.update();
+    const source = new EventSource(job.events_url);
+    source.onmessage = (e) => {
+        const event = JSON.parse(e.data);
+        fitnessTrendChart.data.labels.push("Gen " + event.generation);
+        fitnessTrendChart.data.datasets[0].data.push(Math.round(10000 / (1 + event.best), 2));
+        fitnessTrendChart.update('none');
+        document.getElementById('hardConstraints').textContent = event.hard + '%';
+        document.getElementById('softConstraints').textContent = event.soft + '%';
+        document.getElementById('genTime').textContent = event.elapsed + 's';
+    };
+    source.addEventListener('end', () => source.close());
+    return source;
+}
+
+// Poll a generation job until it leaves the queue and finishes
+async function waitForJob(job, onProgress) {
+    while (true) {
+        const status = await (await fetch(job.status_url)).json();
+        if (!['queued', 'running'].includes(status.status)) return status;
+        onProgress(status);
+        await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+}
+
 function showMetrics(metrics) {
     document.getElementById('fitnessScore').textContent = metrics.fitnessScore + '%';
     document.getElementById('conflictsCount').textContent = metrics.conflicts;
@@ -156,6 +206,19 @@ function showFitnessProgress(metrics) {
         const progressValues = metrics.fitness_progress.map(x => Math.round(10000 / (1 + x), 2));
         fitnessTrendChart.data.labels = metrics.fitness_progress.map((_, i) => "Gen " + (i + 1));
         fitnessTrendChart.data.datasets[0].data = progressValues;
+        // Island mode: one dashed line per island next to the global best
+        const palette = ['#19be94', '#ffc107', '#e4572e', '#8e44ad', '#117964'];
+        fitnessTrendChart.data.datasets.length = 1;
+        (metrics.island_progress || []).forEach((history, k) => {
+            fitnessTrendChart.data.datasets.push({
+                label: 'Island ' + (k + 1),
+                data: history.map(x => Math.round(10000 / (1 + x), 2)),
+                borderColor: palette[k % palette.length],
+                backgroundColor: 'transparent',
+                borderDash: [4, 4],
+                tension: 0.3
+            });
+        });
         fitnessTrendChart.update();
     }
 }
@@ -0,0 +1,107 @@
+# tests/synthetic.py
+"""
+Seeded synthetic GA input workbooks, shaped like inputs/GA_Input.xlsx:
+one curriculum sheet per EP plus Groups and Rooms sheets, and random moves
+of the schedules built from them. Shared by the tests and the benchmarks
+(``benchmarks/synthetic.py`` writes the workbooks to disk).
+"""
+
+import random
+
+import pandas as pd
+
+from scripts.config import CURRENT_YEAR
+from scripts.data_loader import build_frames, determine_group_year
+
+TRIMESTERS_PER_YEAR = 3
+STUDY_YEARS = 3
+
+
+def synthetic_sheets(eps=8, groups_per_year=6, courses=6, rooms=60, seed=0):
+    """
+    Sheets of a synthetic workbook as ``{sheet name: DataFrame}``.
+
+    ``eps`` programmes with ``groups_per_year`` groups in each of three
+    admission years; every programme has ``courses`` courses in each
+    trimester its groups study, with lecture/practice/lab hours drawn like the
+    real curricula (a fifth of the lectures online, Physical Education in the
+    first trimester). ``rooms`` teaching rooms plus a gym.
+    """
+    rng = random.Random(seed)
+    ep_names = [f"EP{i + 1}" for i in range(eps)]
+
+    groups = []
+    for ep in ep_names:
+        for year in range(STUDY_YEARS):
+            code = (CURRENT_YEAR - 1 - year) % 100
+            for g in range(1, groups_per_year + 1):
+                groups.append({"Group": f"{ep}-{code:02d}{g:02d}", "department": 1.0,
+                               "year": year + 1, "headcount": rng.randint(12, 30)})
+    groups_df = pd.DataFrame(groups)
+
+    # Curriculum trimesters the loader will look up for these groups
+    study_years = sorted({determine_group_year(g) for g in groups_df["Group"]})
+    curriculum_trimesters = [(y - 1) * TRIMESTERS_PER_YEAR + t
+                             for y in study_years for t in range(1, TRIMESTERS_PER_YEAR + 1)]
+
+    sheets = {}
+    for ep in ep_names:
+        rows = []
+        for trimester in curriculum_trimesters:
+            for c in range(courses):
+                if trimester == curriculum_trimesters[0] and c == 0:
+                    name, lecture, practice, lab, delivery = "Physical Education", None, 20, None, "offline"
+                else:
+                    name = f"{ep} Course {trimester}.{c + 1}"
+                    lecture = rng.choice([None, 10, 20, 30])
+                    practice = rng.choice([None, 10, 20, 30])
+                    lab = rng.choice([None, None, None, 10, 20])
+                    delivery = "online" if lecture and rng.random() < 0.2 else "offline"
+                rows.append({
+                    "course_name": name,
+                    "trimester": trimester,
+                    "credits": 5,
+                    "lecture_slots": lecture,
+                    "practice_slots": practice,
+                    "lab_slots": lab,
+                    "delivery_mode": delivery,
+                    "lecture_precedes_practice": True,
+                })
+        sheets[ep] = pd.DataFrame(rows)
+
+    sheets["Groups"] = groups_df
+    room_rows = [{"Room": f"R{i + 1:03d}", "capacity": rng.choice([30, 40, 60, 100, 140]),
+                  "room_type": rng.choice(["L", "P"]), "available": True, "floor": rng.randint(1, 3)}
+                 for i in range(rooms)]
+    room_rows.append({"Room": "Gym", "capacity": 200, "room_type": "G", "available": True, "floor": 1})
+    sheets["Rooms"] = pd.DataFrame(room_rows)
+    return sheets
+
+
+def write_workbook(sheets, path):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return path
+
+
+def synthetic_curriculum(n_courses, n_eps, groups_per_year, seed=0):
+    """``(groups_df, courses_df)`` of a synthetic workbook with about ``n_courses`` curriculum rows."""
+    per_trimester = max(1, round(n_courses / (n_eps * STUDY_YEARS * TRIMESTERS_PER_YEAR)))
+    frames = build_frames(synthetic_sheets(n_eps, groups_per_year, per_trimester, rooms=1, seed=seed))
+    return frames["groups"], frames["courses"]
+
+
+def random_move(problem, chromosome):
+    """One move_gene of any session to any day, slot or room (gym, online and a room combination included)."""
+    i = random.randrange(problem.n_sessions)
+    rooms = problem.teaching_rooms + [problem.gym_room, problem.online_room,
+                                      problem.combination_id(problem.teaching_rooms[:2])]
+    moves = {
+        "day": lambda: {"day": random.randrange(len(problem.days))},
+        "slot": lambda: {"slot": random.randrange(len(problem.slots))},
+        "room": lambda: {"room": random.choice(rooms)},
+        "all": lambda: {"day": random.randrange(len(problem.days)), "slot": random.randrange(len(problem.slots)),
+                        "room": random.choice(rooms)},
+    }
+    chromosome.move_gene(i, **moves[random.choice(list(moves))]())
@@ -0,0 +1,41 @@
+# tests/test_batch_evaluator.py
+
+import random
+
+import numpy as np
+import pytest
+
+from scripts.batch_evaluator import evaluate_population
+from scripts.data_loader import extract_raw_genes
+from scripts.evaluator import compute_penalties
+from scripts.problem import compile_problem
+from scripts.scheduler import build_individual
+from tests.synthetic import synthetic_curriculum, random_move
+
+POPULATION = 12
+
+
+@pytest.fixture(scope="module")
+def problem():
+    groups_df, courses_df = synthetic_curriculum(n_courses=60, n_eps=2, groups_per_year=6, seed=5)
+    # Few rooms, so the schedules carry room clashes, joint lectures and gym sharing
+    return compile_problem(extract_raw_genes(groups_df, courses_df, 1), [f"R{i}" for i in range(6)])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_compute_penalties(problem, seed):
+    random.seed(seed)
+    population = [build_individual(problem) for _ in range(POPULATION)]
+    # Row k gets 5 * k random moves: from constructed schedules to heavily scrambled ones
+    for k, chromosome in enumerate(population):
+        for _ in range(5 * k):
+            random_move(problem, chromosome)
+
+    hard, soft = evaluate_population(
+        problem,
+        np.stack([c.day_ids for c in population]),
+        np.stack([c.slot_ids for c in population]),
+        np.stack([c.room_ids for c in population]),
+    )
+    expected = [compute_penalties(c.genes) for c in population]
+    assert list(zip(hard.tolist(), soft.tolist())) == [(int(h), int(s)) for h, s in expected]
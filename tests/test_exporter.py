@@ -0,0 +1,91 @@
+# tests/test_exporter.py
+
+import random
+from copy import copy
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.utils import get_column_letter
+
+from scripts.data_loader import extract_raw_genes
+from scripts.exporter import COLUMNS, SIGNATURE, export_to_excel, schedule_rows
+from scripts.problem import compile_problem
+from scripts.scheduler import build_individual
+from tests.synthetic import synthetic_curriculum
+
+
+def reference_workbook(chromosome, path):
+    """Group sheets styled cell by cell through the public setters, as the exporter used to."""
+    thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                         top=Side(style='thin'), bottom=Side(style='thin'))
+    wb = Workbook()
+    wb.remove(wb.active)
+    for group, rows in schedule_rows(chromosome).items():
+        ws = wb.create_sheet(group[:31])
+        ws["A1"] = f"Group {ws.title}"
+        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=6)
+        ws["A1"].font = Font(name="Times New Roman", size=12, bold=True)
+        ws["A1"].alignment = Alignment(horizontal="center")
+        for col, name in enumerate(COLUMNS, start=1):
+            cell = ws.cell(row=3, column=col, value=name)
+            cell.font = Font(name="Times New Roman", bold=True, size=7)
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.fill = PatternFill(start_color="C0C0C0", end_color="C0C0C0", fill_type="solid")
+            cell.border = thin_border
+
+        current_day, start_row = None, 4
+        for row_idx, values in enumerate(rows, start=4):
+            if values[0] != current_day:
+                if current_day is not None:
+                    ws.merge_cells(start_row=start_row, start_column=1, end_row=row_idx - 1, end_column=1)
+                    ws.cell(row=start_row, column=1).alignment = Alignment(horizontal='center', vertical='center')
+                current_day, start_row = values[0], row_idx
+            for col, value in enumerate(values, start=1):
+                cell = ws.cell(row=row_idx, column=col, value=value)
+                cell.font = Font(name="Times New Roman", size=11 if col == 1 else 7)
+                cell.alignment = Alignment(wrap_text=True, horizontal="center", vertical="top")
+                cell.border = thin_border
+        if current_day and start_row < ws.max_row:
+            ws.merge_cells(start_row=start_row, start_column=1, end_row=ws.max_row, end_column=1)
+            ws.cell(row=start_row, column=1).alignment = Alignment(horizontal='center', vertical='center')
+
+        for col in ws.columns:
+            width = max((len(str(cell.value)) for cell in col if cell.value), default=0)
+            ws.column_dimensions[get_column_letter(col[0].column)].width = min(width + 2, 30)
+        last_row = ws.max_row + 2
+        ws.cell(row=last_row, column=6).value = SIGNATURE
+        ws.cell(row=last_row, column=6).alignment = Alignment(horizontal="right")
+        ws.cell(row=last_row, column=6).font = Font(name="Times New Roman", size=10)
+    wb.save(path)
+
+
+def cell_format(cell):
+    return (cell.value, copy(cell.font), copy(cell.alignment), copy(cell.border), copy(cell.fill),
+            cell.number_format)
+
+
+@pytest.fixture(scope="module")
+def chromosome():
+    random.seed(0)
+    groups_df, courses_df = synthetic_curriculum(n_courses=60, n_eps=2, groups_per_year=3, seed=4)
+    problem = compile_problem(extract_raw_genes(groups_df, courses_df, 1), [f"R{i}" for i in range(10)])
+    return build_individual(problem)
+
+
+def test_matches_per_cell_styling(chromosome, tmp_path):
+    export_to_excel(chromosome, str(tmp_path / "timetable.xlsx"))
+    reference_workbook(chromosome, str(tmp_path / "reference.xlsx"))
+    actual = load_workbook(tmp_path / "timetable.xlsx")
+    expected = load_workbook(tmp_path / "reference.xlsx")
+
+    assert actual.sheetnames == expected.sheetnames
+    for ws in expected.worksheets:
+        other = actual[ws.title]
+        assert sorted(map(str, other.merged_cells.ranges)) == sorted(map(str, ws.merged_cells.ranges))
+        assert {k: d.width for k, d in other.column_dimensions.items()} == \
+            {k: d.width for k, d in ws.column_dimensions.items()}
+        assert other.max_row == ws.max_row
+        for row, other_row in zip(ws.iter_rows(), other.iter_rows()):
+            for cell, other_cell in zip(row, other_row):
+                assert cell_format(other_cell) == cell_format(cell), f"{ws.title}!{cell.coordinate}"
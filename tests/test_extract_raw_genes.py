@@ -0,0 +1,139 @@
+# tests/test_extract_raw_genes.py
+
+import pandas as pd
+import pytest
+
+from scripts import config
+from scripts.config import CURRENT_YEAR
+from scripts.data_loader import extract_raw_genes, preprocess_data
+from tests.synthetic import synthetic_curriculum, synthetic_sheets, write_workbook
+
+
+def reference_extract_raw_genes(groups_df, courses_df, trimester):
+    """The per-cohort, per-row loop extract_raw_genes replaced, kept as the expected output."""
+    raw_genes = []
+    group_name_col = [c for c in groups_df.columns if "group" in c.lower()][0]
+    trimester_col = [c for c in courses_df.columns if "trimester" in c.lower()][0]
+    delivery_col = next((c for c in courses_df.columns if "delivery_mode" in c.lower()), None)
+
+    groups_by_ep_year = {}
+    for gname in groups_df[group_name_col]:
+        ep = str(gname).split("-")[0].upper().strip()
+        study_year = CURRENT_YEAR - (int(gname.split("-")[1][:2]) + 2000) + 1
+        groups_by_ep_year.setdefault((ep, study_year), []).append(gname)
+
+    def delivery_of(row):
+        value = row.get(delivery_col) if delivery_col else None
+        return str(value).strip().lower() if delivery_col and pd.notnull(value) else "offline"
+
+    def per_week(row, column):
+        value = row.get(column, 0)
+        return (int(value) if pd.notnull(value) else 0) // 10
+
+    joint_lecture_slots, joint_lecture_groups = {}, {}
+    for (ep, study_year), g_list in groups_by_ep_year.items():
+        ep_courses = courses_df[(courses_df["EP"] == ep)
+                                & (courses_df[trimester_col] == (study_year - 1) * 3 + trimester)]
+        for _, c_row in ep_courses.iterrows():
+            course = c_row["course_name"]
+            if per_week(c_row, "lecture_slots") > 0:
+                joint_lecture_slots[(ep, study_year, course)] = per_week(c_row, "lecture_slots")
+                joint_lecture_groups[(ep, study_year, course)] = g_list
+            for session_type, column in (("Practice", "practice_slots"), ("Lab", "lab_slots")):
+                for g in g_list:
+                    for _ in range(per_week(c_row, column)):
+                        raw_genes.append({"group": g, "course": course, "type": session_type,
+                                          "delivery_mode": "offline"})
+
+    for (ep, study_year, course), slots in joint_lecture_slots.items():
+        row = courses_df[(courses_df["EP"] == ep)
+                         & (courses_df[trimester_col] == (study_year - 1) * 3 + trimester)
+                         & (courses_df["course_name"] == course)].iloc[0]
+        delivery = delivery_of(row)
+        groups = joint_lecture_groups[(ep, study_year, course)]
+        batches = [groups] if delivery == "online" else [groups[i:i + 5] for i in range(0, len(groups), 5)]
+        for _ in range(slots):
+            for batch in batches:
+                raw_genes.append({"joint_groups": batch, "course": course, "type": "Lecture",
+                                  "delivery_mode": delivery})
+    return raw_genes
+
+
+def group_name(ep, study_year, n):
+    return f"{ep}-{(CURRENT_YEAR - study_year + 1) % 100:02d}{n:02d}"
+
+
+@pytest.fixture
+def small_curriculum():
+    """Two EPs; IT has seven first-year groups (two offline lecture batches) and a course listed twice."""
+    groups = [group_name("IT", 1, n) for n in range(1, 8)] + [group_name("IT", 2, n) for n in (1, 2)] \
+        + [group_name("SE", 1, n) for n in (1, 2, 3)]
+    groups_df = pd.DataFrame({"Group": groups, "year": 1})
+    courses_df = pd.DataFrame([
+        # EP, trimester, course, lecture, practice, lab, delivery
+        ("IT", 1, "Calculus", 20, 10, None, "offline"),
+        ("IT", 1, "History", 10, None, None, "Online "),
+        ("IT", 1, "Programming", 30, 20, 10, None),
+        ("IT", 1, "Calculus", 10, None, 10, "online"),
+        ("IT", 2, "Databases", 20, 20, None, "offline"),  # not taught this trimester
+        ("IT", 4, "Networks", 10, 10, 20, "offline"),
+        ("SE", 1, "Physical Education", None, 20, None, "offline"),
+        ("SE", 1, "Design", 10, 5, None, "online"),
+        ("XX", 1, "Orphan", 10, 10, 10, "offline"),        # no groups
+    ], columns=["EP", "trimester", "course_name", "lecture_slots", "practice_slots", "lab_slots",
+                "delivery_mode"])
+    return groups_df, courses_df
+
+
+@pytest.mark.parametrize("trimester", [1, 2])
+def test_matches_reference_loop(small_curriculum, trimester):
+    groups_df, courses_df = small_curriculum
+    assert extract_raw_genes(groups_df, courses_df, trimester) == \
+        reference_extract_raw_genes(groups_df, courses_df, trimester)
+
+
+def test_joint_batches_and_delivery_modes(small_curriculum):
+    groups_df, courses_df = small_curriculum
+    genes = extract_raw_genes(groups_df, courses_df, 1)
+    lectures = [g for g in genes if "joint_groups" in g]
+    assert lectures and all("group" not in g for g in lectures)
+    assert all(g["type"] != "Lecture" and g["delivery_mode"] == "offline" for g in genes if "group" in g)
+
+    # Offline lectures go in batches of at most five groups, online ones take the whole cohort
+    for g in lectures:
+        if g["delivery_mode"] == "offline":
+            assert len(g["joint_groups"]) <= 5
+    first_year_it = [group_name("IT", 1, n) for n in range(1, 8)]
+    calculus = [g["joint_groups"] for g in lectures if g["course"] == "Calculus"]
+    # Listed twice: first row's delivery mode (offline), last row's weekly count (1)
+    assert calculus == [first_year_it[:5], first_year_it[5:]]
+    history = [g for g in lectures if g["course"] == "History"]
+    assert [(g["joint_groups"], g["delivery_mode"]) for g in history] == [(first_year_it, "online")]
+
+    # Delivery modes are normalized, missing ones default to offline
+    assert {g["delivery_mode"] for g in lectures} == {"online", "offline"}
+    assert {g["delivery_mode"] for g in lectures if g["course"] == "Programming"} == {"offline"}
+
+
+def test_matches_reference_loop_on_synthetic_workbook():
+    groups_df, courses_df = synthetic_curriculum(n_courses=300, n_eps=4, groups_per_year=7, seed=3)
+    for trimester in (1, 2, 3):
+        genes = extract_raw_genes(groups_df, courses_df, trimester)
+        assert genes == reference_extract_raw_genes(groups_df, courses_df, trimester)
+        assert max(len(g["joint_groups"]) for g in genes
+                   if "joint_groups" in g and g["delivery_mode"] == "offline") <= 5
+
+
+def test_preprocess_data_reads_settings_at_call_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PARSED_CACHE_FOLDER", str(tmp_path / "parsed"))
+    path = write_workbook(synthetic_sheets(eps=1, groups_per_year=2, courses=2, rooms=4), tmp_path / "input.xlsx")
+    frames = preprocess_data(str(path))
+    assert "R001" in set(frames["rooms"]["Room"])
+    years = set(frames["groups"]["Year"])
+
+    # A changed setting is a new cache key, and the rebuilt frames must apply it
+    monkeypatch.setattr(config, "EXCLUDED_ROOMS", ["R001"])
+    monkeypatch.setattr(config, "CURRENT_YEAR", CURRENT_YEAR + 1)
+    frames = preprocess_data(str(path))
+    assert "R001" not in set(frames["rooms"]["Room"])
+    assert set(frames["groups"]["Year"]) == {year + 1 for year in years}
@@ -0,0 +1,68 @@
+# tests/test_incremental_evaluator.py
+
+import random
+
+import pytest
+
+from scripts.data_loader import extract_raw_genes
+from scripts.evaluator import compute_penalties
+from scripts.problem import compile_problem
+from scripts.scheduler import build_individual
+from tests.synthetic import synthetic_curriculum, random_move
+
+STEPS = 150
+
+
+@pytest.fixture(scope="module")
+def problem():
+    groups_df, courses_df = synthetic_curriculum(n_courses=60, n_eps=2, groups_per_year=4, seed=1)
+    raw_genes = extract_raw_genes(groups_df, courses_df, 1)
+    # Few rooms, so moves keep creating and resolving room clashes
+    return compile_problem(raw_genes, [f"R{i}" for i in range(6)])
+
+
+def full_score(chromosome):
+    return sum(compute_penalties(chromosome.genes))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_total_matches_full_evaluation_after_every_step(problem, seed):
+    random.seed(seed)
+    chromosome = build_individual(problem)
+    chromosome.calculate_fitness()
+    assert chromosome.evaluator.total == full_score(chromosome)
+
+    days = list(range(len(problem.days)))
+    slots = list(range(len(problem.slots)))
+    for step in range(STEPS):
+        if random.random() < 0.5:
+            random_move(problem, chromosome)
+        else:
+            chromosome.mutate(slots, days, problem.teaching_rooms)
+        assert chromosome.evaluator.total == full_score(chromosome), f"step {step}"
+        assert chromosome.fitness == chromosome.evaluator.total
+
+
+def test_copies_keep_independent_totals(problem):
+    random.seed(3)
+    original = build_individual(problem)
+    original.calculate_fitness()
+    before = original.fitness
+
+    clone = original.copy()
+    for _ in range(50):
+        random_move(problem, clone)
+        assert clone.evaluator.total == full_score(clone)
+    assert original.evaluator.total == before == full_score(original)
+
+
+def test_room_setter_shares_combination_ids(problem):
+    random.seed(4)
+    chromosome = build_individual(problem)
+    chromosome.calculate_fitness()
+    first, second = chromosome.genes[0], chromosome.genes[1]
+    first.room = "R1,R0"
+    second.room = "R0,R1"
+    assert chromosome.room_ids[0] == chromosome.room_ids[1] == problem.combination_id([problem.room_index["R0"],
+                                                                                       problem.room_index["R1"]])
+    assert chromosome.evaluator.total == full_score(chromosome)
@@ -0,0 +1,86 @@
+# tests/test_jobs.py
+
+import os
+import threading
+import time
+
+import pytest
+
+from app import jobs
+from app.ga import ga_engine
+from scripts import tracing
+from scripts.result_cache import ResultCache
+
+
+@pytest.fixture
+def jobs_folder(tmp_path, monkeypatch):
+    folder = tmp_path / "jobs"
+    folder.mkdir()
+    monkeypatch.setattr(jobs, "JOBS_FOLDER", str(folder))
+    monkeypatch.setattr(jobs, "LOCK_PATH", str(folder / ".lock"))
+    return folder
+
+
+def queued_job(job_id, options):
+    os.makedirs(jobs._job_dir(job_id))
+    jobs._write_state({"id": job_id, "status": "queued", "trimester": 1, "options": options,
+                       "cache_key": "key", "created": time.time(), "progress": {}, "pid": None})
+
+
+def test_failed_job_stays_failed_and_stops_tracing(jobs_folder, monkeypatch):
+    def generate_schedule(*args, **kwargs):
+        time.sleep(1.2)  # long enough for the watcher to publish progress
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(ga_engine, "generate_schedule", generate_schedule)
+    queued_job("failing", {"profile": True})
+    with pytest.raises(RuntimeError):
+        jobs.run_job("failing")
+    time.sleep(1.2)
+    state = jobs._read_state("failing")
+    assert (state["status"], state["error"]) == ("failed", "boom")
+    assert not tracing.enabled()
+
+
+def test_lock_is_held_however_old_the_lock_file(jobs_folder):
+    acquired = threading.Event()
+    with jobs._locked():
+        old = time.time() - 3600
+        os.utime(jobs.LOCK_PATH, (old, old))
+
+        def contend():
+            with jobs._locked():
+                acquired.set()
+
+        thread = threading.Thread(target=contend)
+        thread.start()
+        assert not acquired.wait(0.5)
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_cache_entry_evicted_after_lookup_runs_as_a_miss(jobs_folder, tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "cache"))
+    assert cache.get("key") is None  # no cache folder yet: a miss, not an error
+    outputs = []
+    for name in ("timetable_T1.xlsx", "timetable_T1.json"):
+        (tmp_path / name).write_text("{}")
+        outputs.append(str(tmp_path / name))
+    workbook = tmp_path / "input.xlsx"
+    workbook.write_bytes(b"workbook")
+    key = jobs.cache_key(str(workbook), 1)
+    cache.put(key, {"fitness": 0}, outputs)
+
+    class EvictingCache(ResultCache):
+        def get(self, key):
+            hit = super().get(key)
+            self.clear()  # another process's put() evicts it before it is read
+            return hit
+
+    class Process:
+        pid = 4242
+
+    monkeypatch.setattr(jobs, "result_cache", lambda: EvictingCache(cache.folder))
+    monkeypatch.setattr(jobs.subprocess, "Popen", lambda *args, **kwargs: Process())
+    state = jobs.submit(str(workbook), 1)
+    assert (state["status"], state["pid"]) == ("queued", 4242)
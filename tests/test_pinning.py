@@ -0,0 +1,41 @@
+# tests/test_pinning.py
+
+import json
+import random
+
+import pytest
+
+from scripts.data_loader import extract_raw_genes
+from scripts.evaluator import compute_penalties
+from scripts.pinning import apply_pins, load_pins
+from scripts.problem import compile_problem
+from scripts.scheduler import build_individual
+from tests.synthetic import synthetic_curriculum
+
+ROOMS = [f"R{i}" for i in range(8)]
+
+
+@pytest.fixture(scope="module")
+def raw_genes():
+    groups_df, courses_df = synthetic_curriculum(n_courses=60, n_eps=2, groups_per_year=7, seed=2)
+    return extract_raw_genes(groups_df, courses_df, 1)
+
+
+@pytest.mark.parametrize("share", [1.0, 0.5])
+def test_pinning_keeps_the_precedence_penalty(raw_genes, tmp_path, share):
+    random.seed(0)
+    problem = compile_problem(raw_genes, ROOMS)
+    schedule = build_individual(problem)
+    path = tmp_path / "previous.json"
+    timetable = {group: [s for s in sessions if random.random() < share]
+                 for group, sessions in schedule.to_json().items()}
+    path.write_text(json.dumps(timetable))
+
+    genes, report = apply_pins(raw_genes, load_pins(str(path)), ROOMS)
+    pinned = compile_problem(genes, ROOMS)
+    assert report["pinned"] == sum(len(sessions) for sessions in timetable.values())
+    assert pinned.precedence_penalty == problem.precedence_penalty
+    if share == 1.0:
+        # Every session pinned where it was: the same schedule, so the same penalties
+        rebuilt = build_individual(pinned)
+        assert compute_penalties(rebuilt.genes) == compute_penalties(schedule.genes)
@@ -0,0 +1,42 @@
+# tests/test_progress.py
+
+import random
+
+import pytest
+
+from scripts import annealing, scheduler
+from scripts.annealing import run_annealing
+from scripts.data_loader import extract_raw_genes
+from scripts.scheduler import run_scheduler
+from tests.synthetic import synthetic_curriculum
+
+ROOMS = [f"R{i}" for i in range(8)]
+
+
+@pytest.fixture(scope="module")
+def raw_genes():
+    groups_df, courses_df = synthetic_curriculum(n_courses=40, n_eps=2, groups_per_year=3, seed=5)
+    return extract_raw_genes(groups_df, courses_df, 1)
+
+
+@pytest.mark.parametrize("engine", ["ga", "sa"])
+@pytest.mark.parametrize("interval", [0.0, 3600.0])
+def test_throttled_events_end_with_the_last_generation(raw_genes, monkeypatch, engine, interval):
+    random.seed(0)
+    events = []
+    if engine == "ga":
+        monkeypatch.setattr(scheduler, "PROGRESS_INTERVAL_SECONDS", interval)
+        _, fitness_progress = run_scheduler(raw_genes, ROOMS, verbose=False, workers=0, islands=0,
+                                            local_search="none", progress=events.append)
+    else:
+        monkeypatch.setattr(annealing, "PROGRESS_INTERVAL_SECONDS", interval)
+        monkeypatch.setattr(annealing, "SA_EPOCHS", 5)
+        _, fitness_progress = run_annealing(raw_genes, ROOMS, verbose=False, progress=events.append)
+
+    # Unthrottled: every generation; throttled: the first and the last only
+    expected = list(range(1, len(fitness_progress) + 1))
+    if interval:
+        expected = sorted({1, len(fitness_progress)})
+    assert [event["generation"] for event in events] == expected
+    assert [event["best"] for event in events] == [fitness_progress[g - 1] for g in expected]
+    assert all(event["hard"] + event["soft"] == event["best"] for event in events)
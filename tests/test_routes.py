@@ -0,0 +1,53 @@
+# tests/test_routes.py
+
+import io
+
+import pytest
+
+from app import create_app, jobs
+
+
+@pytest.fixture
+def client(monkeypatch):
+    submitted = []
+
+    def submit(input_path, trimester, options=None, use_cache=True):
+        submitted.append((trimester, options))
+        return {"id": "job", "status": "queued", "trimester": trimester}
+
+    # Accepted requests stop at the job queue: no job process is started
+    monkeypatch.setattr(jobs, "submit", submit)
+    client = create_app().test_client()
+    client.submitted = submitted
+    return client
+
+
+def generate(client, **form):
+    data = {"file": (io.BytesIO(b"workbook"), "GA_input.xlsx"), "trimester": "1", **form}
+    return client.post("/generate_schedule", data=data, content_type="multipart/form-data")
+
+
+@pytest.mark.parametrize("local_search", ["none", ""])
+def test_annealing_accepts_no_local_search(client, local_search):
+    response = generate(client, engine="sa", local_search=local_search)
+    assert response.status_code == 202
+    assert client.submitted[0][1]["engine"] == "sa"
+
+
+def test_annealing_rejects_a_local_search_method(client):
+    response = generate(client, engine="sa", local_search="hill_climb")
+    assert response.status_code == 400
+    assert not client.submitted
+
+
+def test_rejects_a_non_numeric_trimester(client):
+    response = generate(client, trimester="abc")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "trimester must be an integer"}
+
+
+def test_rejects_an_unknown_local_search(client):
+    response = generate(client, local_search="tabu")
+    assert response.status_code == 400
+    assert "Unknown local search" in response.get_json()["error"]
+    assert not client.submitted
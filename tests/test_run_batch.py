@@ -0,0 +1,15 @@
+# tests/test_run_batch.py
+
+import os
+
+from scripts.run_batch import output_folders
+
+
+def test_output_folders_keep_same_named_workbooks_apart(tmp_path):
+    inputs = [str(tmp_path / "a" / "T.xlsx"), str(tmp_path / "b" / "T.xlsx"), str(tmp_path / "a" / "U.xlsx")]
+    labels = [os.path.join("a", "T"), os.path.join("b", "T"), "U"]
+    assert output_folders(inputs) == [(label, os.path.join("outputs", label)) for label in labels]
+
+
+def test_single_workbook_writes_to_outputs():
+    assert output_folders(["inputs/GA_Input.xlsx"]) == [("GA_Input", "outputs")]